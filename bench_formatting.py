@@ -0,0 +1,111 @@
+"""Micro-benchmark for commit message fitting.
+
+Run with ``python bench_formatting.py``. Every case is also checked against the previous
+quadratic fitter, so the output must stay byte-identical.
+"""
+import argparse
+import time
+from typing import Callable, List
+
+import constants
+from github_integration import GitHubMonitor
+
+BODY_LINE_COUNTS = (10, 100, 1000, 5000, 20000)
+
+
+def reference_fit_commit_message(base_lines: List[str], change_lines: List[str]) -> str:
+    """The quadratic fitter this module replaced; kept to check output and measure the speedup."""
+    closing_line = "```"
+    truncated_notice = "- Changes truncated to fit Discord's 2000-character message limit."
+    fitted_lines = list(base_lines)
+    base_line_count = len(base_lines)
+
+    for change_line in change_lines:
+        candidate_message = "\n".join(fitted_lines + [change_line, closing_line])
+
+        if len(candidate_message) <= constants.DISCORD_MESSAGE_LIMIT:
+            fitted_lines.append(change_line)
+            continue
+
+        while len(fitted_lines) > base_line_count:
+            notice_message = "\n".join(fitted_lines + [truncated_notice, closing_line])
+
+            if len(notice_message) <= constants.DISCORD_MESSAGE_LIMIT:
+                break
+
+            fitted_lines.pop()
+
+        notice_message = "\n".join(fitted_lines + [truncated_notice, closing_line])
+
+        if len(notice_message) <= constants.DISCORD_MESSAGE_LIMIT:
+            fitted_lines.append(truncated_notice)
+
+        break
+
+    message = "\n".join(fitted_lines + [closing_line])
+
+    if len(message) <= constants.DISCORD_MESSAGE_LIMIT:
+        return message
+
+    overflow_notice = "\n[Message truncated to fit Discord's 2000-character limit.]"
+    allowed_length = constants.DISCORD_MESSAGE_LIMIT - len(overflow_notice)
+    return message[:allowed_length].rstrip() + overflow_notice
+
+
+def make_case(line_count: int):
+    """Return base and change lines for a commit body with line_count short bullets."""
+    base_lines = ["**New commit to Bench's GitHub repository detected!**", "```ini", "[Title] Bench", "", "[Changes]"]
+    change_lines = [f"- Change item {index} with a short explanation." for index in range(line_count)]
+    return base_lines, change_lines
+
+
+def time_call(function: Callable[[], object], min_seconds: float) -> float:
+    """Return the average seconds per call, repeating until min_seconds have passed."""
+    calls = 0
+    started_at = time.perf_counter()
+
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - started_at
+
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="time spent per measurement")
+    parser.add_argument(
+        "--message-limit",
+        type=int,
+        default=None,
+        help="DISCORD_MESSAGE_LIMIT to fit against; defaults to a limit large enough to hold every body",
+    )
+    args = parser.parse_args()
+
+    monitor = GitHubMonitor()
+    original_limit = constants.DISCORD_MESSAGE_LIMIT
+    print(f"{'lines':>8} {'linear ms':>12} {'quadratic ms':>14} {'speedup':>9}")
+
+    try:
+        for line_count in BODY_LINE_COUNTS:
+            # A huge limit makes every line fit, which is the worst case for the old fitter.
+            constants.DISCORD_MESSAGE_LIMIT = args.message_limit or line_count * 64 + 1000
+            base_lines, change_lines = make_case(line_count)
+
+            fitted = monitor._fit_commit_message(base_lines, change_lines)
+            if fitted != reference_fit_commit_message(base_lines, change_lines):
+                raise SystemExit(f"Output differs from the reference fitter for {line_count} lines.")
+
+            linear = time_call(lambda: monitor._fit_commit_message(base_lines, change_lines), args.min_seconds)
+            # The quadratic fitter takes minutes at the largest sizes; one call is enough there.
+            quadratic_seconds = args.min_seconds if line_count <= 1000 else 0
+            quadratic = time_call(lambda: reference_fit_commit_message(base_lines, change_lines), quadratic_seconds)
+            print(f"{line_count:>8} {linear * 1000:>12.3f} {quadratic * 1000:>14.3f} {quadratic / linear:>8.1f}x")
+    finally:
+        constants.DISCORD_MESSAGE_LIMIT = original_limit
+
+
+if __name__ == "__main__":
+    main()
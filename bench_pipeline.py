@@ -0,0 +1,456 @@
+"""Benchmark suite for the scan-format-deliver pipeline.
+
+Drives the real monitors against a local fake GitHub HTTP server and posts to fake Discord
+channels, reporting latency, GitHub request counts and peak memory per case.
+
+    python bench_pipeline.py                      # run every case and print the results
+    python bench_pipeline.py --case big-push      # run selected cases only
+    python bench_pipeline.py --compare            # exit non-zero on regressions against the baseline
+    python bench_pipeline.py --write-baseline     # record the current results as the baseline
+
+Timings depend on the machine, so write the baseline on the machine that compares against it.
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import bot
+import constants
+from discord_delivery import DiscordDeliveryDispatcher
+from github_integration import GitHubMonitor, GitHubRateLimiter, create_github_monitor
+from state_store import create_state_store
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.5  # Timings and memory may grow by this fraction before counting as a regression
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchCase:
+    name: str
+    projects: int
+    branches: int
+    commits_per_push: int
+    body_lines: int
+
+
+CASES = (
+    BenchCase("small", projects=1, branches=1, commits_per_push=1, body_lines=5),
+    BenchCase("many-branches", projects=1, branches=25, commits_per_push=2, body_lines=5),
+    BenchCase("big-push", projects=1, branches=1, commits_per_push=100, body_lines=20),
+    BenchCase("many-projects", projects=8, branches=3, commits_per_push=5, body_lines=10),
+    BenchCase("huge-bodies", projects=1, branches=1, commits_per_push=10, body_lines=2000),
+)
+
+
+class FakeGitHubRepository:
+    """Branches of fake commits that the fake GitHub server serves for one repository."""
+
+    def __init__(self, owner: str, name: str, branch_count: int, body_lines: int):
+        self.owner = owner
+        self.name = name
+        self.body_lines = body_lines
+        self.commits_by_sha: Dict[str, Dict[str, Any]] = {}
+        self.branches: Dict[str, List[str]] = {}  # Branch name -> commit SHAs, oldest first
+        self._commit_count = 0
+
+        for index in range(branch_count):
+            branch_name = "main" if index == 0 else f"feature/{index}"
+            self.branches[branch_name] = []
+            self.push(branch_name, 1)
+
+    def push(self, branch_name: str, commit_count: int) -> None:
+        """Add commit_count new commits to a branch."""
+        for _ in range(commit_count):
+            self._commit_count += 1
+            commit_sha = hashlib.sha1(f"{self.owner}/{self.name}/{self._commit_count}".encode()).hexdigest()
+            body = "\n".join(
+                f"- Change {line} of commit {self._commit_count} touching the quest system."
+                for line in range(self.body_lines)
+            )
+            timestamp = f"2026-01-01T{self._commit_count // 3600 % 24:02d}:{self._commit_count // 60 % 60:02d}:{self._commit_count % 60:02d}Z"
+            self.commits_by_sha[commit_sha] = {
+                "sha": commit_sha,
+                "html_url": f"https://github.com/{self.owner}/{self.name}/commit/{commit_sha}",
+                "commit": {
+                    "message": f"Commit {self._commit_count} on {branch_name}\n\n{body}",
+                    "author": {"name": "Bench Author", "date": timestamp},
+                    "committer": {"date": timestamp},
+                },
+                "files": [
+                    {"filename": f"src/module_{self._commit_count}.py", "status": "modified", "additions": 12, "deletions": 3},
+                ],
+            }
+            self.branches[branch_name].append(commit_sha)
+
+    def push_to_every_branch(self, commit_count: int) -> None:
+        for branch_name in list(self.branches):
+            self.push(branch_name, commit_count)
+
+    def history_for_ref(self, git_ref: str) -> List[str]:
+        """Return the SHAs reachable from a branch name or commit SHA, oldest first."""
+        if git_ref in self.branches:
+            return self.branches[git_ref]
+
+        for branch_commits in self.branches.values():
+            if git_ref in branch_commits:
+                return branch_commits[:branch_commits.index(git_ref) + 1]
+
+        return []
+
+
+class FakeGitHubServer:
+    """Local aiohttp server implementing the REST endpoints the REST monitor uses."""
+
+    def __init__(self):
+        self.repositories: Dict[str, FakeGitHubRepository] = {}
+        self.request_count = 0
+        self._server: Optional[TestServer] = None
+
+    def add_repository(self, repository: FakeGitHubRepository) -> None:
+        self.repositories[f"{repository.owner}/{repository.name}"] = repository
+
+    async def start(self) -> str:
+        app = web.Application(middlewares=[self._count_requests])
+        prefix = "/repos/{owner}/{repo}"
+        app.router.add_get(f"{prefix}/git/matching-refs/heads", self.matching_refs)
+        app.router.add_get(f"{prefix}/branches", self.branches)
+        app.router.add_get(f"{prefix}/compare/{{basehead}}", self.compare)
+        app.router.add_get(f"{prefix}/commits", self.commits)
+        app.router.add_get(f"{prefix}/commits/{{sha}}", self.commit)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            await self._server.close()
+
+    @web.middleware
+    async def _count_requests(self, request: web.Request, handler):
+        self.request_count += 1
+        return await handler(request)
+
+    def _repository(self, request: web.Request) -> FakeGitHubRepository:
+        repository = self.repositories.get(f"{request.match_info['owner']}/{request.match_info['repo']}")
+        if repository is None:
+            raise web.HTTPNotFound()
+        return repository
+
+    @staticmethod
+    def _json(request: web.Request, data: Any) -> web.Response:
+        """Answer with JSON and an ETag, or 304 when the client already has this body."""
+        body = json.dumps(data)
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    @staticmethod
+    def _page(request: web.Request, items: List[Any]) -> List[Any]:
+        per_page = int(request.query.get("per_page", 30))
+        page = int(request.query.get("page", 1))
+        return items[(page - 1) * per_page:page * per_page]
+
+    async def matching_refs(self, request: web.Request) -> web.Response:
+        repository = self._repository(request)
+        refs = [
+            {"ref": f"refs/heads/{branch_name}", "object": {"sha": branch_commits[-1]}}
+            for branch_name, branch_commits in sorted(repository.branches.items())
+        ]
+        return self._json(request, self._page(request, refs))
+
+    async def branches(self, request: web.Request) -> web.Response:
+        repository = self._repository(request)
+        branches = [
+            {"name": branch_name, "commit": {"sha": branch_commits[-1]}}
+            for branch_name, branch_commits in sorted(repository.branches.items())
+        ]
+        return self._json(request, self._page(request, branches))
+
+    async def compare(self, request: web.Request) -> web.Response:
+        repository = self._repository(request)
+        base_sha, _, head = request.match_info["basehead"].partition("...")
+        history = repository.history_for_ref(head)
+
+        if base_sha not in history:
+            raise web.HTTPNotFound()
+
+        commit_shas = history[history.index(base_sha) + 1:]
+        return self._json(request, {
+            "status": "ahead" if commit_shas else "identical",
+            "total_commits": len(commit_shas),
+            "commits": [repository.commits_by_sha[commit_sha] for commit_sha in commit_shas[:250]],
+        })
+
+    async def commits(self, request: web.Request) -> web.Response:
+        repository = self._repository(request)
+        history = repository.history_for_ref(request.query.get("sha", "main"))
+        newest_first = [repository.commits_by_sha[commit_sha] for commit_sha in reversed(history)]
+        return self._json(request, self._page(request, newest_first))
+
+    async def commit(self, request: web.Request) -> web.Response:
+        commit_data = self._repository(request).commits_by_sha.get(request.match_info["sha"])
+        if commit_data is None:
+            raise web.HTTPNotFound()
+        return self._json(request, commit_data)
+
+
+class FakeDiscordChannel:
+    """Stands in for a Discord text channel; records what would have been posted."""
+
+    def __init__(self):
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, **message_kwargs: Any) -> None:
+        await asyncio.sleep(0)
+        self.sent.append(message_kwargs)
+
+
+@contextlib.contextmanager
+def measure(metrics: Dict[str, float], name: str):
+    """Record the wall time of the block as <name>_ms and its peak traced memory as <name>_peak_kib."""
+    tracemalloc.reset_peak()
+    started_at = time.perf_counter()
+    yield
+    metrics[f"{name}_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+    metrics[f"{name}_peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+
+
+def make_projects(case: BenchCase, temp_dir: str) -> List[constants.ProjectConfig]:
+    return [
+        constants.ProjectConfig(
+            key=f"bench{index}",
+            display_name=f"Bench {index}",
+            repo_owner="bench",
+            repo_name=f"repo{index}",
+            channel_id=1000 + index,
+            state_file=os.path.join(temp_dir, f"last_commit_bench{index}.txt"),
+        )
+        for index in range(case.projects)
+    ]
+
+
+def bench_formatting(case: BenchCase, metrics: Dict[str, float], iterations: int = 200) -> None:
+    """Time format_commit_message and _format_commit_body for one commit of the case's body size."""
+    repository = FakeGitHubRepository("bench", "format", 1, case.body_lines)
+    commit_data = repository.commits_by_sha[repository.branches["main"][-1]]
+    body = commit_data["commit"]["message"].split("\n", 1)[1]
+    monitor = GitHubMonitor(make_projects(case, tempfile.gettempdir())[0])
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        monitor.format_commit_message(commit_data, branch_name="main")
+    metrics["format_message_us"] = round((time.perf_counter() - started_at) / iterations * 1_000_000, 1)
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        monitor._format_commit_body(body)
+    metrics["format_body_us"] = round((time.perf_counter() - started_at) / iterations * 1_000_000, 1)
+
+
+def bench_state_stores(case: BenchCase, metrics: Dict[str, float], temp_dir: str) -> None:
+    """Time a full save, single-commit appends and a cold load for every state backend."""
+    branch_state = {f"branch-{index}": hashlib.sha1(str(index).encode()).hexdigest() for index in range(case.branches)}
+    posted_commits = [hashlib.sha1(f"posted-{index}".encode()).hexdigest() for index in range(constants.GITHUB_POSTED_COMMITS_LIMIT)]
+
+    for state_backend in constants.STATE_BACKENDS:
+        project = dataclasses.replace(
+            make_projects(case, temp_dir)[0],
+            state_file=os.path.join(temp_dir, f"state_{state_backend}.txt"),
+            state_backend=state_backend,
+        )
+        store = create_state_store(project)
+
+        try:
+            started_at = time.perf_counter()
+            store.save(branch_state, posted_commits)
+            metrics[f"state_{state_backend}_save_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+
+            history = list(posted_commits)
+            started_at = time.perf_counter()
+            for index in range(case.commits_per_push):
+                commit_sha = hashlib.sha1(f"new-{index}".encode()).hexdigest()
+                history.append(commit_sha)
+                store.record_posted_commits([commit_sha], branch_state, history)
+            metrics[f"state_{state_backend}_record_ms"] = round(
+                (time.perf_counter() - started_at) / case.commits_per_push * 1000, 3
+            )
+        finally:
+            store.close()
+
+        fresh_store = create_state_store(project)
+        try:
+            started_at = time.perf_counter()
+            fresh_store.load()
+            metrics[f"state_{state_backend}_load_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+        finally:
+            fresh_store.close()
+
+
+async def bench_pipeline(case: BenchCase, metrics: Dict[str, float], temp_dir: str) -> None:
+    """Measure a scan with new commits, an idle scan, and a full check-and-deliver run."""
+    server = FakeGitHubServer()
+    projects = make_projects(case, temp_dir)
+    repositories = [FakeGitHubRepository(project.repo_owner, project.repo_name, case.branches, case.body_lines) for project in projects]
+    for repository in repositories:
+        server.add_repository(repository)
+
+    api_base = await server.start()
+    session = bot.create_github_session()
+    rate_limiter = GitHubRateLimiter()
+    monitors = [create_github_monitor(project, api_base=api_base, rate_limiter=rate_limiter) for project in projects]
+    for monitor in monitors:
+        monitor.attach_session(session)
+
+    try:
+        # Start tracking every branch, as the first check after installation does.
+        await asyncio.gather(*(monitor.check_for_new_commits() for monitor in monitors))
+
+        for repository in repositories:
+            repository.push_to_every_branch(case.commits_per_push)
+
+        server.request_count = 0
+        with measure(metrics, "scan"):
+            checks = await asyncio.gather(*(monitor.check_for_new_commit_updates() for monitor in monitors))
+        metrics["scan_requests"] = server.request_count
+        expected_updates = case.projects * case.branches * case.commits_per_push
+        found_updates = sum(len(check.updates) for check in checks)
+        if found_updates != expected_updates:
+            raise RuntimeError(f"Scan found {found_updates} updates, expected {expected_updates}.")
+
+        channels = {project.channel_id: FakeDiscordChannel() for project in projects}
+        dispatcher = DiscordDeliveryDispatcher(channels.get)
+
+        with mock.patch.object(bot, "project_monitors", tuple(zip(projects, monitors))), \
+                mock.patch.object(bot, "delivery_dispatcher", dispatcher):
+            bot._pending_deliveries.clear()
+            bot._project_locks.clear()
+            bot._github_check_lock = None
+
+            server.request_count = 0
+            with measure(metrics, "check_and_deliver"):
+                await bot.run_github_commit_check(manual=True)
+                await dispatcher.join()
+            metrics["check_and_deliver_requests"] = server.request_count
+            metrics["discord_sends"] = sum(len(channel.sent) for channel in channels.values())
+
+            server.request_count = 0
+            with measure(metrics, "idle_check"):
+                await bot.run_github_commit_check(manual=True)
+            metrics["idle_check_requests"] = server.request_count
+
+            await dispatcher.stop()
+    finally:
+        for monitor in monitors:
+            monitor.state_store.close()
+        await session.close()
+        await server.close()
+
+
+def run_case(case: BenchCase) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as temp_dir, contextlib.redirect_stdout(io.StringIO()):
+        bench_formatting(case, metrics)
+        bench_state_stores(case, metrics, temp_dir)
+
+        # Tracing slows everything down, so only the pipeline runs with it.
+        tracemalloc.start()
+        try:
+            asyncio.run(bench_pipeline(case, metrics, temp_dir))
+        finally:
+            tracemalloc.stop()
+
+    return metrics
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Return one line per metric that got worse than the baseline allows.
+
+    Request and send counts must not grow at all; timings and memory may grow by tolerance.
+    """
+    regressions = []
+
+    for case_name, case_metrics in results.items():
+        for metric, value in case_metrics.items():
+            baseline_value = baseline.get(case_name, {}).get(metric)
+
+            if baseline_value is None:
+                continue
+
+            is_count = metric.endswith(("_requests", "_sends")) or metric == "discord_sends"
+            allowed_value = baseline_value if is_count else baseline_value * (1 + tolerance)
+
+            if value > allowed_value:
+                regressions.append(f"{case_name}.{metric}: {value} (baseline {baseline_value})")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scan-format-deliver pipeline.")
+    parser.add_argument("--case", action="append", choices=[case.name for case in CASES], help="case to run (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare against or write")
+    parser.add_argument("--compare", action="store_true", help="exit with status 1 when a metric regressed")
+    parser.add_argument("--write-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed growth of timings and memory")
+    args = parser.parse_args()
+
+    selected_cases = [case for case in CASES if not args.case or case.name in args.case]
+    results = {}
+
+    for case in selected_cases:
+        results[case.name] = run_case(case)
+        print(f"{case.name} ({case.projects} project(s), {case.branches} branch(es), "
+              f"{case.commits_per_push} commit(s) per push, {case.body_lines} body line(s))")
+        for metric, value in results[case.name].items():
+            print(f"  {metric:<32} {value}")
+
+    if args.write_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}.")
+
+    if args.compare:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        if regressions:
+            return 1
+
+        print("No regressions against the baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,219 @@
+import aiohttp
 import discord
 import constants
 import asyncio
+import threading
+import time
+import tracing
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
 from discord.ext import commands, tasks
 
-from github_integration import GitHubMonitor
+from discord_delivery import DiscordDeliveryDispatcher
+from github_integration import GitHubCommitCheckResult, GitHubMonitor, GitHubRateLimiter, create_github_monitor
+from github_webhooks import GitHubWebhookServer
+from bot_logging import get_logger, get_project_logger
+from metrics import MetricsServer
+from profiler import SamplingProfiler, get_profile_output_file
 
-# Creates a new bot client with the default intents and enables message content intent
-Intents = discord.Intents.default() # Intents object with the default intents (messages, reactions, etc.)
-Intents.message_content = True # Enable message content intent to receive message content in on_message event since it's disabled by default
-Client = commands.Bot(command_prefix='!CommitsBot.', intents=Intents) # Create a new bot client with the intents
+
+@dataclass
+class ProjectPollSchedule:
+    """When one project is next due for a GitHub check and how far apart its checks are."""
+    interval: int
+    next_check_at: float = 0.0  # time.monotonic() value; 0 means due on the next tick
+
+    def is_due(self, now: float) -> bool:
+        """Return True once the project's next check time has been reached."""
+        return now >= self.next_check_at
+
+    def record_check(self, active: Optional[bool], now: float, base_interval: int) -> None:
+        """Poll hot projects at the fastest option and back dormant ones off up to the ceiling.
+
+        ``active`` is None when the check could not tell (GitHub error, rate limit), which keeps
+        the current interval.
+        """
+        if active:
+            self.interval = get_fastest_github_check_interval()
+        elif active is not None:
+            ceiling = max(base_interval, int(constants.GITHUB_IDLE_POLL_INTERVAL_CEILING))
+            self.interval = min(ceiling, self.interval * 2)
+
+        self.next_check_at = now + self.interval
+
+
+@dataclass
+class CheckProfile:
+    """A sampling profile running across the next few GitHub checks."""
+    profiler: SamplingProfiler
+    remaining_checks: int
+
+
+logger = get_logger("bot")
+
+# Every project shares one GitHub token, so they share one rate-limit budget
+github_rate_limiter = GitHubRateLimiter()
 
 # Initialize one GitHub monitor per configured project
 project_monitors = tuple(
-    (project, GitHubMonitor(project)) for project in constants.PROJECTS
+    (project, create_github_monitor(project, rate_limiter=github_rate_limiter))
+    for project in constants.PROJECTS
 )
 _github_check_interval = constants.GITHUB_CHECK_INTERVAL
+_effective_github_check_interval = constants.GITHUB_CHECK_INTERVAL  # Loop interval after adaptive and rate-limit planning
 _github_check_lock = None
+_github_session: Optional[aiohttp.ClientSession] = None
+_pending_deliveries: Dict[str, asyncio.Future] = {}  # Per project: updates queued but not yet confirmed
+_project_locks: Dict[str, asyncio.Lock] = {}
+_webhook_server: Optional[GitHubWebhookServer] = None
+_metrics_server: Optional[MetricsServer] = None
+_project_schedules: Dict[str, ProjectPollSchedule] = {}
+_check_profile: Optional[CheckProfile] = None
 _unconfigured_projects_warned = set()
 
 
+def create_github_session() -> aiohttp.ClientSession:
+    """Create the pooled keep-alive session shared by every GitHub monitor."""
+    connector = aiohttp.TCPConnector(
+        limit=constants.GITHUB_HTTP_CONNECTION_LIMIT,
+        limit_per_host=constants.GITHUB_HTTP_CONNECTIONS_PER_HOST,
+        keepalive_timeout=constants.GITHUB_HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=constants.GITHUB_HTTP_DNS_CACHE_TTL,
+    )
+    timeout = aiohttp.ClientTimeout(total=constants.GITHUB_HTTP_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def open_github_session() -> aiohttp.ClientSession:
+    """Open the shared GitHub session on the bot event loop and attach it to every monitor."""
+    global _github_session
+    if _github_session is None or _github_session.closed:
+        _github_session = create_github_session()
+
+    for _, monitor in project_monitors:
+        monitor.attach_session(_github_session)
+
+    return _github_session
+
+
+async def close_github_session() -> None:
+    """Detach and close the shared GitHub session."""
+    global _github_session
+    session = _github_session
+    _github_session = None
+
+    for _, monitor in project_monitors:
+        monitor.attach_session(None)
+
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def start_webhook_server() -> Optional[GitHubWebhookServer]:
+    """Start the push webhook receiver on the bot event loop when webhooks are enabled."""
+    global _webhook_server
+    if not constants.GITHUB_WEBHOOK_ENABLED or _webhook_server is not None:
+        return _webhook_server
+
+    server = GitHubWebhookServer(project_monitors, handle_github_push)
+
+    try:
+        await server.start()
+    except Exception as e:
+        logger.error("Error starting GitHub webhook receiver; falling back to polling only: %s", e)
+        return None
+
+    _webhook_server = server
+    return server
+
+
+async def stop_webhook_server() -> None:
+    """Stop the push webhook receiver if it is running."""
+    global _webhook_server
+    server = _webhook_server
+    _webhook_server = None
+
+    if server is not None:
+        await server.stop()
+
+
+async def start_metrics_server() -> Optional[MetricsServer]:
+    """Start the Prometheus metrics endpoint on the bot event loop when it is enabled."""
+    global _metrics_server
+    if not constants.METRICS_ENABLED or _metrics_server is not None:
+        return _metrics_server
+
+    server = MetricsServer()
+
+    try:
+        await server.start()
+    except Exception as e:
+        logger.error("Error starting metrics endpoint: %s", e)
+        return None
+
+    _metrics_server = server
+    return server
+
+
+async def stop_metrics_server() -> None:
+    """Stop the metrics endpoint if it is running."""
+    global _metrics_server
+    server = _metrics_server
+    _metrics_server = None
+
+    if server is not None:
+        await server.stop()
+
+
+class CommitsBot(commands.Bot):
+    """Discord bot client that owns the shared GitHub HTTP session, webhook receiver and metrics endpoint."""
+
+    async def setup_hook(self) -> None:
+        await open_github_session()
+        await start_webhook_server()
+        await start_metrics_server()
+
+    async def close(self) -> None:
+        try:
+            # Give queued commit updates a moment to go out while Discord is still connected.
+            await asyncio.wait_for(delivery_dispatcher.join(), timeout=constants.DISCORD_DELIVERY_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Shutting down with undelivered commit updates; they will be found again on the next start.")
+
+        try:
+            await super().close()
+        finally:
+            await stop_webhook_server()
+            await stop_metrics_server()
+            cancel_check_profile()
+            await delivery_dispatcher.stop()
+            await close_github_session()
+            await asyncio.to_thread(tracing.flush)
+
+            # Write any state still held in memory before the process can exit.
+            for _, monitor in project_monitors:
+                try:
+                    await monitor.flush_state()
+                finally:
+                    monitor.state_store.close()
+
+
+# Creates a new bot client with the default intents and enables message content intent
+Intents = discord.Intents.default() # Intents object with the default intents (messages, reactions, etc.)
+Intents.message_content = True # Enable message content intent to receive message content in on_message event since it's disabled by default
+Client = CommitsBot(command_prefix='!CommitsBot.', intents=Intents) # Create a new bot client with the intents
+
+
+def _get_updates_channel(channel_id: int) -> Optional[discord.TextChannel]:
+    """Return a project's updates channel, or None when it is missing or not a text channel."""
+    channel = Client.get_channel(channel_id)
+    return channel if isinstance(channel, discord.TextChannel) else None
+
+
+# Posts commit updates from one queue per channel, separately from checking GitHub
+delivery_dispatcher = DiscordDeliveryDispatcher(_get_updates_channel)
+
+
 def format_github_check_interval(seconds: int) -> str:
     """Return a readable label for a GitHub check interval."""
     for label, value in constants.GITHUB_CHECK_INTERVAL_OPTIONS:
@@ -32,6 +227,51 @@ def get_github_check_interval() -> int:
     return _github_check_interval
 
 
+def get_fastest_github_check_interval() -> int:
+    """Return the shortest selectable GitHub check interval."""
+    return min(value for _, value in constants.GITHUB_CHECK_INTERVAL_OPTIONS)
+
+
+def _get_scheduler_tick_interval() -> int:
+    """Return how often the background loop wakes up before rate-limit adjustments.
+
+    With adaptive project polling the loop ticks at the fastest option and each project's
+    own schedule decides whether it is due; otherwise every project uses the selected interval.
+    While push webhooks are received, polling only reconciles missed events.
+    """
+    if _webhook_server is not None:
+        return max(_github_check_interval, int(constants.GITHUB_WEBHOOK_RECONCILE_INTERVAL))
+
+    if _adaptive_polling_enabled():
+        return get_fastest_github_check_interval()
+
+    return _github_check_interval
+
+
+def _adaptive_polling_enabled() -> bool:
+    """Return True when projects are polled on their own activity-based schedules."""
+    return constants.GITHUB_ADAPTIVE_PROJECT_POLLING and _webhook_server is None
+
+
+def _get_project_schedule(project: constants.ProjectConfig) -> ProjectPollSchedule:
+    """Return the poll schedule for a project, starting at the selected interval."""
+    schedule = _project_schedules.get(project.key)
+    if schedule is None:
+        schedule = ProjectPollSchedule(interval=_github_check_interval)
+        _project_schedules[project.key] = schedule
+    return schedule
+
+
+def _record_project_check(project: constants.ProjectConfig, active: Optional[bool]) -> None:
+    """Move a project's next check according to whether its branch heads moved."""
+    schedule = _get_project_schedule(project)
+    previous_interval = schedule.interval
+    schedule.record_check(active, time.monotonic(), _github_check_interval)
+
+    if _adaptive_polling_enabled() and schedule.interval != previous_interval:
+        get_project_logger(project).debug("Next check in %s.", format_github_check_interval(schedule.interval))
+
+
 def set_github_check_interval(seconds: int) -> int:
     """Set the background GitHub check interval."""
     allowed_intervals = {value for _, value in constants.GITHUB_CHECK_INTERVAL_OPTIONS}
@@ -40,13 +280,53 @@ def set_github_check_interval(seconds: int) -> int:
     if seconds not in allowed_intervals:
         raise ValueError(f"Unsupported GitHub check interval: {seconds} seconds")
 
-    global _github_check_interval
+    global _github_check_interval, _effective_github_check_interval
     _github_check_interval = seconds
-    check_github_commits.change_interval(seconds=seconds)
-    print(f"GitHub check interval set to {format_github_check_interval(seconds)}.")
+    _effective_github_check_interval = _get_scheduler_tick_interval()
+    check_github_commits.change_interval(seconds=_effective_github_check_interval)
+
+    # Restart every project's backoff from the newly selected interval.
+    now = time.monotonic()
+    for schedule in _project_schedules.values():
+        schedule.interval = seconds
+        schedule.next_check_at = min(schedule.next_check_at, now + seconds)
+
+    logger.info("GitHub check interval set to %s.", format_github_check_interval(seconds))
     return seconds
 
 
+def get_effective_github_check_interval() -> int:
+    """Return the interval currently used after rate-limit adjustments."""
+    return _effective_github_check_interval
+
+
+def plan_github_check_interval(requests_per_check: Mapping[str, int]) -> int:
+    """Stretch or restore the check interval so the remaining rate-limit budget lasts until reset."""
+    global _effective_github_check_interval
+    tick_interval = _get_scheduler_tick_interval()
+    planned_interval = github_rate_limiter.recommend_interval(tick_interval, requests_per_check)
+
+    if planned_interval != _effective_github_check_interval:
+        if planned_interval > tick_interval:
+            logger.warning(
+                "GitHub rate limit budget low (%s requests left, ~%d per check); "
+                "checking every %d seconds until it recovers.",
+                github_rate_limiter.remaining,
+                sum(requests_per_check.values()),
+                planned_interval,
+            )
+        else:
+            logger.info(
+                "GitHub rate limit budget recovered; checking every %s again.",
+                format_github_check_interval(planned_interval),
+            )
+
+        _effective_github_check_interval = planned_interval
+        check_github_commits.change_interval(seconds=planned_interval)
+
+    return planned_interval
+
+
 def _get_github_check_lock() -> asyncio.Lock:
     """Create the check lock lazily on the bot event loop."""
     global _github_check_lock
@@ -55,53 +335,143 @@ def _get_github_check_lock() -> asyncio.Lock:
     return _github_check_lock
 
 
-async def _run_project_commit_check(
+def _get_project_lock(project: constants.ProjectConfig) -> asyncio.Lock:
+    """Return the lock that keeps polling and webhook deliveries for one project from overlapping."""
+    project_lock = _project_locks.get(project.key)
+    if project_lock is None:
+        project_lock = asyncio.Lock()
+        _project_locks[project.key] = project_lock
+    return project_lock
+
+
+async def _queue_commit_check(
     project: constants.ProjectConfig,
     monitor: GitHubMonitor,
-) -> bool:
-    """Check one project for new commits and post them to its Discord channel."""
-    # Check for new commits, but do not advance state until Discord delivery succeeds.
-    commit_check = await monitor.check_for_new_commit_updates()
+    commit_check: GitHubCommitCheckResult,
+) -> Optional[asyncio.Future]:
+    """Queue a check's commit updates for delivery, or save its state when there is nothing to post.
 
+    The project's state advances as the channel dispatcher confirms each delivered message.
+    """
     if commit_check.updates:
-        # Get the project's updates channel
-        channel = Client.get_channel(project.channel_id)
+        return _track_delivery(project, await delivery_dispatcher.submit(project, monitor, commit_check))
+
+    if commit_check.should_save_state:
+        monitor.save_processed_commits(
+            commit_check.next_branch_state,
+            commit_check.posted_commits,
+        )
 
-        if isinstance(channel, discord.TextChannel):
-            posted_commits = list(commit_check.posted_commits)
+    return None
 
-            try:
-                # Send every queued commit update in chronological order.
-                for commit_update in commit_check.updates:
-                    await channel.send(commit_update.message)
-                    posted_commits.append(commit_update.commit_sha)
-                    monitor.save_processed_commits(
-                        commit_check.branch_state,
-                        posted_commits,
-                    )
-            except Exception as e:
-                print(f"Error sending {project.display_name} commit update to Discord: {e}")
+
+def _track_delivery(project: constants.ProjectConfig, delivery: asyncio.Future) -> asyncio.Future:
+    """Remember a project's delivery until the dispatcher confirms it."""
+    _pending_deliveries[project.key] = delivery
+    delivery.add_done_callback(lambda _: _forget_delivery(project, delivery))
+    return delivery
+
+
+def _forget_delivery(project: constants.ProjectConfig, delivery: asyncio.Future) -> None:
+    if _pending_deliveries.get(project.key) is delivery:
+        del _pending_deliveries[project.key]
+
+
+def _get_pending_delivery(project: constants.ProjectConfig) -> Optional[asyncio.Future]:
+    """Return the project's unconfirmed delivery, if any."""
+    delivery = _pending_deliveries.get(project.key)
+    return delivery if delivery is not None and not delivery.done() else None
+
+
+async def _run_project_commit_check(
+    project: constants.ProjectConfig,
+    monitor: GitHubMonitor,
+) -> bool:
+    """Check one project for new commits and queue them for its Discord channel."""
+    with tracing.span("bot.project_check", project=project.key) as check_span:
+        async with _get_project_lock(project):
+            if _get_pending_delivery(project) is not None:
+                # Until those updates are confirmed the saved state would rediscover them.
+                monitor.logger.info("Commit updates are still being posted; skipping this check.")
+                check_span.set_attribute("skipped", "delivery pending")
                 return False
 
-            monitor.save_processed_commits(
-                commit_check.next_branch_state,
-                posted_commits,
+            # Updates left over from a failed delivery or a restart go out before GitHub is asked again.
+            outbox_delivery = await delivery_dispatcher.resume(project, monitor)
+            if outbox_delivery is not None:
+                _track_delivery(project, outbox_delivery)
+                check_span.set_attribute("resumed_outbox", True)
+                return True
+
+            # Check for new commits, but do not advance state until Discord delivery succeeds.
+            commit_check = await asyncio.wait_for(
+                monitor.check_for_new_commit_updates(),
+                timeout=constants.GITHUB_PROJECT_CHECK_TIMEOUT,
             )
+            _record_project_check(project, commit_check.has_new_activity)
 
-            print(
-                f"Posted {len(commit_check.updates)} new {project.display_name} commit update(s) "
-                f"to Discord at {discord.utils.utcnow()}"
-            )
-            return True
+            try:
+                return await _queue_commit_check(project, monitor, commit_check) is not None
+            finally:
+                await monitor.flush_state()
 
-        print(f"Error: updates channel for {project.display_name} not found or is not a text channel.")
+
+async def handle_github_push(
+    project: constants.ProjectConfig,
+    monitor: GitHubMonitor,
+    payload: Dict[str, Any],
+) -> bool:
+    """Post the commits of a verified push webhook, reconciling through the API when needed."""
+    if not project.channel_id:
         return False
 
-    if commit_check.should_save_state:
-        monitor.save_processed_commits(
-            commit_check.next_branch_state,
-            commit_check.posted_commits,
-        )
+    with tracing.span("bot.push_webhook", project=project.key):
+        # A push builds on the previous one, so let earlier updates land in the saved state first.
+        # The lock is only held to look for a pending delivery and queue the push, never while
+        # Discord posts, so scheduled checks keep taking the "delivery pending" skip meanwhile.
+        while True:
+            async with _get_project_lock(project):
+                # Checked under the lock, so a poll that queued this push while we waited is seen.
+                pending_delivery = _get_pending_delivery(project)
+
+                if pending_delivery is None:
+                    commit_check = monitor.build_push_updates(payload)
+                    delivery = None
+
+                    if commit_check is not None:
+                        try:
+                            delivery = await _queue_commit_check(project, monitor, commit_check)
+                        finally:
+                            await monitor.flush_state()
+                    break
+
+            await asyncio.shield(pending_delivery)
+
+        if commit_check is not None:
+            return delivery is not None and await asyncio.shield(delivery)
+
+    monitor.logger.info("Push webhook needs a full check; checking GitHub now.")
+    return await _run_project_commit_check(project, monitor)
+
+
+async def _run_isolated_project_commit_check(
+    project: constants.ProjectConfig,
+    monitor: GitHubMonitor,
+    check_slots: asyncio.Semaphore,
+) -> bool:
+    """Check one project inside a concurrency slot, containing any failure to that project."""
+    async with check_slots:
+        try:
+            return await _run_project_commit_check(project, monitor)
+        except asyncio.TimeoutError:
+            monitor.logger.error(
+                "Timed out checking for new commits after %s seconds.",
+                constants.GITHUB_PROJECT_CHECK_TIMEOUT,
+            )
+            _record_project_check(project, None)
+        except Exception as e:
+            monitor.logger.exception("Error checking for new commits: %s", e)
+            _record_project_check(project, None)
 
     return False
 
@@ -112,37 +482,108 @@ async def run_github_commit_check(manual: bool = False) -> bool:
 
     if check_lock.locked():
         check_type = "manual" if manual else "scheduled"
-        print(f"GitHub check already in progress; skipping {check_type} check.")
+        logger.info("GitHub check already in progress; skipping %s check.", check_type)
         return False
 
     async with check_lock:
         if manual:
-            print("Manual GitHub check requested.")
+            logger.info("Manual GitHub check requested.")
 
-        posted_any = False
+        project_checks = []
+        check_slots = asyncio.Semaphore(max(1, int(constants.GITHUB_MAX_CONCURRENT_PROJECT_CHECKS)))
+        now = time.monotonic()
 
         for project, monitor in project_monitors:
             if not project.channel_id:
                 if project.key not in _unconfigured_projects_warned:
-                    print(
-                        f"Skipping {project.display_name}: no Discord channel configured "
-                        f"(set channel_id for '{project.key}' in constants.py)."
+                    logger.warning(
+                        "Skipping %s: no Discord channel configured (set channel_id for '%s' in constants.py).",
+                        project.display_name,
+                        project.key,
                     )
                     _unconfigured_projects_warned.add(project.key)
                 continue
 
-            try:
-                if await _run_project_commit_check(project, monitor):
-                    posted_any = True
-            except Exception as e:
-                print(f"Error checking {project.display_name} for new commits: {e}")
+            # Manual checks ignore per-project backoff; scheduled ticks only check due projects.
+            if _adaptive_polling_enabled() and not manual:
+                if not _get_project_schedule(project).is_due(now):
+                    continue
+
+            project_checks.append(_run_isolated_project_commit_check(project, monitor, check_slots))
+
+        check_profile = _check_profile if project_checks else None
+
+        if check_profile is not None:
+            check_profile.profiler.resume()
+
+        try:
+            check_results = await asyncio.gather(*project_checks)
+        finally:
+            if check_profile is not None:
+                check_profile.profiler.pause()
+                await _count_profiled_check(check_profile)
+
+        posted_any = any(check_results)
 
         if manual and not posted_any:
-            print("Manual GitHub check completed; no new commits found.")
+            logger.info("Manual GitHub check completed; no new commits found.")
 
         return posted_any
 
 
+def profile_next_github_checks(check_count: int) -> bool:
+    """Sample the bot thread during the next check_count GitHub checks; call on the bot loop."""
+    global _check_profile
+    if _check_profile is not None:
+        logger.warning("A profile is already running; %d check(s) left.", _check_profile.remaining_checks)
+        return False
+
+    profiler = SamplingProfiler(threading.get_ident())
+    profiler.start()
+    _check_profile = CheckProfile(profiler, max(1, int(check_count)))
+    logger.info("Profiling the next %d GitHub check(s).", _check_profile.remaining_checks)
+    return True
+
+
+def cancel_check_profile() -> None:
+    """Stop a running profile without writing it."""
+    global _check_profile
+    check_profile = _check_profile
+    _check_profile = None
+
+    if check_profile is not None:
+        check_profile.profiler.stop()
+
+
+async def _count_profiled_check(check_profile: CheckProfile) -> None:
+    """Count one profiled check and report the profile once the last one finished."""
+    global _check_profile
+    check_profile.remaining_checks -= 1
+
+    if check_profile.remaining_checks > 0:
+        return
+
+    _check_profile = None
+    output_file = get_profile_output_file()
+
+    def finish_profile() -> None:
+        check_profile.profiler.stop()
+        check_profile.profiler.write_collapsed(output_file)
+
+    try:
+        await asyncio.to_thread(finish_profile)
+    except Exception as e:
+        logger.error("Error writing profile: %s", e)
+        return
+
+    logger.info(
+        "Profile finished: %d samples written to %s\n%s",
+        check_profile.profiler.sample_count,
+        output_file,
+        "\n".join(check_profile.profiler.top_functions()),
+    )
+
+
 async def force_github_commit_check() -> bool:
     """Force an immediate GitHub commit check."""
     return await run_github_commit_check(manual=True)
@@ -154,18 +595,40 @@ async def check_github_commits() -> None:
     try:
         await run_github_commit_check()
     except Exception as e:
-        print(f"Error in GitHub commit checker: {e}")
+        logger.exception("Error in GitHub commit checker: %s", e)
+
+    try:
+        plan_github_check_interval(github_rate_limiter.take_request_counts())
+    except Exception as e:
+        logger.error("Error planning next GitHub check: %s", e)
 
 @check_github_commits.before_loop
 async def before_check_github_commits() -> None:
     """Wait until the bot is ready before starting the background task."""
+    global _effective_github_check_interval
     await Client.wait_until_ready()
-    print(f"GitHub commit checker started. Checking every {format_github_check_interval(_github_check_interval)}...")
+    _effective_github_check_interval = _get_scheduler_tick_interval()
+    check_github_commits.change_interval(seconds=_effective_github_check_interval)
+
+    if _webhook_server is not None:
+        logger.info(
+            "GitHub commit checker started. Receiving push webhooks and reconciling every %d seconds...",
+            _effective_github_check_interval,
+        )
+    elif _adaptive_polling_enabled():
+        logger.info(
+            "GitHub commit checker started. Checking every %s, faster for active projects "
+            "and up to every %d seconds for idle ones...",
+            format_github_check_interval(_github_check_interval),
+            constants.GITHUB_IDLE_POLL_INTERVAL_CEILING,
+        )
+    else:
+        logger.info("GitHub commit checker started. Checking every %s...", format_github_check_interval(_github_check_interval))
 
 # Decorator to register an on_ready event (whenever the bot is connected to Discord Server)
 @Client.event
 async def on_ready() -> None:
-    print(f'{Client.user} has connected to Discord Server!') # Print the bot's username and ID to the console when connected to Discord Server
+    logger.info("%s has connected to Discord Server!", Client.user) # Log the bot's username and ID when connected to Discord Server
     
     # Start the GitHub commit checker if it's not already running
     if not check_github_commits.is_running():
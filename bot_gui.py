@@ -1,27 +1,124 @@
+import logging
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import threading
+import queue
 import sys
 import os
 from datetime import datetime
 import asyncio
+import bot_logging
 import constants
+import metrics
 from bot import (
     Client,
     force_github_commit_check,
     get_github_check_interval,
+    profile_next_github_checks,
     set_github_check_interval,
 )
 from dotenv import load_dotenv
 
+
+class TextRedirector:
+    """File-like stdout/stderr replacement that hands complete lines to the GUI log queue.
+
+    Writes never touch Tk, so they return immediately on any thread.
+    """
+
+    def __init__(self, log_queue, tag="info"):
+        self.log_queue = log_queue
+        self.tag = tag
+        self.parts = []  # Text written since the last newline
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            if '\n' not in text:
+                self.parts.append(text)
+                return len(text)
+
+            self.parts.append(text)
+            lines = ''.join(self.parts).split('\n')
+            self.parts = [lines[-1]] if lines[-1] else []
+
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        for line in lines[:-1]:
+            if line.strip():
+                self.log_queue.put((timestamp, line, self.tag))
+
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            line = ''.join(self.parts)
+            self.parts = []
+
+        if line.strip():
+            self.log_queue.put((datetime.now().strftime("%H:%M:%S"), line, self.tag))
+
+
+class GuiLogHandler(logging.Handler):
+    """Logging handler that hands formatted records to the GUI log queue, tagged by level."""
+
+    def __init__(self, log_queue):
+        super().__init__()
+        self.log_queue = log_queue
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record):
+        try:
+            if record.levelno >= logging.ERROR:
+                tag = "error"
+            elif record.levelno >= logging.WARNING:
+                tag = "warning"
+            else:
+                tag = "info"
+
+            timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+            self.log_queue.put((timestamp, self.format(record), tag))
+        except Exception:
+            self.handleError(record)
+
+
+def take_log_batch(log_queue, limit):
+    """Return up to limit queued (timestamp, text, tag) lines without waiting."""
+    batch = []
+
+    while len(batch) < limit:
+        try:
+            batch.append(log_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def insert_log_batch(text_widget, batch, max_lines):
+    """Append a batch of log lines in one insert and trim the oldest lines past max_lines."""
+    insert_args = []
+    for timestamp, text, tag in batch:
+        insert_args.extend((f"[{timestamp}] ", "info", f"{text}\n", tag))
+
+    text_widget.config(state=tk.NORMAL)
+    text_widget.insert(tk.END, *insert_args)
+
+    # The Text widget always ends with an empty line after the last newline.
+    line_count = int(text_widget.index("end-1c").split(".")[0]) - 1
+    if line_count > max_lines:
+        text_widget.delete("1.0", f"{line_count - max_lines + 1}.0")
+
+    text_widget.see(tk.END)
+    text_widget.config(state=tk.DISABLED)
+
+
 class BotGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("CommitsBot Manager")
-        self.root.geometry("1000x600")
-        self.root.minsize(980, 600)
+        self.root.geometry("1240x600")
+        self.root.minsize(1220, 600)
         self.root.resizable(True, True)
-        self.gui_thread_id = threading.get_ident()
         
         # Bot state
         self.bot_running = False
@@ -40,8 +137,10 @@ class BotGUI:
         # Create GUI elements
         self.create_widgets()
         
-        # Redirect stdout to capture print statements
+        # Bot logging and stray prints both end up in the log queue
+        self.log_queue = queue.SimpleQueue()
         self.setup_logging()
+        self.drain_log_queue()
         
     def create_widgets(self):
         # Title Frame
@@ -103,6 +202,39 @@ class BotGUI:
         )
         self.interval_combo.pack(side=tk.LEFT, padx=5)
         self.interval_combo.bind("<<ComboboxSelected>>", self.on_interval_selected)
+
+        # Profiler control
+        profile_frame = tk.Frame(control_frame, bg="#f0f0f0")
+        profile_frame.pack(side=tk.LEFT, padx=8)
+
+        tk.Label(
+            profile_frame,
+            text="Profile next",
+            font=("Arial", 10),
+            bg="#f0f0f0"
+        ).pack(side=tk.LEFT, padx=5)
+
+        self.profile_checks_var = tk.StringVar(value="5")
+        tk.Spinbox(
+            profile_frame,
+            from_=1,
+            to=50,
+            textvariable=self.profile_checks_var,
+            width=3
+        ).pack(side=tk.LEFT)
+
+        self.profile_button = tk.Button(
+            profile_frame,
+            text="🔬 Checks",
+            command=self.profile_checks,
+            bg="#747f8d",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            relief=tk.FLAT,
+            cursor="hand2",
+            state=tk.DISABLED
+        )
+        self.profile_button.pack(side=tk.LEFT, padx=5)
         
         # Buttons
         button_frame = tk.Frame(control_frame, bg="#f0f0f0")
@@ -151,6 +283,20 @@ class BotGUI:
             state=tk.DISABLED
         )
         self.force_check_button.pack(side=tk.LEFT, padx=5)
+
+        self.metrics_button = tk.Button(
+            button_frame,
+            text="📊 Metrics",
+            command=self.show_metrics,
+            bg="#99aab5",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            width=12,
+            height=2,
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        self.metrics_button.pack(side=tk.LEFT, padx=5)
         
         self.clear_button = tk.Button(
             button_frame,
@@ -241,52 +387,45 @@ class BotGUI:
             self.append_log(f"Error setting check interval: {str(e)}", "error")
         
     def setup_logging(self):
-        """Redirect stdout to capture print statements"""
-        class TextRedirector:
-            def __init__(self, widget, tag="info"):
-                self.widget = widget
-                self.tag = tag
-                self.buffer = ""
-                
-            def write(self, text):
-                self.buffer += text
-                if '\n' in self.buffer:
-                    lines = self.buffer.split('\n')
-                    for line in lines[:-1]:
-                        if line.strip():
-                            self.widget.append_log(line, self.tag)
-                    self.buffer = lines[-1]
-                    
-            def flush(self):
-                if self.buffer.strip():
-                    self.widget.append_log(self.buffer, self.tag)
-                    self.buffer = ""
-        
-        sys.stdout = TextRedirector(self, "info")
-        sys.stderr = TextRedirector(self, "error")
+        """Attach the log panel as a logging handler and redirect stdout for stray prints"""
+        sys.stdout = TextRedirector(self.log_queue, "info")
+        sys.stderr = TextRedirector(self.log_queue, "error")
+        bot_logging.configure_logging([GuiLogHandler(self.log_queue)])
         
     def append_log(self, text, tag="info"):
-        """Append text to log with timestamp"""
-        if threading.get_ident() != self.gui_thread_id:
-            try:
-                self.root.after(0, self.append_log, text, tag)
-            except tk.TclError:
-                pass
-            return
+        """Queue text for the log with a timestamp; safe to call from any thread"""
+        self.log_queue.put((datetime.now().strftime("%H:%M:%S"), text, tag))
 
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"[{timestamp}] ", "info")
-        self.log_text.insert(tk.END, f"{text}\n", tag)
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+    def drain_log_queue(self):
+        """Move queued log lines into the log widget in batches, then schedule the next tick"""
+        batch = take_log_batch(self.log_queue, constants.GUI_LOG_BATCH_LINES)
+
+        if batch:
+            insert_log_batch(self.log_text, batch, constants.GUI_LOG_MAX_LINES)
+
+        # A full batch means more lines are waiting, so come back as soon as Tk is idle.
+        delay = 1 if len(batch) == constants.GUI_LOG_BATCH_LINES else constants.GUI_LOG_DRAIN_INTERVAL_MS
+
+        try:
+            self.root.after(delay, self.drain_log_queue)
+        except tk.TclError:
+            pass
         
+    def show_metrics(self):
+        """Log a summary of the bot's current metrics."""
+        for line in metrics.summarize_snapshot(metrics.get_snapshot()):
+            self.append_log(line, "info")
+
     def clear_log(self):
         """Clear the log text"""
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state=tk.DISABLED)
+
+        # Lines still waiting in the queue belong to the cleared log as well.
+        while take_log_batch(self.log_queue, constants.GUI_LOG_BATCH_LINES):
+            pass
+
         self.append_log("Log cleared", "info")
         
     def update_status(self, running):
@@ -297,12 +436,14 @@ class BotGUI:
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             self.force_check_button.config(state=tk.DISABLED if self.force_check_running else tk.NORMAL)
+            self.profile_button.config(state=tk.NORMAL)
         else:
             self.status_indicator.itemconfig(self.status_circle, fill="#ff4444")
             self.status_label.config(text="Stopped", fg="#ff4444")
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
             self.force_check_button.config(state=tk.DISABLED)
+            self.profile_button.config(state=tk.DISABLED)
             
     def start_bot(self):
         """Start the Discord bot in a separate thread"""
@@ -360,6 +501,22 @@ class BotGUI:
         future = asyncio.run_coroutine_threadsafe(force_github_commit_check(), loop)
         future.add_done_callback(self.on_force_check_done)
 
+    def profile_checks(self):
+        """Profile the bot thread during the next N GitHub checks."""
+        try:
+            check_count = int(self.profile_checks_var.get())
+        except ValueError:
+            self.append_log("Enter how many checks to profile.", "warning")
+            return
+
+        loop = self.get_bot_loop()
+        if not loop:
+            self.append_log("Bot event loop is not ready yet; try again in a moment.", "warning")
+            return
+
+        # The profiler samples the thread it is started on, so start it on the bot loop.
+        loop.call_soon_threadsafe(profile_next_github_checks, check_count)
+
     def on_force_check_done(self, future):
         """Handle completion of a manual GitHub check."""
         def finish():
@@ -400,6 +557,7 @@ class BotGUI:
         """Handle window closing"""
         if self.bot_running:
             self.stop_bot()
+        bot_logging.stop_logging()
         self.root.destroy()
 
 def main():
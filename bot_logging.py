@@ -0,0 +1,110 @@
+"""Logging for the bot: per-project loggers, a rotating log file and a non-blocking queue.
+
+Every bot logger sits under the "commitsbot" logger, which only has a QueueHandler. A
+QueueListener thread passes records on to the real handlers (console, rotating file, GUI),
+so formatting and I/O never run on the event loop.
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Any, Iterable, MutableMapping, Optional, Tuple
+
+import constants
+
+ROOT_LOGGER_NAME = "commitsbot"
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+FILE_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the bot logger for one module or component."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class ProjectLoggerAdapter(logging.LoggerAdapter):
+    """Prefixes messages with the project's display name and tags records with its key."""
+
+    def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
+        kwargs.setdefault("extra", {}).update(self.extra)
+        return f"[{self.extra['project_name']}] {msg}", kwargs
+
+
+def get_project_logger(project: constants.ProjectConfig) -> ProjectLoggerAdapter:
+    """Return the logger for one monitored project; its level can be set per project key."""
+    return ProjectLoggerAdapter(
+        get_logger(f"project.{project.key}"),
+        {"project": project.key, "project_name": project.display_name},
+    )
+
+
+def create_file_handler(log_file: str) -> logging.Handler:
+    """Return a size-rotated log file handler."""
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=constants.LOG_FILE_MAX_BYTES,
+        backupCount=constants.LOG_FILE_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    return handler
+
+
+def configure_logging(
+    handlers: Optional[Iterable[logging.Handler]] = None,
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+) -> None:
+    """Route bot logging through a queue to the given handlers and the rotating log file.
+
+    Without explicit handlers, records are also written to the console. Calling this again
+    replaces the previous configuration.
+    """
+    global _listener
+    stop_logging()
+
+    if handlers is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers = [console_handler]
+
+    handlers = list(handlers)
+    log_file = constants.LOG_FILE if log_file is None else log_file
+
+    if log_file:
+        handlers.append(create_file_handler(log_file))
+
+    record_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+    root_logger.setLevel(level or constants.LOG_LEVEL)
+    root_logger.addHandler(logging.handlers.QueueHandler(record_queue))
+    root_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out queued records, then detach and close the configured handlers."""
+    global _listener
+    listener = _listener
+    _listener = None
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+
+    if listener is not None:
+        listener.stop()
+
+        for handler in listener.handlers:
+            handler.close()
+
+    root_logger.propagate = True
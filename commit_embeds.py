@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Optional
+
+import constants
+
+CHANGES_TRUNCATED_NOTICE = "- Changes truncated to fit Discord's embed limit."
+
+
+def clip_embed_text(text: str, limit: int) -> str:
+    """Return text cut to an embed length limit, marking the cut with an ellipsis."""
+    if len(text) <= limit:
+        return text
+
+    return text[:max(0, limit - 1)].rstrip() + "…"
+
+
+def get_embed_size(embed: Dict[str, Any]) -> int:
+    """Return the characters an embed counts towards Discord's per-message embed total."""
+    size = len(embed.get("title", "")) + len(embed.get("description", ""))
+    size += len((embed.get("author") or {}).get("name", ""))
+    size += len((embed.get("footer") or {}).get("text", ""))
+
+    for field in embed.get("fields", []):
+        size += len(field.get("name", "")) + len(field.get("value", ""))
+
+    return size
+
+
+def fit_embed_lines(lines: List[str], limit: int) -> str:
+    """Join lines into an embed text block, dropping whole lines past the limit."""
+    fitted_lines = []
+    length = -1  # The first line has no newline before it
+
+    for line in lines:
+        if length + 1 + len(line) > limit:
+            while fitted_lines and length + 1 + len(CHANGES_TRUNCATED_NOTICE) > limit:
+                length -= 1 + len(fitted_lines.pop())
+
+            if length + 1 + len(CHANGES_TRUNCATED_NOTICE) <= limit:
+                fitted_lines.append(CHANGES_TRUNCATED_NOTICE)
+
+            break
+
+        fitted_lines.append(line)
+        length += 1 + len(line)
+
+    return clip_embed_text("\n".join(fitted_lines), limit)
+
+
+class CommitEmbedTemplate:
+    """Renders commit embeds for one project; everything that does not vary per commit is built once."""
+
+    def __init__(self, project: constants.ProjectConfig):
+        self.commit_url_prefix = f"https://github.com/{project.repo_owner}/{project.repo_name}/commit/"
+        self.footer = {
+            "text": clip_embed_text(
+                f"New commit to {project.display_name}'s GitHub repository",
+                constants.DISCORD_EMBED_FOOTER_LIMIT,
+            )
+        }
+        self.color = constants.DISCORD_EMBED_COLOR
+
+    def render(
+        self,
+        commit_sha: str,
+        author_name: str,
+        title: str,
+        change_lines: List[str],
+        file_lines: List[str],
+        branch_name: Optional[str] = None,
+        timestamp: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return one commit as an embed dict (the discord.Embed.to_dict() layout)."""
+        embed: Dict[str, Any] = {
+            "type": "rich",
+            "title": clip_embed_text(title or "No message", constants.DISCORD_EMBED_TITLE_LIMIT),
+            "url": url or f"{self.commit_url_prefix}{commit_sha}",
+            "color": self.color,
+            "author": {"name": clip_embed_text(author_name, constants.DISCORD_EMBED_AUTHOR_LIMIT)},
+            "footer": self.footer,
+            "fields": [{"name": "Commit", "value": commit_sha[:7], "inline": True}],
+        }
+
+        if branch_name:
+            embed["fields"].append({
+                "name": "Branch",
+                "value": clip_embed_text(branch_name, constants.DISCORD_EMBED_FIELD_VALUE_LIMIT),
+                "inline": True,
+            })
+
+        if file_lines:
+            embed["fields"].append({
+                "name": "Files",
+                "value": fit_embed_lines(file_lines, constants.DISCORD_EMBED_FIELD_VALUE_LIMIT),
+                "inline": False,
+            })
+
+        if timestamp:
+            embed["timestamp"] = timestamp
+
+        if change_lines:
+            # Whatever the other parts leave of the per-embed total goes to the changes.
+            description_limit = min(
+                constants.DISCORD_EMBED_DESCRIPTION_LIMIT,
+                constants.DISCORD_EMBED_TOTAL_LIMIT - get_embed_size(embed),
+            )
+
+            if description_limit > 0:
+                embed["description"] = fit_embed_lines(change_lines, description_limit)
+
+        return embed
@@ -10,6 +10,8 @@ AVALORE_UPDATE_TIMOUT_LIMIT = 10.0
 
 # GitHub Configuration
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")  # Load from .env file
+GITHUB_API_BASE = "https://api.github.com"
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")  # Shared secret configured on the GitHub webhook
 
 
 @dataclass(frozen=True)
@@ -21,6 +23,9 @@ class ProjectConfig:
     repo_name: str
     channel_id: int  # Discord channel that receives the commit updates (0 = not configured yet)
     state_file: str  # Per-project file storing branch heads and posted SHA history
+    backend: str = "rest"  # "rest" pages the REST API; "graphql" reads all branch heads and history in one query
+    state_backend: str = "json"  # "json" rewrites state_file; "sqlite" and "journal" keep their own files next to it
+    render_mode: str = "text"  # "text" posts the code-block message; "embed" posts one rich embed per commit
 
 
 PROJECTS = (
@@ -43,6 +48,11 @@ PROJECTS = (
 )
 
 
+GITHUB_MONITOR_BACKENDS = ("rest", "graphql")
+STATE_BACKENDS = ("json", "sqlite", "journal")
+DISCORD_RENDER_MODES = ("text", "embed")
+
+
 def validate_projects(projects) -> None:
     """Reject project lists whose keys or state files collide, which would mix per-project state."""
     seen_keys = set()
@@ -52,12 +62,24 @@ def validate_projects(projects) -> None:
         if project.key in seen_keys:
             raise ValueError(f"Duplicate project key: {project.key}")
 
+        if project.backend not in GITHUB_MONITOR_BACKENDS:
+            raise ValueError(f"Unsupported backend for project {project.key}: {project.backend}")
+
+        if project.state_backend not in STATE_BACKENDS:
+            raise ValueError(f"Unsupported state_backend for project {project.key}: {project.state_backend}")
+
+        if project.render_mode not in DISCORD_RENDER_MODES:
+            raise ValueError(f"Unsupported render_mode for project {project.key}: {project.render_mode}")
+
         normalized_state_file = os.path.normcase(os.path.abspath(project.state_file))
-        if normalized_state_file in seen_state_files:
+        # Backends that store state next to state_file share its extension-less base name.
+        normalized_state_base = os.path.splitext(normalized_state_file)[0]
+        if normalized_state_file in seen_state_files or normalized_state_base in seen_state_files:
             raise ValueError(f"Duplicate project state_file: {project.state_file}")
 
         seen_keys.add(project.key)
         seen_state_files.add(normalized_state_file)
+        seen_state_files.add(normalized_state_base)
 
 
 validate_projects(PROJECTS)
@@ -71,3 +93,57 @@ GITHUB_CHECK_INTERVAL = 60  # Default: check every 1 minute (60 seconds)
 GITHUB_MAX_COMMITS_PER_BRANCH = 100  # Safety cap for one branch backfill per check
 GITHUB_POSTED_COMMITS_LIMIT = 5000  # Maximum commit SHAs kept for cross-branch dedupe
 DISCORD_MESSAGE_LIMIT = 2000  # Discord content limit for a single message
+DISCORD_BATCH_COMMIT_UPDATES = False  # Pack consecutive commit updates into as few messages as DISCORD_MESSAGE_LIMIT allows
+DISCORD_EMBEDS_PER_MESSAGE = 10  # Discord accepts at most ten embeds in one message
+DISCORD_EMBED_TOTAL_LIMIT = 6000  # Characters allowed across all embeds of one message
+DISCORD_EMBED_TITLE_LIMIT = 256  # Discord embed title limit
+DISCORD_EMBED_DESCRIPTION_LIMIT = 4096  # Discord embed description limit
+DISCORD_EMBED_FIELD_VALUE_LIMIT = 1024  # Discord embed field value limit
+DISCORD_EMBED_AUTHOR_LIMIT = 256  # Discord embed author name limit
+DISCORD_EMBED_FOOTER_LIMIT = 2048  # Discord embed footer text limit
+DISCORD_EMBED_COLOR = 0x2F81F7  # Accent color of commit embeds
+DISCORD_DELIVERY_MAX_RETRIES = 5  # Retries for a Discord send that was rate limited or failed transiently
+DISCORD_DELIVERY_RETRY_BASE_DELAY = 2.0  # Seconds before the first retry; doubles on every further retry
+DISCORD_DELIVERY_RETRY_MAX_DELAY = 60.0  # Longest wait in seconds between two delivery retries
+DISCORD_DELIVERY_SHUTDOWN_TIMEOUT = 10  # Seconds queued commit updates may keep posting while the bot shuts down
+GITHUB_HTTP_CONNECTION_LIMIT = 20  # Total pooled connections shared by every project monitor
+GITHUB_HTTP_CONNECTIONS_PER_HOST = 10  # Pooled connections kept open to api.github.com
+GITHUB_HTTP_KEEPALIVE_TIMEOUT = 75  # Seconds an idle pooled connection stays open between checks
+GITHUB_HTTP_DNS_CACHE_TTL = 300  # Seconds resolved GitHub addresses are cached
+GITHUB_HTTP_TIMEOUT = 30  # Total seconds allowed for a single GitHub request
+GITHUB_RESPONSE_CACHE_LIMIT = 100  # Polled branch/ref listing pages kept per project for conditional requests
+GITHUB_MAX_CONCURRENT_PROJECT_CHECKS = 4  # Projects checked against GitHub at the same time
+GITHUB_PROJECT_CHECK_TIMEOUT = 120  # Seconds one project's GitHub scan may take before it is abandoned
+GITHUB_MAX_CONCURRENT_COMMIT_DETAILS = 8  # Commit detail requests in flight at once during one project scan
+GITHUB_GRAPHQL_HISTORY_DEPTH = 20  # Commits fetched per branch by the GraphQL backend before falling back to REST paging
+GITHUB_RATE_LIMIT_RESERVE = 100  # Requests left untouched by scheduled checks so manual checks still work
+GITHUB_RATE_LIMIT_DEFAULT_BACKOFF = 60  # Seconds to pause when GitHub rate limits without Retry-After or reset headers
+GITHUB_ADAPTIVE_PROJECT_POLLING = True  # Poll active projects at the fastest option and back idle ones off
+GITHUB_IDLE_POLL_INTERVAL_CEILING = 900  # Longest gap in seconds between checks of an idle project
+GITHUB_WEBHOOK_ENABLED = False  # Receive GitHub push webhooks and poll only to reconcile missed events
+GITHUB_WEBHOOK_HOST = "0.0.0.0"  # Interface the webhook receiver listens on
+GITHUB_WEBHOOK_PORT = 8080  # Port GitHub delivers push webhooks to
+GITHUB_WEBHOOK_PATH = "/github/webhook"  # URL path configured as the webhook payload URL
+GITHUB_WEBHOOK_RECONCILE_INTERVAL = 900  # Seconds between reconciliation polls while webhooks are enabled
+GITHUB_WEBHOOK_MAX_PAYLOAD_COMMITS = 2048  # GitHub lists at most this many commits in a push webhook; a full list may be truncated, so a regular check reconciles it
+GITHUB_WEBHOOK_MAX_BODY_BYTES = 25 * 1024 * 1024  # Largest webhook body accepted; GitHub caps payloads at 25 MB
+METRICS_ENABLED = False  # Serve Prometheus metrics over HTTP while the bot runs
+METRICS_HOST = "127.0.0.1"  # Interface the metrics endpoint listens on; keep it local unless a scraper needs it
+METRICS_PORT = 9108  # Port the metrics endpoint listens on
+METRICS_PATH = "/metrics"  # URL path Prometheus scrapes
+TRACING_ENABLED = False  # Record timed spans of every check and delivery into TRACE_FILE
+TRACE_FILE = "traces.jsonl"  # One JSON trace tree per line; summarize it with `python tracing.py`
+TRACE_SUMMARY_LIMIT = 10  # Span names and individual spans listed by the trace summary
+PROFILER_SAMPLE_INTERVAL = 0.005  # Seconds between two stack samples of the bot thread while profiling
+PROFILE_OUTPUT_DIR = "profiles"  # Directory receiving collapsed-stack files from "Profile next N checks"
+PROFILE_TOP_FUNCTIONS = 15  # Functions listed in the log after a profile finishes
+GUI_LOG_DRAIN_INTERVAL_MS = 100  # Milliseconds between two GUI ticks that move queued log lines into the log pane
+GUI_LOG_BATCH_LINES = 500  # Log lines inserted per GUI tick; more wait for the next tick
+GUI_LOG_MAX_LINES = 5000  # Lines kept in the log pane; the oldest are trimmed
+LOG_LEVEL = "INFO"  # Lowest level logged; "DEBUG" adds per-branch "No new commits" and other routine check details
+LOG_FILE = "commitsbot.log"  # Rotating log file next to the bot; empty string disables it
+LOG_FILE_MAX_BYTES = 5_000_000  # Size at which the log file is rotated
+LOG_FILE_BACKUP_COUNT = 3  # Rotated log files kept (commitsbot.log.1 ... .3)
+GITHUB_USE_COMPARE_API = True  # Read new branch commits with one compare request, paging the commit list only as a fallback; embed projects still fetch each commit for its file list
+STATE_WRITE_BEHIND_DELAY = 5.0  # Seconds pending state changes may wait in memory before they are written
+STATE_JOURNAL_COMPACT_RECORDS = 1000  # Journal records appended after the last snapshot before it is compacted
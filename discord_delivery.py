@@ -0,0 +1,416 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+import discord
+
+import constants
+import metrics
+import tracing
+from bot_logging import get_logger
+from github_integration import (
+    GitHubCommitCheckResult,
+    GitHubCommitUpdate,
+    GitHubMonitor,
+    batch_commit_updates,
+    format_commit_update_batch,
+)
+
+ChannelLookup = Callable[[int], Optional[Any]]
+OutboxEntry = Tuple[Dict[str, str], Dict[str, str], List[GitHubCommitUpdate]]
+
+logger = get_logger("delivery")
+
+
+def build_message_kwargs(update_batch: List[GitHubCommitUpdate]) -> Dict[str, Any]:
+    """Return the channel.send() arguments that post one batch of commit updates."""
+    if update_batch[0].embed is not None:
+        return {"embeds": [discord.Embed.from_dict(update.embed) for update in update_batch]}
+
+    return {"content": format_commit_update_batch(update_batch)}
+
+
+def get_outbox_file(state_file: str) -> str:
+    """Return the outbox path that sits next to a project's state file."""
+    return f"{os.path.splitext(state_file)[0]}.outbox.json"
+
+
+class DeliveryOutbox:
+    """Persists one project's formatted commit updates until Discord has accepted all of them.
+
+    A delivery that fails or is cut short by a restart is resumed from here, so retrying costs
+    no GitHub requests and updates marked as delivered are never posted twice. Delivered SHAs
+    are appended to a small log next to the outbox instead of rewriting the outbox per batch.
+    """
+
+    def __init__(self, outbox_file: str):
+        self.outbox_file = outbox_file
+        self.delivered_file = f"{os.path.splitext(outbox_file)[0]}.delivered"
+        self._lock = threading.Lock()
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.outbox_file):
+            return None
+
+        with open(self.outbox_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_delivered(self) -> Set[str]:
+        if not os.path.exists(self.delivered_file):
+            return set()
+
+        with open(self.delivered_file, 'r', encoding='utf-8') as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _write(self, outbox: Dict[str, Any]) -> None:
+        # Write to a temp file and swap it in so an interrupted write cannot corrupt the outbox.
+        temp_file = f"{self.outbox_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(outbox, f)
+        os.replace(temp_file, self.outbox_file)
+
+    def load(self) -> Optional[OutboxEntry]:
+        """Return branch heads before and after the stored check, and its undelivered updates."""
+        try:
+            with self._lock:
+                outbox = self._read()
+                delivered_shas = self._read_delivered() if isinstance(outbox, dict) else set()
+        except Exception as e:
+            logger.error("Error reading delivery outbox: %s", e)
+            return None
+
+        if not isinstance(outbox, dict):
+            return None
+
+        pending_updates = [
+            GitHubCommitUpdate(
+                commit_sha=update["commit_sha"],
+                timestamp=update["timestamp"],
+                order=update["order"],
+                message=update["message"],
+                embed=update.get("embed"),
+            )
+            for update in outbox.get("updates", [])
+            # Outboxes written by older versions flag delivered updates inline.
+            if not update.get("delivered") and update["commit_sha"] not in delivered_shas
+        ]
+        return outbox.get("branch_state", {}), outbox.get("next_branch_state", {}), pending_updates
+
+    def store(self, commit_check: GitHubCommitCheckResult) -> None:
+        """Record a check's updates as undelivered, replacing anything stored before."""
+        outbox = {
+            "branch_state": commit_check.branch_state,
+            "next_branch_state": commit_check.next_branch_state,
+            "updates": [asdict(update) for update in commit_check.updates],
+        }
+
+        try:
+            with self._lock:
+                # Drop the previous check's delivered log before the new outbox can pair with it.
+                if os.path.exists(self.delivered_file):
+                    os.remove(self.delivered_file)
+                self._write(outbox)
+        except Exception as e:
+            logger.error("Error saving delivery outbox: %s", e)
+
+    def mark_delivered(self, commit_shas: Iterable[str]) -> None:
+        """Record updates as accepted by Discord."""
+        # Each SHA starts on a new line, so a line torn by a crash cannot swallow the next one.
+        data = "".join(f"\n{commit_sha}" for commit_sha in commit_shas)
+
+        try:
+            with self._lock:
+                if not data or not os.path.exists(self.outbox_file):
+                    return
+
+                with open(self.delivered_file, 'a', encoding='utf-8') as f:
+                    f.write(data)
+        except Exception as e:
+            logger.error("Error saving delivery outbox: %s", e)
+
+    def clear(self) -> None:
+        """Forget the stored check once it was delivered and the project state advanced."""
+        try:
+            with self._lock:
+                # The delivered log goes first so it never outlives the outbox it belongs to.
+                for path in (self.delivered_file, self.outbox_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+        except Exception as e:
+            logger.error("Error clearing delivery outbox: %s", e)
+
+
+@dataclass
+class DeliveryJob:
+    """One check's commit updates waiting to be posted to a channel."""
+    project: constants.ProjectConfig
+    monitor: GitHubMonitor
+    commit_check: GitHubCommitCheckResult
+    outbox: DeliveryOutbox
+    confirmation: asyncio.Future  # Resolves to True once every update was posted
+
+
+def get_delivery_retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Return how long to wait before retrying a failed send, or None when retrying cannot help."""
+    backoff_delay = min(
+        float(constants.DISCORD_DELIVERY_RETRY_MAX_DELAY),
+        float(constants.DISCORD_DELIVERY_RETRY_BASE_DELAY) * (2 ** attempt),
+    )
+
+    if isinstance(error, discord.RateLimited):
+        return max(0.0, float(error.retry_after))
+
+    if isinstance(error, discord.HTTPException):
+        # Missing access, unknown channel, invalid content and the like fail the same way every time.
+        if error.status != 429 and error.status < 500:
+            return None
+
+        return backoff_delay
+
+    if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+        return backoff_delay
+
+    return None
+
+
+class ChannelDeliveryQueue:
+    """Posts queued commit updates to one Discord channel from a single dispatcher task.
+
+    Discord rate-limits message sends per channel, so one dispatcher per channel keeps posts in
+    order and lets a rate-limited channel wait without holding up any other channel or check.
+    """
+
+    def __init__(self, channel_id: int, get_channel: ChannelLookup):
+        self.channel_id = channel_id
+        self.get_channel = get_channel
+        self.queue: "asyncio.Queue[DeliveryJob]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, job: DeliveryJob) -> None:
+        """Queue a job, starting the dispatcher task if it is not running."""
+        self.queue.put_nowait(job)
+        metrics.DELIVERY_QUEUE_DEPTH.inc(channel=self.channel_id)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def join(self) -> None:
+        """Wait until every queued job has been handled."""
+        await self.queue.join()
+
+    async def stop(self) -> None:
+        """Stop the dispatcher; jobs that were not posted resolve as undelivered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        while not self.queue.empty():
+            self._confirm(self.queue.get_nowait(), False)
+            self._job_done()
+
+    async def _dispatch(self) -> None:
+        while True:
+            job = await self.queue.get()
+            delivered = False
+
+            try:
+                delivered = await self._deliver(job)
+            except asyncio.CancelledError:
+                self._confirm(job, False)
+                self._job_done()
+                raise
+            except Exception as e:
+                job.monitor.logger.exception("Error delivering commit updates: %s", e)
+
+            self._confirm(job, delivered)
+            self._job_done()
+
+    def _job_done(self) -> None:
+        self.queue.task_done()
+        metrics.DELIVERY_QUEUE_DEPTH.dec(channel=self.channel_id)
+
+    @staticmethod
+    def _confirm(job: DeliveryJob, delivered: bool) -> None:
+        if not job.confirmation.done():
+            job.confirmation.set_result(delivered)
+
+    async def _deliver(self, job: DeliveryJob) -> bool:
+        """Post one job, traced as its own trace since the dispatcher outlives the check that queued it."""
+        with tracing.start_trace(
+            "discord.deliver",
+            project=job.project.key,
+            channel=self.channel_id,
+            updates=len(job.commit_check.updates),
+        ):
+            return await self._deliver_updates(job)
+
+    async def _deliver_updates(self, job: DeliveryJob) -> bool:
+        """Post one job and advance the owning monitor's state as its messages go out."""
+        project, monitor, commit_check, outbox = job.project, job.monitor, job.commit_check, job.outbox
+        channel = self.get_channel(self.channel_id)
+
+        if channel is None:
+            monitor.logger.error("Updates channel %s not found or is not a text channel.", self.channel_id)
+            return False
+
+        # Another job for the same project may have posted some of these commits already.
+        _, live_posted_commits, _, _ = monitor.state_store.load_live()
+        updates = [update for update in commit_check.updates if update.commit_sha not in live_posted_commits]
+
+        # Embeds are always batched: ten of them share one API call.
+        if constants.DISCORD_BATCH_COMMIT_UPDATES or project.render_mode == "embed":
+            update_batches = batch_commit_updates(updates)
+        else:
+            update_batches = [[commit_update] for commit_update in updates]
+
+        try:
+            # Send every queued commit update in chronological order.
+            for update_batch in update_batches:
+                await self._send_with_retry(channel, build_message_kwargs(update_batch), monitor)
+
+                # Only commits whose message went out count as posted.
+                for commit_update in update_batch:
+                    monitor.record_posted_commit(
+                        commit_update.commit_sha,
+                        commit_check.branch_state,
+                        commit_check.posted_commits,
+                    )
+
+                await asyncio.to_thread(
+                    outbox.mark_delivered,
+                    [commit_update.commit_sha for commit_update in update_batch],
+                )
+        except Exception as e:
+            monitor.logger.error(
+                "Error sending commit update to Discord: %s; the rest stay in the outbox for the next check.",
+                e,
+            )
+            await monitor.flush_state()
+            return False
+
+        monitor.save_processed_commits(
+            commit_check.next_branch_state,
+            commit_check.posted_commits,
+        )
+        await monitor.flush_state()
+        await asyncio.to_thread(outbox.clear)
+
+        if updates:
+            monitor.logger.info("Posted %s new commit update(s) to Discord.", len(updates))
+        return True
+
+    async def _send_with_retry(
+        self,
+        channel: Any,
+        message_kwargs: Dict[str, Any],
+        monitor: GitHubMonitor,
+    ) -> None:
+        """Send one message, retrying rate limits and transient failures with backoff."""
+        project = monitor.project
+        max_retries = max(0, int(constants.DISCORD_DELIVERY_MAX_RETRIES))
+
+        for attempt in range(max_retries + 1):
+            started_at = time.perf_counter()
+
+            try:
+                with tracing.span("discord.send", attempt=attempt):
+                    await channel.send(**message_kwargs)
+                metrics.DISCORD_SEND_DURATION.observe(time.perf_counter() - started_at, project=project.key)
+                return
+            except Exception as e:
+                metrics.DISCORD_SEND_ERRORS.inc(project=project.key)
+                retry_delay = get_delivery_retry_delay(e, attempt)
+
+                if retry_delay is None or attempt >= max_retries:
+                    raise
+
+                monitor.logger.warning(
+                    "Sending commit update failed (%s); retrying in %.1f seconds.",
+                    e,
+                    retry_delay,
+                )
+                await asyncio.sleep(retry_delay)
+
+
+class DiscordDeliveryDispatcher:
+    """Routes commit updates to one delivery queue per Discord channel."""
+
+    def __init__(self, get_channel: ChannelLookup):
+        self.get_channel = get_channel
+        self._queues: Dict[int, ChannelDeliveryQueue] = {}
+        self._outboxes: Dict[str, DeliveryOutbox] = {}
+
+    def get_outbox(self, project: constants.ProjectConfig) -> DeliveryOutbox:
+        """Return the outbox that persists a project's undelivered updates."""
+        outbox = self._outboxes.get(project.key)
+        if outbox is None:
+            outbox = DeliveryOutbox(get_outbox_file(project.state_file))
+            self._outboxes[project.key] = outbox
+        return outbox
+
+    async def submit(
+        self,
+        project: constants.ProjectConfig,
+        monitor: GitHubMonitor,
+        commit_check: GitHubCommitCheckResult,
+    ) -> asyncio.Future:
+        """Queue a check's updates; the returned future resolves once they were delivered (or not)."""
+        outbox = self.get_outbox(project)
+        await asyncio.to_thread(outbox.store, commit_check)
+        return self._enqueue(project, monitor, commit_check, outbox)
+
+    async def resume(self, project: constants.ProjectConfig, monitor: GitHubMonitor) -> Optional[asyncio.Future]:
+        """Queue the updates left in a project's outbox; return None when it holds nothing to post."""
+        outbox = self.get_outbox(project)
+        outbox_entry = await asyncio.to_thread(outbox.load)
+
+        if outbox_entry is None:
+            return None
+
+        branch_state, next_branch_state, pending_updates = outbox_entry
+        _, posted_commits, _, _ = monitor.state_store.load_live()
+        # The posted history also catches updates sent just before a crash but not yet flagged.
+        pending_updates = [update for update in pending_updates if update.commit_sha not in posted_commits]
+        commit_check = GitHubCommitCheckResult(pending_updates, branch_state, next_branch_state, posted_commits)
+
+        if not pending_updates:
+            monitor.save_processed_commits(next_branch_state, posted_commits)
+            await monitor.flush_state()
+            await asyncio.to_thread(outbox.clear)
+            return None
+
+        monitor.logger.info("Resuming delivery of %s commit update(s) from the outbox.", len(pending_updates))
+        return self._enqueue(project, monitor, commit_check, outbox)
+
+    def _enqueue(
+        self,
+        project: constants.ProjectConfig,
+        monitor: GitHubMonitor,
+        commit_check: GitHubCommitCheckResult,
+        outbox: DeliveryOutbox,
+    ) -> asyncio.Future:
+        channel_queue = self._queues.get(project.channel_id)
+
+        if channel_queue is None:
+            channel_queue = ChannelDeliveryQueue(project.channel_id, self.get_channel)
+            self._queues[project.channel_id] = channel_queue
+
+        confirmation = asyncio.get_running_loop().create_future()
+        channel_queue.submit(DeliveryJob(project, monitor, commit_check, outbox, confirmation))
+        return confirmation
+
+    async def join(self) -> None:
+        """Wait until every channel queue is empty."""
+        await asyncio.gather(*(channel_queue.join() for channel_queue in list(self._queues.values())))
+
+    async def stop(self) -> None:
+        """Stop every channel dispatcher."""
+        channel_queues = list(self._queues.values())
+        self._queues.clear()
+        await asyncio.gather(*(channel_queue.stop() for channel_queue in channel_queues))
@@ -1,11 +1,26 @@
 import aiohttp
+import asyncio
 import constants
-import json
 import re
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple
-import os
+from typing import Optional, Dict, Any, Iterable, List, Tuple, AsyncIterator, Mapping
+import time
+from urllib.parse import quote
+
+import metrics
+import tracing
+from bot_logging import get_project_logger
+from commit_embeds import CommitEmbedTemplate, get_embed_size
+from state_store import (
+    CachedStateStore,
+    PostedCommitHistory,
+    create_state_store,
+    normalize_commit_sha,
+    normalize_posted_commits,
+)
 
 
 @dataclass
@@ -14,6 +29,7 @@ class GitHubCommitUpdate:
     timestamp: str
     order: int
     message: str
+    embed: Optional[Dict[str, Any]] = None  # Set in embed render mode; message is then a one-line summary
 
 
 @dataclass
@@ -21,24 +37,230 @@ class GitHubCommitCheckResult:
     updates: List[GitHubCommitUpdate]
     branch_state: Dict[str, str]
     next_branch_state: Dict[str, str]
-    posted_commits: List[str]
+    posted_commits: Iterable[str]
     should_save_state: bool = True
 
     @property
     def messages(self) -> List[str]:
         return [update.message for update in self.updates]
 
+    @property
+    def has_new_activity(self) -> Optional[bool]:
+        """Return whether any branch head moved, or None when this check cannot tell."""
+        if not self.branch_state or not self.next_branch_state:
+            return None
+
+        return self.next_branch_state != self.branch_state
+
+
+def batch_commit_updates(
+    updates: List[GitHubCommitUpdate],
+    message_limit: Optional[int] = None,
+) -> List[List[GitHubCommitUpdate]]:
+    """Group consecutive updates so each group fits into one Discord message.
+
+    Text updates share the message content; embed updates share the message's embed slots.
+    """
+    message_limit = constants.DISCORD_MESSAGE_LIMIT if message_limit is None else message_limit
+    batches: List[List[GitHubCommitUpdate]] = []
+    batch_length = 0
+
+    for update in updates:
+        if update.embed is not None:
+            update_length = joined_length = get_embed_size(update.embed)
+            fits = (
+                bool(batches)
+                and batches[-1][-1].embed is not None
+                and len(batches[-1]) < constants.DISCORD_EMBEDS_PER_MESSAGE
+                and batch_length + joined_length <= constants.DISCORD_EMBED_TOTAL_LIMIT
+            )
+        else:
+            # Messages in a batch are joined by one newline.
+            update_length = len(update.message)
+            joined_length = update_length + 1
+            fits = (
+                bool(batches)
+                and batches[-1][-1].embed is None
+                and batch_length + joined_length <= message_limit
+            )
+
+        if fits:
+            batches[-1].append(update)
+            batch_length += joined_length
+            continue
+
+        batches.append([update])
+        batch_length = update_length
+
+    return batches
+
+
+def format_commit_update_batch(batch: List[GitHubCommitUpdate]) -> str:
+    """Return the Discord message for one batch of commit updates."""
+    return "\n".join(update.message for update in batch)
+
+
+ResponseCacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+@dataclass
+class GitHubCachedResponse:
+    """Validators and parsed body of a GitHub response, reused when GitHub answers 304."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    data: Any
+
+
+@dataclass
+class GitHubRateLimitBudget:
+    """The state of one GitHub rate-limit resource, e.g. "core" (REST) or "graphql"."""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: Optional[float] = None  # Epoch seconds when the current window resets
+    blocked_until: float = 0.0  # Epoch seconds before which no request should be sent
+    requests_since_last_plan: int = 0  # Requests counted against this budget since take_request_counts()
+
+
+class GitHubRateLimiter:
+    """Tracks GitHub rate-limit headers shared by every monitor that uses the same token.
+
+    GitHub meters REST ("core") and GraphQL requests against separate budgets, named by the
+    X-RateLimit-Resource header, so each resource is tracked and backed off on its own.
+    """
+
+    def __init__(self):
+        self.budgets: Dict[str, GitHubRateLimitBudget] = {}
+        self.not_modified_since_last_plan = 0  # 304 answers, which GitHub does not count
+
+    def get_budget(self, resource: str = "core") -> GitHubRateLimitBudget:
+        """Return the budget tracked for a rate-limit resource, creating it on first use."""
+        budget = self.budgets.get(resource)
+        if budget is None:
+            budget = self.budgets[resource] = GitHubRateLimitBudget()
+        return budget
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Return the fewest requests left in any known budget."""
+        known = [budget.remaining for budget in self.budgets.values() if budget.remaining is not None]
+        return min(known) if known else None
+
+    def is_blocked(self, resource: str = "core") -> bool:
+        """Return True while a rate-limit or Retry-After backoff is in effect for the resource."""
+        return self.seconds_until_available(resource) > 0
+
+    def seconds_until_available(self, resource: str = "core") -> float:
+        """Return how long requests for the resource must wait before GitHub accepts them again."""
+        return max(0.0, self.get_budget(resource).blocked_until - time.time())
+
+    def record_response(self, status: int, headers: Mapping[str, str], resource: str = "core") -> None:
+        """Update a budget from a GitHub response and start a backoff when it was rate limited.
+
+        The response's X-RateLimit-Resource header wins over the resource the request was made for.
+        """
+        now = time.time()
+        resource = headers.get("X-RateLimit-Resource") or resource
+        budget = self.get_budget(resource)
+
+        if status == 304:
+            self.not_modified_since_last_plan += 1
+        else:
+            budget.requests_since_last_plan += 1
+
+        limit = self._parse_number(headers.get("X-RateLimit-Limit"))
+        remaining = self._parse_number(headers.get("X-RateLimit-Remaining"))
+        reset_at = self._parse_number(headers.get("X-RateLimit-Reset"))
+        retry_after = self._parse_number(headers.get("Retry-After"))
+
+        if limit is not None:
+            budget.limit = int(limit)
+        if remaining is not None:
+            budget.remaining = int(remaining)
+            metrics.GITHUB_RATE_LIMIT_REMAINING.set(budget.remaining, resource=resource)
+        if reset_at is not None:
+            budget.reset_at = reset_at
+            metrics.GITHUB_RATE_LIMIT_RESET.set(reset_at, resource=resource)
+
+        if status not in (403, 429):
+            return
+
+        if retry_after is not None:
+            # Secondary rate limits tell us exactly how long to wait.
+            budget.blocked_until = max(budget.blocked_until, now + retry_after)
+        elif remaining == 0 and reset_at is not None:
+            budget.blocked_until = max(budget.blocked_until, reset_at)
+        elif status == 429 or remaining == 0:
+            budget.blocked_until = max(budget.blocked_until, now + constants.GITHUB_RATE_LIMIT_DEFAULT_BACKOFF)
+
+    def take_request_counts(self) -> Dict[str, int]:
+        """Return the requests counted per resource since the last call and start a new count."""
+        request_counts = {}
+
+        for resource, budget in self.budgets.items():
+            if budget.requests_since_last_plan:
+                request_counts[resource] = budget.requests_since_last_plan
+            budget.requests_since_last_plan = 0
+
+        self.not_modified_since_last_plan = 0
+        return request_counts
+
+    def recommend_interval(self, base_interval: int, requests_per_check: Mapping[str, int]) -> int:
+        """Return the shortest interval at or above base_interval that every budget can sustain."""
+        base_interval = int(base_interval)
+        interval = base_interval
+
+        for resource, budget in self.budgets.items():
+            if self.is_blocked(resource):
+                interval = max(interval, int(self.seconds_until_available(resource)) + 1)
+                continue
+
+            resource_requests = requests_per_check.get(resource, 0)
+
+            if budget.remaining is None or budget.reset_at is None or resource_requests <= 0:
+                continue
+
+            seconds_to_reset = max(1.0, budget.reset_at - time.time())
+            usable_requests = budget.remaining - max(0, int(constants.GITHUB_RATE_LIMIT_RESERVE))
+
+            if usable_requests < resource_requests:
+                interval = max(interval, int(seconds_to_reset) + 1)
+                continue
+
+            affordable_checks = usable_requests / resource_requests
+            interval = max(interval, int(seconds_to_reset / affordable_checks) + 1)
+
+        return interval
+
+    def _parse_number(self, value: Optional[str]) -> Optional[float]:
+        """Return a numeric header value, ignoring missing or malformed headers."""
+        if value is None:
+            return None
+
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
 
 class GitHubMonitor:
     """Monitors GitHub repository for new commits and formats update messages."""
 
     _bullet_prefix_pattern = re.compile(r"^\s*(?:(?:[-*\u2022\u2013\u2014])\s+|\d+[\.)]\s+)")
+    rate_limit_resource = "core"  # GitHub rate-limit budget that branch listing draws from
     
-    def __init__(self, project: Optional[constants.ProjectConfig] = None):
+    def __init__(
+        self,
+        project: Optional[constants.ProjectConfig] = None,
+        api_base: Optional[str] = None,
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+    ):
         self.project = project if project is not None else constants.PROJECTS[0]
         self.state_file = self.project.state_file
-        self.log_prefix = f"[{self.project.display_name}] "
-        self.api_base = "https://api.github.com"
+        # Branch heads and posted history live in memory; the backend is written behind.
+        self.state_store = CachedStateStore(create_state_store(self.project), name=self.project.key)
+        self.embed_template = CommitEmbedTemplate(self.project) if self.project.render_mode == "embed" else None
+        self.logger = get_project_logger(self.project)
+        self.api_base = (api_base or constants.GITHUB_API_BASE).rstrip("/")
         self.repo_url = f"{self.api_base}/repos/{self.project.repo_owner}/{self.project.repo_name}"
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -47,6 +269,24 @@ class GitHubMonitor:
         # Remove Authorization header if no token is provided
         if not constants.GITHUB_TOKEN:
             del self.headers["Authorization"]
+        self.session: Optional[aiohttp.ClientSession] = None  # Shared pooled session owned by the bot
+        self.rate_limiter = rate_limiter if rate_limiter is not None else GitHubRateLimiter()
+        # Conditional-request cache keyed by URL and query params, oldest entries evicted first
+        self._response_cache: "OrderedDict[ResponseCacheKey, GitHubCachedResponse]" = OrderedDict()
+
+    def attach_session(self, session: Optional[aiohttp.ClientSession]) -> None:
+        """Reuse a long-lived pooled session for every GitHub request made by this monitor."""
+        self.session = session
+
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the shared session, or a short-lived one when no shared session is attached."""
+        if self.session is not None and not self.session.closed:
+            yield self.session
+            return
+
+        async with aiohttp.ClientSession() as session:
+            yield session
     
     def get_last_processed_commit(self) -> Optional[str]:
         """Read the last processed commit SHA from file."""
@@ -73,113 +313,78 @@ class GitHubMonitor:
         return branch_state, legacy_sha
 
     def get_processed_commit_state(self) -> Tuple[Dict[str, str], List[str], Optional[str], bool]:
-        """Read branch-aware state, posted SHA history, and legacy single-SHA files."""
-        try:
-            if not os.path.exists(self.state_file):
-                return {}, [], None, False
-
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-
-            if not content:
-                return {}, [], None, False
-
-            try:
-                state = json.loads(content)
-            except json.JSONDecodeError:
-                return {}, [], self._normalize_commit_sha(content) or None, False
-
-            if isinstance(state, str):
-                return {}, [], self._normalize_commit_sha(state) or None, False
-
-            if not isinstance(state, dict):
-                return {}, [], None, False
-
-            raw_branches = state.get("branches")
-            if raw_branches is None:
-                raw_branches = {
-                    branch_name: commit_sha
-                    for branch_name, commit_sha in state.items()
-                    if branch_name != "posted_commits"
-                }
-
-            if not isinstance(raw_branches, dict):
-                raw_branches = {}
-
-            branch_state = {}
-            for branch_name, commit_sha in raw_branches.items():
-                if not isinstance(branch_name, str) or not isinstance(commit_sha, str):
-                    continue
-
-                branch_name = branch_name.strip()
-                commit_sha = self._normalize_commit_sha(commit_sha)
+        """Return branch-aware state, posted SHA history, and legacy single-SHA files.
 
-                if branch_name and commit_sha:
-                    branch_state[branch_name] = commit_sha
-
-            posted_commits_present = isinstance(state.get("posted_commits"), list)
-            posted_commits = self._normalize_posted_commits(state.get("posted_commits", []))
-
-            return branch_state, posted_commits, None, posted_commits_present
-        except Exception as e:
-            print(f"Error reading last commit file: {e}")
-            return {}, [], None, False
+        The state file is read once; afterwards the in-memory copy is the source of truth.
+        """
+        return self.state_store.load()
 
     def save_processed_commits(
         self,
         branch_state: Dict[str, str],
-        posted_commits: Optional[List[str]] = None,
+        posted_commits: Optional[Iterable[str]] = None,
     ) -> None:
         """Save branch-aware commit state to file."""
-        try:
-            normalized_state = {
-                branch_name: self._normalize_commit_sha(commit_sha)
-                for branch_name, commit_sha in sorted(branch_state.items())
-                if branch_name and self._normalize_commit_sha(commit_sha)
-            }
-            state = {
-                "branches": normalized_state,
-                "posted_commits": self._normalize_posted_commits(posted_commits or []),
-            }
+        self.state_store.save(branch_state, [] if posted_commits is None else posted_commits)
 
-            # Write to a temp file and swap it in so an interrupted write cannot corrupt the state.
-            temp_file = f"{self.state_file}.tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2)
-            os.replace(temp_file, self.state_file)
-        except Exception as e:
-            print(f"Error saving last commit file: {e}")
+    def record_posted_commit(
+        self,
+        commit_sha: str,
+        branch_state: Dict[str, str],
+        posted_commits: Iterable[str],
+    ) -> None:
+        """Add one delivered commit to the posted history of the check it came from."""
+        self.state_store.record_posted_commits([commit_sha], branch_state, posted_commits)
+
+    async def flush_state(self) -> None:
+        """Write pending state changes without blocking the event loop."""
+        await self.state_store.flush()
 
     def _normalize_commit_sha(self, commit_sha: Any) -> str:
         """Return a normalized commit SHA for exact-match dedupe."""
-        if not isinstance(commit_sha, str):
-            return ""
-
-        return commit_sha.strip().lower()
+        return normalize_commit_sha(commit_sha)
 
     def _normalize_posted_commits(self, posted_commits: Any) -> List[str]:
         """Return unique posted commit SHAs, preserving order and applying the state cap."""
-        if not isinstance(posted_commits, list):
-            return []
+        return normalize_posted_commits(posted_commits)
 
-        normalized_commits = []
-        seen_commits = set()
+    def _response_cache_key(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+    ) -> ResponseCacheKey:
+        """Return a stable cache key for a GitHub GET request."""
+        return url, tuple(sorted((str(key), str(value)) for key, value in (params or {}).items()))
 
-        for commit_sha in posted_commits:
-            normalized_sha = self._normalize_commit_sha(commit_sha)
+    def _get_cached_response(self, cache_key: ResponseCacheKey) -> Optional[GitHubCachedResponse]:
+        """Return a cached response and mark it as recently used."""
+        cached_response = self._response_cache.get(cache_key)
 
-            if not normalized_sha or normalized_sha in seen_commits:
-                continue
+        if cached_response is not None:
+            self._response_cache.move_to_end(cache_key)
 
-            normalized_commits.append(normalized_sha)
-            seen_commits.add(normalized_sha)
+        return cached_response
 
-        commit_limit = max(0, int(constants.GITHUB_POSTED_COMMITS_LIMIT))
+    def _store_cached_response(
+        self,
+        cache_key: ResponseCacheKey,
+        response: aiohttp.ClientResponse,
+        data: Any,
+    ) -> None:
+        """Remember a response's validators so the next request can be conditional."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        cache_limit = max(0, int(constants.GITHUB_RESPONSE_CACHE_LIMIT))
+
+        if not cache_limit or (not etag and not last_modified):
+            self._response_cache.pop(cache_key, None)
+            return
 
-        if not commit_limit:
-            return []
+        self._response_cache[cache_key] = GitHubCachedResponse(etag, last_modified, data)
+        self._response_cache.move_to_end(cache_key)
 
-        return normalized_commits[-commit_limit:]
+        while len(self._response_cache) > cache_limit:
+            self._response_cache.popitem(last=False)
 
     async def _fetch_json(
         self,
@@ -187,28 +392,75 @@ class GitHubMonitor:
         url: str,
         params: Optional[Dict[str, Any]] = None,
         context: str = "GitHub API",
+        missing_ok: bool = False,
+        conditional: bool = False,
     ) -> Optional[Any]:
-        """Fetch JSON from GitHub and print consistent diagnostics."""
+        """Fetch JSON from GitHub and print consistent diagnostics.
+
+        With conditional, meant for listings polled every check, the response is cached and
+        later requests are sent with If-None-Match/If-Modified-Since; a 304 answer (which
+        GitHub does not count against the rate limit) reuses the cached body. Fetch-once
+        responses (commit details, compares, commit pages) are never cached. With missing_ok,
+        a 404 is an expected answer (e.g. an unknown compare base) and is not reported.
+        """
+        cache_key = self._response_cache_key(url, params)
+        cached_response = self._get_cached_response(cache_key) if conditional else None
+        headers = dict(self.headers)
+
+        if cached_response is not None:
+            if cached_response.etag:
+                headers["If-None-Match"] = cached_response.etag
+            if cached_response.last_modified:
+                headers["If-Modified-Since"] = cached_response.last_modified
+
+        if self.rate_limiter.is_blocked():
+            self.logger.warning(
+                "GitHub rate limit backoff active; skipping %s for %d more seconds.",
+                context,
+                self.rate_limiter.seconds_until_available(),
+            )
+            return None
+
+        request_status = "error"
+
         try:
-            async with session.get(url, headers=self.headers, params=params) as response:
+            async with session.get(url, headers=headers, params=params) as response:
+                request_status = str(response.status)
+                self.rate_limiter.record_response(response.status, response.headers)
+
+                if response.status == 304 and cached_response is not None:
+                    return cached_response.data
+
                 if response.status == 200:
-                    return await response.json()
+                    data = await response.json()
+                    if conditional:
+                        self._store_cached_response(cache_key, response, data)
+                    return data
 
                 if response.status == 401:
-                    print("GitHub API authentication failed. Please check your token.")
+                    self.logger.error("GitHub API authentication failed. Please check your token.")
                 elif response.status == 404:
-                    print("Repository not found. Please check the repository name and your access.")
+                    if not missing_ok:
+                        self.logger.error("Repository not found. Please check the repository name and your access.")
+                elif self.rate_limiter.is_blocked():
+                    self.logger.warning(
+                        "%s was rate limited by GitHub; pausing requests for %d seconds.",
+                        context,
+                        self.rate_limiter.seconds_until_available(),
+                    )
                 else:
-                    print(f"{context} error: {response.status}")
+                    self.logger.error("%s error: %s", context, response.status)
         except Exception as e:
-            print(f"Error during {context}: {e}")
+            self.logger.error("Error during %s: %s", context, e)
+        finally:
+            metrics.GITHUB_REQUESTS.inc(project=self.project.key, status=request_status)
 
         return None
     
     async def get_latest_commit(self) -> Optional[Dict[str, Any]]:
         """Fetch the latest commit from the GitHub repository."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._session_scope() as session:
                 commits = await self._fetch_json(
                     session,
                     f"{self.repo_url}/commits",
@@ -219,24 +471,30 @@ class GitHubMonitor:
                 if commits:
                     return commits[0]
         except Exception as e:
-            print(f"Error fetching latest commit: {e}")
+            self.logger.error("Error fetching latest commit: %s", e)
         return None
 
+    @tracing.traced("github.get_branches")
     async def get_branches(self) -> List[Dict[str, Any]]:
         """Fetch all repository branches."""
         branches = []
         page = 1
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._session_scope() as session:
                 while True:
                     branch_page = await self._fetch_json(
                         session,
                         f"{self.repo_url}/branches",
                         params={"per_page": 100, "page": page},
                         context="fetching branches",
+                        conditional=True,
                     )
 
+                    if branch_page is None:
+                        # A partial listing would drop the missing branches from the saved state.
+                        return []
+
                     if not branch_page:
                         break
 
@@ -247,10 +505,48 @@ class GitHubMonitor:
 
                     page += 1
         except Exception as e:
-            print(f"Error fetching branches: {e}")
+            self.logger.error("Error fetching branches: %s", e)
 
         return branches
     
+    @tracing.traced("github.get_branch_heads")
+    async def get_branch_heads(self) -> Optional[Dict[str, str]]:
+        """Fetch every branch head SHA from the git refs API, or None if it could not be read."""
+        branch_heads = {}
+        page = 1
+
+        try:
+            async with self._session_scope() as session:
+                while True:
+                    ref_page = await self._fetch_json(
+                        session,
+                        f"{self.repo_url}/git/matching-refs/heads",
+                        params={"per_page": 100, "page": page},
+                        context="fetching branch heads",
+                        conditional=True,
+                    )
+
+                    if not isinstance(ref_page, list):
+                        return None
+
+                    for ref_data in ref_page:
+                        ref_name = ref_data.get("ref", "")
+                        head_sha = self._normalize_commit_sha((ref_data.get("object") or {}).get("sha"))
+
+                        if ref_name.startswith("refs/heads/") and head_sha:
+                            branch_heads[ref_name[len("refs/heads/"):]] = head_sha
+
+                    if len(ref_page) < 100:
+                        break
+
+                    page += 1
+        except Exception as e:
+            self.logger.error("Error fetching branch heads: %s", e)
+            return None
+
+        return branch_heads
+
+    @tracing.traced("github.get_commit_details")
     async def get_commit_details(
         self,
         commit_sha: str,
@@ -265,23 +561,43 @@ class GitHubMonitor:
             )
 
         try:
-            async with aiohttp.ClientSession() as new_session:
+            async with self._session_scope() as new_session:
                 return await self._fetch_json(
                     new_session,
                     f"{self.repo_url}/commits/{commit_sha}",
                     context=f"fetching commit {commit_sha[:7]}",
                 )
         except Exception as e:
-            print(f"Error fetching commit details: {e}")
+            self.logger.error("Error fetching commit details: %s", e)
         return None
 
+    @tracing.traced("github.get_commit_details_batch")
+    async def get_commit_details_batch(
+        self,
+        commit_shas: List[str],
+        session: aiohttp.ClientSession,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Fetch details for several commits concurrently, returned in the order requested."""
+        detail_slots = asyncio.Semaphore(max(1, int(constants.GITHUB_MAX_CONCURRENT_COMMIT_DETAILS)))
+
+        async def fetch_details(commit_sha: str) -> Optional[Dict[str, Any]]:
+            async with detail_slots:
+                try:
+                    return await self.get_commit_details(commit_sha, session=session)
+                except Exception as e:
+                    self.logger.error("Error fetching commit details: %s", e)
+                    return None
+
+        return list(await asyncio.gather(*(fetch_details(commit_sha) for commit_sha in commit_shas)))
+
+    @tracing.traced("github.get_branch_commits_since")
     async def get_branch_commits_since(
         self,
         session: aiohttp.ClientSession,
         branch_name: str,
         last_processed_sha: str,
-    ) -> Tuple[List[Dict[str, Any]], bool]:
-        """Fetch branch commits newer than the saved SHA."""
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Fetch branch commits newer than the saved SHA, or None when a page could not be fetched."""
         commits = []
         page = 1
         max_commits = constants.GITHUB_MAX_COMMITS_PER_BRANCH
@@ -295,6 +611,10 @@ class GitHubMonitor:
                 context=f"fetching commits for branch {branch_name}",
             )
 
+            if commit_page is None:
+                # A failed or rate-limited page must not read as "no new commits".
+                return None
+
             if not commit_page:
                 break
 
@@ -316,6 +636,53 @@ class GitHubMonitor:
 
         return commits, False
 
+    @tracing.traced("github.get_compare_commits")
+    async def get_compare_commits(
+        self,
+        session: aiohttp.ClientSession,
+        branch_name: str,
+        base_sha: str,
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Fetch the commits a branch gained since base_sha with one compare request.
+
+        Returns commits newest first plus whether base_sha is an ancestor of the branch, or
+        None when the compare cannot answer (unknown base, more commits than one response
+        holds) and the caller should page the commit list instead.
+        """
+        comparison = await self._fetch_json(
+            session,
+            f"{self.repo_url}/compare/{base_sha}...{quote(branch_name, safe='')}",
+            params={"per_page": 100},
+            context=f"comparing {base_sha[:7]} with branch {branch_name}",
+            missing_ok=True,
+        )
+
+        if not isinstance(comparison, dict) or not isinstance(comparison.get("commits"), list):
+            return None
+
+        status = comparison.get("status")
+        commits = comparison["commits"]
+
+        if status in ("identical", "behind"):
+            return [], True
+
+        if int(comparison.get("total_commits") or 0) > len(commits):
+            return None
+
+        # Compare lists oldest first; callers expect the commit-list order (newest first).
+        commits = list(reversed(commits))[:constants.GITHUB_MAX_COMMITS_PER_BRANCH]
+
+        if status == "diverged":
+            self.logger.info(
+                "Branch %s was force-pushed; posting %d commit(s) since it diverged from %s.",
+                branch_name,
+                len(commits),
+                base_sha[:7],
+            )
+            return commits, False
+
+        return commits, True
+
     async def get_recent_commits_for_ref(
         self,
         session: aiohttp.ClientSession,
@@ -347,12 +714,13 @@ class GitHubMonitor:
 
         return commits[:max_commits]
 
+    @tracing.traced("github.seed_posted_commits")
     async def seed_posted_commits_from_branch_state(
         self,
         session: aiohttp.ClientSession,
         branch_state: Dict[str, str],
         legacy_sha: Optional[str] = None,
-    ) -> List[str]:
+    ) -> PostedCommitHistory:
         """Build initial posted-SHA history from existing tracked branch heads."""
         seeded_commits = []
         seen_commits = set()
@@ -381,14 +749,15 @@ class GitHubMonitor:
                 add_commit_sha(commit_data.get('sha'))
 
             if commits:
-                print(
-                    f"{self.log_prefix}Seeded {len(commits)} recent posted commit SHA(s) "
-                    f"from tracked branch {branch_name}."
+                self.logger.info(
+                    "Seeded %d recent posted commit SHA(s) from tracked branch %s.",
+                    len(commits),
+                    branch_name,
                 )
             else:
                 add_commit_sha(normalized_head_sha)
 
-        return self._normalize_posted_commits(seeded_commits)
+        return PostedCommitHistory(seeded_commits)
     
     def format_commit_message(self, commit_data: Dict[str, Any], branch_name: Optional[str] = None) -> str:
         """Format commit data into a Discord-friendly message."""
@@ -435,34 +804,78 @@ class GitHubMonitor:
 
             return self._fit_commit_message(formatted_lines, change_lines)
         except Exception as e:
-            print(f"Error formatting commit message: {e}")
+            self.logger.error("Error formatting commit message: %s", e)
             return "Failed to format commit message."
 
+    def format_commit_embed(self, commit_data: Dict[str, Any], branch_name: Optional[str] = None) -> Dict[str, Any]:
+        """Render commit data with the project's embed template."""
+        commit_info = commit_data.get('commit', {})
+        commit_message = commit_info.get('message', 'No message')
+        message_lines = commit_message.split('\n', 1)
+        body = message_lines[1].strip() if len(message_lines) > 1 else ""
+
+        return self.embed_template.render(
+            commit_sha=commit_data.get('sha', ''),
+            author_name=commit_info.get('author', {}).get('name', 'Unknown'),
+            title=message_lines[0],
+            change_lines=self._format_commit_body(body) if body else [],
+            file_lines=self._format_file_changes(commit_data['files']) if commit_data.get('files') else [],
+            branch_name=branch_name,
+            timestamp=self._get_commit_timestamp(commit_data) or None,
+            url=commit_data.get('html_url'),
+        )
+
+    @tracing.traced("github.format_commit")
+    def build_commit_update(
+        self,
+        commit_sha: str,
+        commit_data: Dict[str, Any],
+        branch_name: Optional[str],
+        order: int,
+    ) -> GitHubCommitUpdate:
+        """Render one commit in the project's render mode."""
+        timestamp = self._get_commit_timestamp(commit_data)
+
+        if self.embed_template is None:
+            message = self.format_commit_message(commit_data, branch_name=branch_name)
+            return GitHubCommitUpdate(commit_sha=commit_sha, timestamp=timestamp, order=order, message=message)
+
+        try:
+            embed = self.format_commit_embed(commit_data, branch_name=branch_name)
+        except Exception as e:
+            self.logger.error("Error formatting commit embed: %s", e)
+            message = self.format_commit_message(commit_data, branch_name=branch_name)
+            return GitHubCommitUpdate(commit_sha=commit_sha, timestamp=timestamp, order=order, message=message)
+
+        summary = f"{commit_sha[:7]} {embed['title']}"
+        return GitHubCommitUpdate(commit_sha=commit_sha, timestamp=timestamp, order=order, message=summary, embed=embed)
+
     def _fit_commit_message(self, base_lines: List[str], change_lines: List[str]) -> str:
         """Return one Discord-safe commit message, truncating changes if needed."""
         closing_line = "```"
         truncated_notice = "- Changes truncated to fit Discord's 2000-character message limit."
         fitted_lines = list(base_lines)
         base_line_count = len(base_lines)
+        message_limit = constants.DISCORD_MESSAGE_LIMIT
+        # Candidate lengths come from a running count instead of joining every candidate. fitted_length
+        # covers the fitted lines, the closing line and one newline; a candidate line adds its own length
+        # plus len(fitted_lines) more newlines.
+        fitted_length = sum(len(line) for line in fitted_lines) + len(closing_line) + 1
+        notice_length = len(truncated_notice)
 
         for change_line in change_lines:
-            candidate_message = "\n".join(fitted_lines + [change_line, closing_line])
-
-            if len(candidate_message) <= constants.DISCORD_MESSAGE_LIMIT:
+            if fitted_length + len(change_line) + len(fitted_lines) <= message_limit:
                 fitted_lines.append(change_line)
+                fitted_length += len(change_line)
                 continue
 
             while len(fitted_lines) > base_line_count:
-                notice_message = "\n".join(fitted_lines + [truncated_notice, closing_line])
-
-                if len(notice_message) <= constants.DISCORD_MESSAGE_LIMIT:
+                if fitted_length + notice_length + len(fitted_lines) <= message_limit:
                     break
 
-                fitted_lines.pop()
-
-            notice_message = "\n".join(fitted_lines + [truncated_notice, closing_line])
+                fitted_length -= len(fitted_lines.pop())
 
-            if len(notice_message) <= constants.DISCORD_MESSAGE_LIMIT:
+            if fitted_length + notice_length + len(fitted_lines) <= message_limit:
                 fitted_lines.append(truncated_notice)
 
             break
@@ -558,10 +971,11 @@ class GitHubMonitor:
         if renamed:
             summary.append(f"- Renamed {len(renamed)} file(s)")
         
-        # Add total changes summary
-        total_additions = sum(f.get('additions', 0) for f in files)
-        total_deletions = sum(f.get('deletions', 0) for f in files)
-        summary.append(f"- Total: +{total_additions} additions, -{total_deletions} deletions")
+        # Add total changes summary (push webhook file lists carry names only)
+        if any('additions' in f or 'deletions' in f for f in files):
+            total_additions = sum(f.get('additions', 0) for f in files)
+            total_deletions = sum(f.get('deletions', 0) for f in files)
+            summary.append(f"- Total: +{total_additions} additions, -{total_deletions} deletions")
         
         return summary
 
@@ -576,20 +990,59 @@ class GitHubMonitor:
     
     async def check_for_new_commit_updates(self) -> GitHubCommitCheckResult:
         """Check every branch for new commits without saving delivery state."""
-        print(f"{self.log_prefix}Checking GitHub for new commits...")
+        with metrics.CHECK_DURATION.time(project=self.project.key), \
+                tracing.span("github.check", project=self.project.key) as check_span:
+            check_result = await self._scan_branches_for_updates()
+            check_span.set_attribute("updates", len(check_result.updates))
+
+        metrics.COMMITS_DISCOVERED.inc(len(check_result.updates), project=self.project.key)
+        return check_result
+
+    async def _scan_branches_for_updates(self) -> GitHubCommitCheckResult:
+        """Walk every branch from its saved head and build an update per unposted commit."""
+        if self.rate_limiter.is_blocked(self.rate_limit_resource):
+            self.logger.warning(
+                "Skipping check; GitHub rate limit resets in %d seconds.",
+                self.rate_limiter.seconds_until_available(self.rate_limit_resource),
+            )
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        self.logger.debug("Checking GitHub for new commits...")
+
+        branch_state, posted_commits, legacy_sha, posted_commits_present = self.state_store.load_live()
+        branch_heads = None
+
+        if branch_state and posted_commits_present:
+            # One cheap (usually 304) request tells whether anything moved since the saved state.
+            branch_heads = await self.get_branch_heads()
 
-        branches = await self.get_branches()
+            if branch_heads == branch_state:
+                self.logger.debug("No branch heads moved since the last check.")
+                return GitHubCommitCheckResult(
+                    [],
+                    branch_state,
+                    dict(branch_state),
+                    posted_commits,
+                    should_save_state=False,
+                )
+
+        if branch_heads is not None:
+            branches = [
+                {"name": branch_name, "commit": {"sha": head_sha}}
+                for branch_name, head_sha in branch_heads.items()
+            ]
+        else:
+            branches = await self.get_branches()
 
         if not branches:
-            print(f"{self.log_prefix}Failed to fetch branches from GitHub")
+            self.logger.error("Failed to fetch branches from GitHub")
             return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
 
-        branch_state, posted_commits, legacy_sha, posted_commits_present = self.get_processed_commit_state()
         next_branch_state = {}
         pending_updates = []
-        update_order = 0
+        queued_commits: List[Tuple[str, str, Dict[str, Any], bool]] = []
 
-        async with aiohttp.ClientSession() as session:
+        async with self._session_scope() as session:
             if not posted_commits_present:
                 posted_commits = await self.seed_posted_commits_from_branch_state(
                     session,
@@ -597,7 +1050,8 @@ class GitHubMonitor:
                     legacy_sha=legacy_sha,
                 )
 
-            posted_commit_shas = set(posted_commits)
+            # SHAs queued in this check; the posted history itself only grows as Discord delivers.
+            queued_commit_shas = set()
 
             for branch in branches:
                 branch_name = branch.get('name')
@@ -611,68 +1065,155 @@ class GitHubMonitor:
                 next_branch_state[branch_name] = head_sha
 
                 if not baseline_sha:
-                    print(f"{self.log_prefix}First check - tracking branch {branch_name}: {head_sha[:7]}")
+                    self.logger.info("First check - tracking branch %s: %s", branch_name, head_sha[:7])
                     continue
 
                 if head_sha == baseline_sha:
-                    print(f"{self.log_prefix}No new commits on {branch_name} (latest: {head_sha[:7]})")
+                    self.logger.debug("No new commits on %s (latest: %s)", branch_name, head_sha[:7])
                     continue
 
-                commits, found_baseline = await self.get_branch_commits_since(
-                    session,
-                    branch_name,
-                    baseline_sha,
-                )
+                branch_commits = None
+
+                if constants.GITHUB_USE_COMPARE_API:
+                    branch_commits = await self.get_compare_commits(session, branch_name, baseline_sha)
+
+                # Compare commits carry everything the text message shows, but no per-commit
+                # file lists, so only embeds (whose Files field needs them) still fetch details.
+                needs_details = branch_commits is None or self.embed_template is not None
+
+                if branch_commits is None:
+                    branch_commits = await self.get_branch_commits_since(session, branch_name, baseline_sha)
+
+                if branch_commits is None:
+                    # Keep the saved head so the commits GitHub did not return are found next check.
+                    self.logger.warning("Could not fetch new commits on %s; retrying next check.", branch_name)
+                    if last_processed_sha:
+                        next_branch_state[branch_name] = last_processed_sha
+                    else:
+                        del next_branch_state[branch_name]
+                    continue
+
+                commits, found_baseline = branch_commits
 
                 if not commits:
-                    print(f"{self.log_prefix}No new commits on {branch_name} (latest: {head_sha[:7]})")
+                    self.logger.debug("No new commits on %s (latest: %s)", branch_name, head_sha[:7])
                     continue
 
                 if not found_baseline and last_processed_sha is None:
-                    print(
-                        f"{self.log_prefix}Branch {branch_name} does not contain the legacy starting commit; "
-                        f"tracking from current head: {head_sha[:7]}"
+                    self.logger.info(
+                        "Branch %s does not contain the legacy starting commit; tracking from current head: %s",
+                        branch_name,
+                        head_sha[:7],
                     )
                     continue
 
-                if not found_baseline:
-                    print(
-                        f"{self.log_prefix}Saved commit for {branch_name} was not found within "
-                        f"{constants.GITHUB_MAX_COMMITS_PER_BRANCH} commits; posting fetched commits."
+                if not found_baseline and needs_details:
+                    self.logger.warning(
+                        "Saved commit for %s was not found within %d commits; posting fetched commits.",
+                        branch_name,
+                        constants.GITHUB_MAX_COMMITS_PER_BRANCH,
                     )
 
-                print(f"{self.log_prefix}New commits detected on {branch_name}: {len(commits)}")
+                self.logger.info("New commits detected on %s: %d", branch_name, len(commits))
 
                 # GitHub returns newest first. Discord should receive oldest first.
                 for commit_data in reversed(commits):
                     commit_sha = self._normalize_commit_sha(commit_data.get('sha'))
-                    commit_details = None
 
                     if not commit_sha:
                         continue
 
-                    if commit_sha in posted_commit_shas:
-                        print(f"{self.log_prefix}Skipping already posted commit {commit_sha[:7]} on {branch_name}.")
+                    if commit_sha in queued_commit_shas or commit_sha in posted_commits:
+                        self.logger.debug("Skipping already posted commit %s on %s.", commit_sha[:7], branch_name)
                         continue
 
-                    commit_details = await self.get_commit_details(commit_sha, session=session)
+                    queued_commits.append((branch_name, commit_sha, commit_data, needs_details))
+                    queued_commit_shas.add(commit_sha)
 
-                    formatted_commit = self.format_commit_message(
-                        commit_details or commit_data,
-                        branch_name=branch_name,
-                    )
-                    pending_updates.append(
-                        GitHubCommitUpdate(
-                            commit_sha=commit_sha,
-                            timestamp=self._get_commit_timestamp(commit_details or commit_data),
-                            order=update_order,
-                            message=formatted_commit,
-                        )
-                    )
-                    update_order += 1
-                    posted_commit_shas.add(commit_sha)
+            # Detail lookups are independent, so fan them out once every branch has been deduped.
+            detail_shas = [commit_sha for _, commit_sha, _, needs_details in queued_commits if needs_details]
+            commit_details_by_sha = dict(
+                zip(detail_shas, await self.get_commit_details_batch(detail_shas, session))
+            )
+
+        for update_order, (branch_name, commit_sha, commit_data, _) in enumerate(queued_commits):
+            commit_details = commit_details_by_sha.get(commit_sha)
+            pending_updates.append(
+                self.build_commit_update(commit_sha, commit_details or commit_data, branch_name, update_order)
+            )
+
+        pending_updates.sort(key=lambda update: (update.timestamp, update.order))
+
+        return GitHubCommitCheckResult(
+            updates=pending_updates,
+            branch_state=branch_state,
+            next_branch_state=next_branch_state,
+            posted_commits=posted_commits,
+        )
 
+    def build_push_updates(self, payload: Dict[str, Any]) -> Optional[GitHubCommitCheckResult]:
+        """Turn a GitHub push webhook payload into commit updates without calling the API.
+
+        Returns None when the payload cannot be applied safely on its own (new or deleted
+        branch, missed pushes, truncated commit list, untracked state); a regular check
+        should reconcile the project instead.
+        """
+        ref = payload.get("ref")
+
+        if not isinstance(ref, str) or not ref.startswith("refs/heads/"):
+            # Tag pushes never change branch state.
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        branch_name = ref[len("refs/heads/"):]
+        before_sha = self._normalize_commit_sha(payload.get("before"))
+        after_sha = self._normalize_commit_sha(payload.get("after"))
+        commits = payload.get("commits")
+
+        if payload.get("deleted") or payload.get("forced") or not after_sha or not isinstance(commits, list):
+            return None
+
+        if len(commits) >= constants.GITHUB_WEBHOOK_MAX_PAYLOAD_COMMITS:
+            # GitHub caps the payload commit list, so older commits of this push may be missing.
+            return None
+
+        branch_state, posted_commits, _, posted_commits_present = self.state_store.load_live()
+
+        if not posted_commits_present or branch_state.get(branch_name) != before_sha:
+            return None
+
+        queued_commit_shas = set()
+        pending_updates = []
+
+        # Push payloads list commits oldest first, which is the Discord posting order.
+        for commit in commits:
+            commit_sha = self._normalize_commit_sha(commit.get("id"))
+
+            if not commit_sha or commit_sha in queued_commit_shas or commit_sha in posted_commits:
+                continue
+
+            author = commit.get("author") or {}
+            commit_data = {
+                "sha": commit_sha,
+                "commit": {
+                    "message": commit.get("message", ""),
+                    "author": {"name": author.get("name") or "Unknown", "date": commit.get("timestamp")},
+                    "committer": {"date": commit.get("timestamp")},
+                },
+                "html_url": commit.get("url"),
+                "files": [
+                    {"filename": filename, "status": status}
+                    for key, status in (("added", "added"), ("modified", "modified"), ("removed", "removed"))
+                    for filename in commit.get(key) or []
+                ],
+            }
+            pending_updates.append(self.build_commit_update(commit_sha, commit_data, branch_name, len(pending_updates)))
+            queued_commit_shas.add(commit_sha)
+
+        self.logger.info("Push webhook for %s: %d new commit(s).", branch_name, len(pending_updates))
+        metrics.COMMITS_DISCOVERED.inc(len(pending_updates), project=self.project.key)
         pending_updates.sort(key=lambda update: (update.timestamp, update.order))
+        next_branch_state = dict(branch_state)
+        next_branch_state[branch_name] = after_sha
 
         return GitHubCommitCheckResult(
             updates=pending_updates,
@@ -686,8 +1227,263 @@ class GitHubMonitor:
         check_result = await self.check_for_new_commit_updates()
 
         if check_result.should_save_state:
-            posted_commits = list(check_result.posted_commits)
-            posted_commits.extend(update.commit_sha for update in check_result.updates)
-            self.save_processed_commits(check_result.next_branch_state, posted_commits)
+            for update in check_result.updates:
+                self.record_posted_commit(update.commit_sha, check_result.branch_state, check_result.posted_commits)
+
+            self.save_processed_commits(check_result.next_branch_state, check_result.posted_commits)
+            await self.flush_state()
 
         return check_result.messages
+
+
+class GitHubGraphQLMonitor(GitHubMonitor):
+    """Monitor that reads branch heads and recent history with one GraphQL query per repository."""
+
+    rate_limit_resource = "graphql"
+
+    _branch_history_query = """
+query($owner: String!, $name: String!, $refsAfter: String, $historyDepth: Int!) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: 100, after: $refsAfter) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        target {
+          ... on Commit {
+            oid
+            history(first: $historyDepth) {
+              nodes { oid message committedDate author { name date } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+    def __init__(
+        self,
+        project: Optional[constants.ProjectConfig] = None,
+        api_base: Optional[str] = None,
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+    ):
+        super().__init__(project, api_base=api_base, rate_limiter=rate_limiter)
+        self.graphql_url = f"{self.api_base}/graphql"
+        self._branch_histories: Dict[str, List[Dict[str, Any]]] = {}
+        self._commits_by_sha: Dict[str, Dict[str, Any]] = {}
+
+    async def _post_graphql(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        variables: Dict[str, Any],
+        context: str = "GitHub GraphQL API",
+    ) -> Optional[Dict[str, Any]]:
+        """Run a GraphQL query and print consistent diagnostics."""
+        if self.rate_limiter.is_blocked("graphql"):
+            self.logger.warning(
+                "GitHub rate limit backoff active; skipping %s for %d more seconds.",
+                context,
+                self.rate_limiter.seconds_until_available("graphql"),
+            )
+            return None
+
+        request_status = "error"
+
+        try:
+            async with session.post(
+                self.graphql_url,
+                headers=self.headers,
+                json={"query": query, "variables": variables},
+            ) as response:
+                request_status = str(response.status)
+                self.rate_limiter.record_response(response.status, response.headers, "graphql")
+
+                if response.status != 200:
+                    if response.status == 401:
+                        self.logger.error("GitHub API authentication failed. Please check your token.")
+                    else:
+                        self.logger.error("%s error: %s", context, response.status)
+                    return None
+
+                payload = await response.json()
+        except Exception as e:
+            self.logger.error("Error during %s: %s", context, e)
+            return None
+        finally:
+            metrics.GITHUB_REQUESTS.inc(project=self.project.key, status=request_status)
+
+        if payload.get("errors"):
+            messages = "; ".join(str(error.get("message", error)) for error in payload["errors"])
+            self.logger.error("%s error: %s", context, messages)
+            return None
+
+        return payload.get("data")
+
+    def _graphql_commit_to_rest(self, commit_node: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a GraphQL commit node in the REST commit shape used by the formatter."""
+        author = commit_node.get("author") or {}
+        return {
+            "sha": commit_node.get("oid", ""),
+            "commit": {
+                "message": commit_node.get("message", ""),
+                "author": {"name": author.get("name") or "Unknown", "date": author.get("date")},
+                "committer": {"date": commit_node.get("committedDate")},
+            },
+        }
+
+    @tracing.traced("github.get_branches")
+    async def get_branches(self) -> List[Dict[str, Any]]:
+        """Fetch every branch head and its recent history in one query per 100 branches."""
+        branches = []
+        branch_histories = {}
+        commits_by_sha = {}
+        refs_after = None
+
+        try:
+            async with self._session_scope() as session:
+                while True:
+                    data = await self._post_graphql(
+                        session,
+                        self._branch_history_query,
+                        {
+                            "owner": self.project.repo_owner,
+                            "name": self.project.repo_name,
+                            "refsAfter": refs_after,
+                            "historyDepth": max(1, int(constants.GITHUB_GRAPHQL_HISTORY_DEPTH)),
+                        },
+                        context="fetching branches",
+                    )
+                    if data is None:
+                        # A partial listing would drop the missing branches from the saved state.
+                        return []
+
+                    refs = (data.get("repository") or {}).get("refs")
+
+                    if not refs:
+                        break
+
+                    for ref_node in refs.get("nodes") or []:
+                        target = ref_node.get("target") or {}
+                        branch_name = ref_node.get("name")
+                        head_sha = target.get("oid")
+
+                        if not branch_name or not head_sha:
+                            continue
+
+                        history = [
+                            self._graphql_commit_to_rest(commit_node)
+                            for commit_node in (target.get("history") or {}).get("nodes") or []
+                        ]
+                        branches.append({"name": branch_name, "commit": {"sha": head_sha}})
+                        branch_histories[branch_name] = history
+
+                        for commit_data in history:
+                            commits_by_sha[self._normalize_commit_sha(commit_data["sha"])] = commit_data
+
+                    page_info = refs.get("pageInfo") or {}
+
+                    if not page_info.get("hasNextPage"):
+                        break
+
+                    refs_after = page_info.get("endCursor")
+        except Exception as e:
+            self.logger.error("Error fetching branches: %s", e)
+
+        self._branch_histories = branch_histories
+        self._commits_by_sha = commits_by_sha
+        return branches
+
+    @tracing.traced("github.get_branch_heads")
+    async def get_branch_heads(self) -> Optional[Dict[str, str]]:
+        """Skip the REST pre-check; the GraphQL query already returns every head in one request."""
+        return None
+
+    @tracing.traced("github.get_compare_commits")
+    async def get_compare_commits(
+        self,
+        session: aiohttp.ClientSession,
+        branch_name: str,
+        base_sha: str,
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Only compare when the prefetched history is too shallow to reach base_sha."""
+        history = self._branch_histories.get(branch_name)
+
+        if history is not None and (
+            len(history) < max(1, int(constants.GITHUB_GRAPHQL_HISTORY_DEPTH))
+            or any(self._normalize_commit_sha(commit_data.get("sha")) == base_sha for commit_data in history)
+        ):
+            return None
+
+        return await super().get_compare_commits(session, branch_name, base_sha)
+
+    @tracing.traced("github.get_branch_commits_since")
+    async def get_branch_commits_since(
+        self,
+        session: aiohttp.ClientSession,
+        branch_name: str,
+        last_processed_sha: str,
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Walk the prefetched history, falling back to REST paging when it is too shallow."""
+        history = self._branch_histories.get(branch_name)
+
+        if history is None:
+            return await super().get_branch_commits_since(session, branch_name, last_processed_sha)
+
+        commits = []
+
+        for commit_data in history:
+            if self._normalize_commit_sha(commit_data.get("sha")) == last_processed_sha:
+                return commits, True
+
+            commits.append(commit_data)
+
+        if len(history) >= max(1, int(constants.GITHUB_GRAPHQL_HISTORY_DEPTH)):
+            return await super().get_branch_commits_since(session, branch_name, last_processed_sha)
+
+        # The whole branch fit in the prefetched history, so the saved commit is not on it.
+        return commits[:constants.GITHUB_MAX_COMMITS_PER_BRANCH], False
+
+    @tracing.traced("github.get_commit_details")
+    async def get_commit_details(
+        self,
+        commit_sha: str,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return prefetched commit data, only asking REST for commits outside the query.
+
+        History nodes carry no file lists, so embeds always ask REST for their Files field.
+        """
+        commit_data = self._commits_by_sha.get(self._normalize_commit_sha(commit_sha))
+
+        if commit_data is not None and self.embed_template is None:
+            return commit_data
+
+        return await super().get_commit_details(commit_sha, session=session)
+
+    async def get_recent_commits_for_ref(
+        self,
+        session: aiohttp.ClientSession,
+        git_ref: str,
+    ) -> List[Dict[str, Any]]:
+        """Seed from prefetched history when the ref is a current branch head."""
+        normalized_ref = self._normalize_commit_sha(git_ref)
+
+        for history in self._branch_histories.values():
+            if history and self._normalize_commit_sha(history[0].get("sha")) == normalized_ref:
+                return history[:constants.GITHUB_MAX_COMMITS_PER_BRANCH]
+
+        return await super().get_recent_commits_for_ref(session, git_ref)
+
+
+def create_github_monitor(
+    project: constants.ProjectConfig,
+    api_base: Optional[str] = None,
+    rate_limiter: Optional[GitHubRateLimiter] = None,
+) -> GitHubMonitor:
+    """Return the monitor implementation selected by the project's backend."""
+    if project.backend == "graphql":
+        return GitHubGraphQLMonitor(project, api_base=api_base, rate_limiter=rate_limiter)
+
+    return GitHubMonitor(project, api_base=api_base, rate_limiter=rate_limiter)
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from aiohttp import web
+
+import constants
+from bot_logging import get_logger
+from github_integration import GitHubMonitor
+
+PushHandler = Callable[[constants.ProjectConfig, GitHubMonitor, Dict[str, Any]], Awaitable[Any]]
+
+logger = get_logger("webhooks")
+
+
+def verify_webhook_signature(secret: str, body: bytes, signature_header: Optional[str]) -> bool:
+    """Return True when X-Hub-Signature-256 matches the HMAC-SHA256 of the raw request body."""
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+
+    expected_signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected_signature, signature_header[len("sha256="):])
+
+
+class GitHubWebhookServer:
+    """Embedded aiohttp server that receives GitHub push webhooks on the bot event loop."""
+
+    def __init__(
+        self,
+        project_monitors: Iterable[Tuple[constants.ProjectConfig, GitHubMonitor]],
+        on_push: PushHandler,
+        secret: Optional[str] = None,
+        path: Optional[str] = None,
+    ):
+        self.secret = constants.GITHUB_WEBHOOK_SECRET if secret is None else secret
+        self.path = path or constants.GITHUB_WEBHOOK_PATH
+        self.on_push = on_push
+        self.monitors_by_repo = {
+            f"{project.repo_owner}/{project.repo_name}".lower(): (project, monitor)
+            for project, monitor in project_monitors
+        }
+        self.app = web.Application(client_max_size=constants.GITHUB_WEBHOOK_MAX_BODY_BYTES)
+        self.app.router.add_post(self.path, self.handle_webhook)
+        self._runner: Optional[web.AppRunner] = None
+        self._push_tasks: Set[asyncio.Task] = set()
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None) -> None:
+        """Start listening for webhook deliveries."""
+        if not self.secret:
+            raise ValueError("GITHUB_WEBHOOK_SECRET must be set to receive GitHub webhooks.")
+
+        host = host or constants.GITHUB_WEBHOOK_HOST
+        port = constants.GITHUB_WEBHOOK_PORT if port is None else port
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info("GitHub webhook receiver listening on %s:%s%s", host, port, self.path)
+
+    async def stop(self) -> None:
+        """Stop listening and wait for push handlers that are already running."""
+        if self._push_tasks:
+            await asyncio.gather(*self._push_tasks, return_exceptions=True)
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_webhook(self, request: web.Request) -> web.Response:
+        """Verify and dispatch one webhook delivery."""
+        body = await request.read()
+
+        if not verify_webhook_signature(self.secret, body, request.headers.get("X-Hub-Signature-256")):
+            logger.warning("Rejected GitHub webhook with an invalid signature.")
+            return web.Response(status=401, text="invalid signature")
+
+        event = request.headers.get("X-GitHub-Event", "")
+
+        if event == "ping":
+            return web.Response(text="pong")
+
+        if event != "push":
+            return web.Response(status=202, text="ignored")
+
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError:
+            return web.Response(status=400, text="invalid JSON")
+
+        if not isinstance(payload, dict):
+            return web.Response(status=400, text="payload is not an object")
+
+        repository = payload.get("repository")
+        full_name = str(repository.get("full_name", "") if isinstance(repository, dict) else "").lower()
+        project_monitor = self.monitors_by_repo.get(full_name)
+
+        if project_monitor is None:
+            logger.info("Ignoring GitHub push webhook for unmonitored repository %s.", full_name or '(unknown)')
+            return web.Response(status=202, text="ignored")
+
+        # Answer GitHub straight away; delivery to Discord happens in the background.
+        project, monitor = project_monitor
+        push_task = asyncio.create_task(self._run_push_handler(project, monitor, payload))
+        self._push_tasks.add(push_task)
+        push_task.add_done_callback(self._push_tasks.discard)
+        return web.Response(status=202, text="accepted")
+
+    async def _run_push_handler(
+        self,
+        project: constants.ProjectConfig,
+        monitor: GitHubMonitor,
+        payload: Dict[str, Any],
+    ) -> None:
+        """Run the push handler, keeping its failures out of the web server."""
+        try:
+            await self.on_push(project, monitor, payload)
+        except Exception as e:
+            logger.error("Error handling %s push webhook: %s", project.display_name, e)
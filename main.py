@@ -1,5 +1,6 @@
 import os
 from bot import Client
+from bot_logging import configure_logging, stop_logging
 
 from dotenv import load_dotenv
 
@@ -10,7 +11,11 @@ BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN') # Get the bot token variable from the
 def main() -> None:
     if BOT_TOKEN is None:
         raise ValueError("DISCORD_BOT_TOKEN environment variable not found. Please check your .env file.")
-    Client.run(BOT_TOKEN) # Run the bot with the token obtained from the environment variables
+    configure_logging() # Log to the console and the rotating log file without blocking the event loop
+    try:
+        Client.run(BOT_TOKEN) # Run the bot with the token obtained from the environment variables
+    finally:
+        stop_logging()
 
 if __name__ == '__main__':
     main() # Run the main function when the script is executed
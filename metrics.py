@@ -0,0 +1,352 @@
+"""In-process metrics for the bot, exposed as Prometheus text and as snapshots for the GUI.
+
+Metrics are updated from the bot event loop and from state-flush worker threads, and read
+from the GUI thread and the /metrics endpoint, so every metric guards its values with a lock.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+import constants
+from bot_logging import get_logger
+
+logger = get_logger("metrics")
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+
+        return tuple(str(labels[label_name]) for label_name in self.label_names)
+
+    def _format_labels(self, label_values: LabelValues, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, label_values)) + list(extra)
+
+        if not pairs:
+            return ""
+
+        return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        """Return the Prometheus text exposition lines of this metric."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(label_values)} {_format_value(value)}")
+
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return every labelled value as plain data."""
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.label_names, label_values)), "value": value}
+                for label_values, value in sorted(self._values.items())
+            ]
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters cannot decrease.")
+
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Counts observations into cumulative buckets and keeps their sum."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS,
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            series = self._values.get(label_values)
+
+            if series is None:
+                # Per-bucket (not cumulative) counts, one extra slot for +Inf, then count and sum.
+                series = self._values[label_values] = {"bucket_counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0}
+
+            series["bucket_counts"][bisect.bisect_left(self.buckets, value)] += 1
+            series["count"] += 1
+            series["sum"] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the seconds spent in the with-block, including when it raises."""
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+        with self._lock:
+            for label_values, series in sorted(self._values.items()):
+                cumulative_count = 0
+
+                for upper_bound, bucket_count in zip(self.buckets + (math.inf,), series["bucket_counts"]):
+                    cumulative_count += bucket_count
+                    bucket_labels = self._format_labels(label_values, (("le", _format_value(upper_bound)),))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative_count}")
+
+                labels = self._format_labels(label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "labels": dict(zip(self.label_names, label_values)),
+                    "count": series["count"],
+                    "sum": series["sum"],
+                    "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+                }
+                for label_values, series in sorted(self._values.items())
+            ]
+
+
+class MetricsRegistry:
+    """Owns a set of metrics and renders them together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric name: {metric.name}")
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, help_text, label_names))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return every metric as plain data, safe to read from another thread."""
+        return {
+            name: {"type": metric.kind, "help": metric.help_text, "values": metric.snapshot()}
+            for name, metric in self._metrics.items()
+        }
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+CHECK_DURATION = REGISTRY.histogram(
+    "commitsbot_github_check_duration_seconds",
+    "Time spent scanning one project's branches for new commits.",
+    ("project",),
+)
+GITHUB_REQUESTS = REGISTRY.counter(
+    "commitsbot_github_requests_total",
+    "GitHub API requests by response status; status=\"error\" when no response arrived.",
+    ("project", "status"),
+)
+GITHUB_RATE_LIMIT_REMAINING = REGISTRY.gauge(
+    "commitsbot_github_rate_limit_remaining",
+    "Requests left in the current GitHub rate-limit window, per rate-limit resource (core, graphql).",
+    ("resource",),
+)
+GITHUB_RATE_LIMIT_RESET = REGISTRY.gauge(
+    "commitsbot_github_rate_limit_reset_timestamp_seconds",
+    "Epoch seconds when the GitHub rate-limit window resets, per rate-limit resource.",
+    ("resource",),
+)
+COMMITS_DISCOVERED = REGISTRY.counter(
+    "commitsbot_commits_discovered_total",
+    "New commits found by GitHub checks and push webhooks.",
+    ("project",),
+)
+DISCORD_SEND_DURATION = REGISTRY.histogram(
+    "commitsbot_discord_send_duration_seconds",
+    "Time Discord took to accept one commit update message.",
+    ("project",),
+)
+DISCORD_SEND_ERRORS = REGISTRY.counter(
+    "commitsbot_discord_send_errors_total",
+    "Discord message sends that failed, including ones that were retried.",
+    ("project",),
+)
+DELIVERY_QUEUE_DEPTH = REGISTRY.gauge(
+    "commitsbot_delivery_queue_depth",
+    "Commit checks queued or being posted per Discord channel.",
+    ("channel",),
+)
+STATE_SAVE_DURATION = REGISTRY.histogram(
+    "commitsbot_state_save_duration_seconds",
+    "Time spent writing one project's commit state to disk.",
+    ("project",),
+)
+
+
+def get_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Return the current value of every bot metric."""
+    return REGISTRY.snapshot()
+
+
+def summarize_snapshot(snapshot: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Return short human-readable lines for the headline metrics of a snapshot."""
+    def values(metric_name: str) -> List[Dict[str, Any]]:
+        return snapshot.get(metric_name, {}).get("values", [])
+
+    lines = []
+    requests_by_project: Dict[str, Dict[str, float]] = {}
+
+    for value in values(GITHUB_REQUESTS.name):
+        statuses = requests_by_project.setdefault(value["labels"]["project"], {})
+        statuses[value["labels"]["status"]] = value["value"]
+
+    for check in values(CHECK_DURATION.name):
+        project = check["labels"]["project"]
+        statuses = requests_by_project.get(project, {})
+        discovered = sum(value["value"] for value in values(COMMITS_DISCOVERED.name) if value["labels"]["project"] == project)
+        lines.append(
+            f"{project}: {check['count']} check(s), {check['mean']:.2f}s average, "
+            f"{int(sum(statuses.values()))} GitHub request(s) ({int(statuses.get('304', 0))} not modified, "
+            f"{int(sum(count for status, count in statuses.items() if status not in ('200', '304')))} failed), "
+            f"{int(discovered)} new commit(s)"
+        )
+
+    for send in values(DISCORD_SEND_DURATION.name):
+        lines.append(f"{send['labels']['project']}: {send['count']} Discord send(s), {send['mean'] * 1000:.0f} ms average")
+
+    queued = sum(value["value"] for value in values(DELIVERY_QUEUE_DEPTH.name))
+    lines.append(f"Commit checks waiting for Discord: {int(queued)}")
+
+    for remaining in values(GITHUB_RATE_LIMIT_REMAINING.name):
+        resource = remaining["labels"]["resource"]
+        resource_name = "" if resource == "core" else f"{resource} "
+        lines.append(f"GitHub {resource_name}rate limit remaining: {int(remaining['value'])}")
+
+    return lines
+
+
+class MetricsServer:
+    """Embedded aiohttp server answering Prometheus scrapes on the bot event loop."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, path: Optional[str] = None):
+        self.registry = registry
+        self.path = path or constants.METRICS_PATH
+        self.app = web.Application()
+        self.app.router.add_get(self.path, self.handle_metrics)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None) -> None:
+        host = host or constants.METRICS_HOST
+        port = constants.METRICS_PORT if port is None else port
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info("Metrics endpoint listening on %s:%s%s", host, port, self.path)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.registry.render(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
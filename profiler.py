@@ -0,0 +1,122 @@
+"""Sampling profiler for the running bot.
+
+A background thread periodically reads the bot thread's current stack, so nothing in the
+profiled code is instrumented. Samples are kept as collapsed stacks ("outer;inner count"),
+the input format of flamegraph.pl, speedscope and similar tools.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+import constants
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every interval seconds while resumed."""
+
+    def __init__(self, thread_id: int, interval: Optional[float] = None):
+        self.thread_id = thread_id
+        self.interval = constants.PROFILER_SAMPLE_INTERVAL if interval is None else interval
+        self.samples: "Counter[str]" = Counter()  # Collapsed stack -> times it was sampled
+        self.sample_count = 0
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the sampling thread; sampling itself begins with resume()."""
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def resume(self) -> None:
+        self._active.set()
+
+    def pause(self) -> None:
+        self._active.clear()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._active.set()  # Wake a paused sampler so it can exit
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._active.wait()
+
+            if self._stopped.is_set():
+                return
+
+            self.sample()
+            time.sleep(self.interval)
+
+    def sample(self) -> None:
+        """Record the sampled thread's current stack once."""
+        frame = sys._current_frames().get(self.thread_id)
+
+        if frame is None:
+            return
+
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+
+        labels.reverse()
+        self.samples[";".join(labels)] += 1
+        self.sample_count += 1
+
+    def collapsed_stacks(self) -> List[str]:
+        """Return one "frame;frame;frame count" line per distinct stack."""
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+    def write_collapsed(self, output_file: str) -> None:
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for line in self.collapsed_stacks():
+                f.write(line + "\n")
+
+    def top_functions(self, limit: Optional[int] = None) -> List[str]:
+        """Return report lines for the functions that were running in the most samples."""
+        limit = constants.PROFILE_TOP_FUNCTIONS if limit is None else limit
+        self_counts: "Counter[str]" = Counter()
+        total_counts: "Counter[str]" = Counter()
+
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+
+            # A recursive function counts once per sample towards its total.
+            for frame_label in set(frames):
+                total_counts[frame_label] += count
+
+        if not self.sample_count:
+            return ["No profiler samples were recorded."]
+
+        lines = [f"{'self %':>7} {'total %':>8}  function"]
+
+        for frame_label, self_count in self_counts.most_common(limit):
+            lines.append(
+                f"{self_count / self.sample_count:>7.1%} "
+                f"{total_counts[frame_label] / self.sample_count:>8.1%}  {frame_label}"
+            )
+
+        return lines
+
+
+def get_profile_output_file() -> str:
+    """Return a new timestamped collapsed-stack path in PROFILE_OUTPUT_DIR."""
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(constants.PROFILE_OUTPUT_DIR, f"profile-{timestamp}.collapsed")
@@ -0,0 +1,861 @@
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import constants
+import metrics
+import tracing
+from bot_logging import get_logger
+
+CommitState = Tuple[Dict[str, str], List[str], Optional[str], bool]
+
+logger = get_logger("state")
+
+
+def normalize_commit_sha(commit_sha: Any) -> str:
+    """Return a normalized commit SHA for exact-match dedupe."""
+    if not isinstance(commit_sha, str):
+        return ""
+
+    return commit_sha.strip().lower()
+
+
+def normalize_posted_commits(posted_commits: Any) -> List[str]:
+    """Return unique posted commit SHAs, preserving order and applying the state cap."""
+    if isinstance(posted_commits, PostedCommitHistory):
+        return posted_commits.to_list()
+
+    if not isinstance(posted_commits, list):
+        return []
+
+    normalized_commits = []
+    seen_commits = set()
+
+    for commit_sha in posted_commits:
+        normalized_sha = normalize_commit_sha(commit_sha)
+
+        if not normalized_sha or normalized_sha in seen_commits:
+            continue
+
+        normalized_commits.append(normalized_sha)
+        seen_commits.add(normalized_sha)
+
+    commit_limit = max(0, int(constants.GITHUB_POSTED_COMMITS_LIMIT))
+
+    if not commit_limit:
+        return []
+
+    return normalized_commits[-commit_limit:]
+
+
+def normalize_branch_state(branch_state: Dict[Any, Any]) -> Dict[str, str]:
+    """Return branch heads with blank names and invalid SHAs dropped, sorted by branch name."""
+    normalized_state = {}
+
+    for branch_name, commit_sha in sorted(branch_state.items(), key=lambda item: str(item[0])):
+        if not isinstance(branch_name, str):
+            continue
+
+        branch_name = branch_name.strip()
+        commit_sha = normalize_commit_sha(commit_sha)
+
+        if branch_name and commit_sha:
+            normalized_state[branch_name] = commit_sha
+
+    return normalized_state
+
+
+class PostedCommitHistory:
+    """Bounded, insertion-ordered set of posted commit SHAs.
+
+    Full 40-character SHAs are kept as 20-byte binary keys. Adding, membership checks and
+    evicting the oldest SHA past GITHUB_POSTED_COMMITS_LIMIT are all O(1).
+    """
+
+    __slots__ = ("_commits",)
+
+    def __init__(self, posted_commits: Iterable[Any] = ()):
+        self._commits: "OrderedDict[Union[bytes, str], None]" = OrderedDict()
+
+        for commit_sha in normalize_posted_commits(list(posted_commits)):
+            self._commits[self._encode(commit_sha)] = None
+
+    @staticmethod
+    def _encode(normalized_sha: str) -> Union[bytes, str]:
+        """Return the compact key for a normalized SHA; abbreviated or odd SHAs stay strings."""
+        if len(normalized_sha) == 40:
+            try:
+                return bytes.fromhex(normalized_sha)
+            except ValueError:
+                pass
+
+        return normalized_sha
+
+    @staticmethod
+    def _decode(key: Union[bytes, str]) -> str:
+        return key.hex() if isinstance(key, bytes) else key
+
+    def add(self, commit_sha: Any) -> bool:
+        """Record a SHA as newest, evicting the oldest past the cap; return False if already present."""
+        normalized_sha = normalize_commit_sha(commit_sha)
+
+        if not normalized_sha:
+            return False
+
+        key = self._encode(normalized_sha)
+
+        if key in self._commits:
+            return False
+
+        self._commits[key] = None
+        commit_limit = max(0, int(constants.GITHUB_POSTED_COMMITS_LIMIT))
+
+        while len(self._commits) > commit_limit:
+            self._commits.popitem(last=False)
+
+        return True
+
+    def __contains__(self, commit_sha: Any) -> bool:
+        normalized_sha = normalize_commit_sha(commit_sha)
+        return bool(normalized_sha) and self._encode(normalized_sha) in self._commits
+
+    def __len__(self) -> int:
+        return len(self._commits)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._decode(key) for key in self._commits)
+
+    def __repr__(self) -> str:
+        return f"PostedCommitHistory({self.to_list()!r})"
+
+    def to_list(self) -> List[str]:
+        """Return the SHAs oldest first as hex strings."""
+        return [self._decode(key) for key in self._commits]
+
+
+class CommitStateStore(abc.ABC):
+    """Persists one project's branch heads and posted-commit history.
+
+    Writes return False when they fail so callers can keep the changes for a later retry.
+    """
+
+    incremental_writes = False  # Whether record_posted_commits()/save_branches() write only the change
+
+    @abc.abstractmethod
+    def load(self) -> CommitState:
+        """Return branch heads, posted SHAs, a legacy single SHA, and whether posted history exists."""
+
+    @abc.abstractmethod
+    def save(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        """Replace the stored state."""
+
+    def record_posted_commits(
+        self,
+        commit_shas: List[str],
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+    ) -> bool:
+        """Persist newly delivered commits and branch heads; posted_commits already ends with them."""
+        return self.save(branch_state, posted_commits)
+
+    def save_branches(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        """Persist new branch heads when the stored posted history is unchanged."""
+        return self.save(branch_state, posted_commits)
+
+    def close(self) -> None:
+        """Release any open resources."""
+
+
+class JsonStateStore(CommitStateStore):
+    """Stores state as one JSON document, also reading the old single-SHA text format."""
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+
+    def load(self) -> CommitState:
+        try:
+            if not os.path.exists(self.state_file):
+                return {}, [], None, False
+
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+
+            if not content:
+                return {}, [], None, False
+
+            try:
+                state = json.loads(content)
+            except json.JSONDecodeError:
+                return {}, [], normalize_commit_sha(content) or None, False
+
+            if isinstance(state, str):
+                return {}, [], normalize_commit_sha(state) or None, False
+
+            if not isinstance(state, dict):
+                return {}, [], None, False
+
+            raw_branches = state.get("branches")
+            if raw_branches is None:
+                raw_branches = {
+                    branch_name: commit_sha
+                    for branch_name, commit_sha in state.items()
+                    if branch_name != "posted_commits"
+                }
+
+            if not isinstance(raw_branches, dict):
+                raw_branches = {}
+
+            posted_commits_present = isinstance(state.get("posted_commits"), list)
+            posted_commits = normalize_posted_commits(state.get("posted_commits", []))
+
+            return normalize_branch_state(raw_branches), posted_commits, None, posted_commits_present
+        except Exception as e:
+            logger.error("Error reading last commit file: %s", e)
+            return {}, [], None, False
+
+    def save(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        try:
+            state = {
+                "branches": normalize_branch_state(branch_state),
+                "posted_commits": normalize_posted_commits(posted_commits or []),
+            }
+
+            # Write to a temp file and swap it in so an interrupted write cannot corrupt the state.
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_file, self.state_file)
+            return True
+        except Exception as e:
+            logger.error("Error saving last commit file: %s", e)
+            return False
+
+
+class SQLiteStateStore(CommitStateStore):
+    """Stores state in indexed SQLite tables (WAL mode) so a delivered commit is a single insert.
+
+    The first open imports the project's existing JSON or single-SHA state file.
+    """
+
+    incremental_writes = True
+
+    def __init__(self, database_file: str, legacy_state_file: Optional[str] = None):
+        self.database_file = database_file
+        self.legacy_state_file = legacy_state_file
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating tables and migrating the old state file on first use."""
+        if self._connection is not None:
+            return self._connection
+
+        connection = sqlite3.connect(self.database_file, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS branches (name TEXT PRIMARY KEY, sha TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS posted_commits "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, sha TEXT NOT NULL UNIQUE)"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        self._connection = connection
+
+        if self._get_meta("initialized") is None:
+            self._migrate_legacy_state()
+
+        return connection
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _migrate_legacy_state(self) -> None:
+        """Import the project's previous JSON/text state file, if there is one."""
+        branch_state, posted_commits, legacy_sha, posted_commits_present = {}, [], None, False
+
+        if self.legacy_state_file and os.path.exists(self.legacy_state_file):
+            branch_state, posted_commits, legacy_sha, posted_commits_present = (
+                JsonStateStore(self.legacy_state_file).load()
+            )
+            logger.info("Migrating commit state from %s to %s.", self.legacy_state_file, self.database_file)
+
+        with self._connection:
+            self._write_state(branch_state, posted_commits, posted_commits_present)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_sha', ?)",
+                (legacy_sha,),
+            )
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('initialized', '1')")
+
+    def _write_state(
+        self,
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+        posted_commits_present: bool = True,
+    ) -> None:
+        """Replace every stored row; the caller owns the transaction."""
+        self._write_branches(branch_state)
+        self._connection.execute("DELETE FROM posted_commits")
+        self._connection.executemany(
+            "INSERT INTO posted_commits (sha) VALUES (?)",
+            ((commit_sha,) for commit_sha in normalize_posted_commits(posted_commits or [])),
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('posted_commits_present', ?)",
+            ("1" if posted_commits_present else None,),
+        )
+        self._connection.execute("DELETE FROM meta WHERE key = 'legacy_sha'")
+
+    def _write_branches(self, branch_state: Dict[str, str]) -> None:
+        """Replace the stored branch heads; the caller owns the transaction."""
+        self._connection.execute("DELETE FROM branches")
+        self._connection.executemany(
+            "INSERT INTO branches (name, sha) VALUES (?, ?)",
+            normalize_branch_state(branch_state).items(),
+        )
+
+    def _trim_posted_commits(self) -> None:
+        """Drop the oldest posted SHAs beyond the history cap; the caller owns the transaction."""
+        commit_limit = max(0, int(constants.GITHUB_POSTED_COMMITS_LIMIT))
+
+        if commit_limit == 0:
+            self._connection.execute("DELETE FROM posted_commits")
+            return
+
+        # Ignored duplicate inserts still use up AUTOINCREMENT ids, so ids can have gaps; find the
+        # newest id past the cap through the primary key and delete up to it.
+        self._connection.execute(
+            "DELETE FROM posted_commits WHERE id <= "
+            "(SELECT id FROM posted_commits ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (commit_limit,),
+        )
+
+    def load(self) -> CommitState:
+        try:
+            with self._lock:
+                connection = self._connect()
+                branch_state = dict(connection.execute("SELECT name, sha FROM branches ORDER BY name"))
+                posted_commits = [
+                    commit_sha for (commit_sha,) in connection.execute("SELECT sha FROM posted_commits ORDER BY id")
+                ]
+                legacy_sha = self._get_meta("legacy_sha")
+                posted_commits_present = self._get_meta("posted_commits_present") == "1"
+
+            return branch_state, posted_commits, legacy_sha, posted_commits_present
+        except Exception as e:
+            logger.error("Error reading commit state database: %s", e)
+            return {}, [], None, False
+
+    def save(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    self._write_state(branch_state, posted_commits)
+            return True
+        except Exception as e:
+            logger.error("Error saving commit state database: %s", e)
+            return False
+
+    def save_branches(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        try:
+            with self._lock:
+                connection = self._connect()
+
+                with connection:
+                    if self._get_meta("posted_commits_present") != "1":
+                        self._write_state(branch_state, posted_commits)
+                    else:
+                        self._write_branches(branch_state)
+            return True
+        except Exception as e:
+            logger.error("Error saving commit state database: %s", e)
+            return False
+
+    def record_posted_commits(
+        self,
+        commit_shas: List[str],
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+    ) -> bool:
+        try:
+            with self._lock:
+                connection = self._connect()
+
+                if self._get_meta("posted_commits_present") != "1":
+                    # History was seeded in memory and never stored; write it out once.
+                    with connection:
+                        self._write_state(branch_state, posted_commits)
+                    return True
+
+                with connection:
+                    self._write_branches(branch_state)
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO posted_commits (sha) VALUES (?)",
+                        ((normalize_commit_sha(commit_sha),) for commit_sha in commit_shas),
+                    )
+                    self._trim_posted_commits()
+            return True
+        except Exception as e:
+            logger.error("Error saving commit state database: %s", e)
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class JournalStateStore(CommitStateStore):
+    """Stores state as an append-only JSON Lines journal replayed on load.
+
+    Each delivered commit or branch-head change appends one record, so a crash mid-batch
+    loses at most the record being written. Once STATE_JOURNAL_COMPACT_RECORDS records
+    follow the last snapshot the journal is compacted into a single snapshot record.
+    The first open imports the project's existing JSON or single-SHA state file.
+    """
+
+    incremental_writes = True
+
+    def __init__(self, journal_file: str, legacy_state_file: Optional[str] = None):
+        self.journal_file = journal_file
+        self.legacy_state_file = legacy_state_file
+        self._lock = threading.Lock()
+        self._records_since_snapshot = 0
+        self._posted_commits_present: Optional[bool] = None
+
+    def _replay(self) -> CommitState:
+        """Rebuild the state from the journal; the caller holds the lock."""
+        if not os.path.exists(self.journal_file):
+            if self.legacy_state_file and os.path.exists(self.legacy_state_file):
+                logger.info("Migrating commit state from %s to %s.", self.legacy_state_file, self.journal_file)
+                self._write_snapshot(*JsonStateStore(self.legacy_state_file).load())
+            else:
+                self._records_since_snapshot = 0
+                self._posted_commits_present = False
+                return {}, [], None, False
+
+        branch_state: Dict[str, str] = {}
+        posted_commits = PostedCommitHistory()
+        legacy_sha = None
+        posted_commits_present = False
+        records_since_snapshot = 0
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last record half written; everything before it still counts.
+                    continue
+
+                if not isinstance(record, dict):
+                    continue
+
+                record_type = record.get("type")
+
+                if record_type == "snapshot":
+                    branch_state = normalize_branch_state(record.get("branches") or {})
+                    posted_commits_present = isinstance(record.get("posted_commits"), list)
+                    posted_commits = PostedCommitHistory(record.get("posted_commits") or [])
+                    legacy_sha = normalize_commit_sha(record.get("legacy_sha")) or None
+                    records_since_snapshot = 0
+                    continue
+
+                if record_type == "posted":
+                    posted_commits.add(record.get("sha"))
+                elif record_type == "branches":
+                    branch_state = normalize_branch_state(record.get("branches") or {})
+                    legacy_sha = None
+                else:
+                    continue
+
+                records_since_snapshot += 1
+
+        self._records_since_snapshot = records_since_snapshot
+        self._posted_commits_present = posted_commits_present
+        return branch_state, posted_commits.to_list(), legacy_sha, posted_commits_present
+
+    def _write_snapshot(
+        self,
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+        legacy_sha: Optional[str] = None,
+        posted_commits_present: bool = True,
+    ) -> None:
+        """Replace the journal with one snapshot record; the caller holds the lock."""
+        record = {
+            "type": "snapshot",
+            "branches": normalize_branch_state(branch_state),
+            "posted_commits": normalize_posted_commits(posted_commits or []) if posted_commits_present else None,
+            "legacy_sha": legacy_sha,
+        }
+
+        temp_file = f"{self.journal_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.journal_file)
+
+        self._records_since_snapshot = 0
+        self._posted_commits_present = posted_commits_present
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Append records and force them to disk; the caller holds the lock."""
+        data = "".join(json.dumps(record) + "\n" for record in records).encode('utf-8')
+
+        with open(self.journal_file, 'a+b') as f:
+            # After a crash mid-write the last line has no newline; start a fresh line so the
+            # torn record does not swallow the first one written now.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._records_since_snapshot += len(records)
+
+    def _compact_if_needed(self) -> None:
+        """Fold the journal into a snapshot once enough records have accumulated; the caller holds the lock."""
+        if self._records_since_snapshot >= max(1, int(constants.STATE_JOURNAL_COMPACT_RECORDS)):
+            self._write_snapshot(*self._replay())
+
+    def load(self) -> CommitState:
+        try:
+            with self._lock:
+                return self._replay()
+        except Exception as e:
+            logger.error("Error reading commit state journal: %s", e)
+            return {}, [], None, False
+
+    def save(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        try:
+            with self._lock:
+                self._write_snapshot(branch_state, posted_commits)
+            return True
+        except Exception as e:
+            logger.error("Error saving commit state journal: %s", e)
+            return False
+
+    def save_branches(self, branch_state: Dict[str, str], posted_commits: List[str]) -> bool:
+        record = {"type": "branches", "branches": normalize_branch_state(branch_state)}
+        return self._append_changes([record], branch_state, posted_commits)
+
+    def record_posted_commits(
+        self,
+        commit_shas: List[str],
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+    ) -> bool:
+        normalized_shas = (normalize_commit_sha(commit_sha) for commit_sha in commit_shas)
+        records = [{"type": "posted", "sha": commit_sha} for commit_sha in normalized_shas if commit_sha]
+        records.append({"type": "branches", "branches": normalize_branch_state(branch_state)})
+        return self._append_changes(records, branch_state, posted_commits)
+
+    def _append_changes(
+        self,
+        records: List[Dict[str, Any]],
+        branch_state: Dict[str, str],
+        posted_commits: List[str],
+    ) -> bool:
+        """Append change records, writing a snapshot instead while no posted history is stored."""
+        try:
+            with self._lock:
+                if self._posted_commits_present is None:
+                    self._replay()
+
+                if not self._posted_commits_present:
+                    # History was seeded in memory and never stored; write it out once.
+                    self._write_snapshot(branch_state, posted_commits)
+                    return True
+
+                self._append(records)
+                self._compact_if_needed()
+            return True
+        except Exception as e:
+            logger.error("Error saving commit state journal: %s", e)
+            return False
+
+
+class CachedStateStore(CommitStateStore):
+    """Keeps a store's state in memory as the source of truth and persists it write-behind.
+
+    Writes are coalesced: they are flushed when a batch completes (flush()), after
+    STATE_WRITE_BEHIND_DELAY seconds on a timer, and on close(). Flushes triggered from the
+    event loop run the file or database I/O in a worker thread. Without a running loop every
+    write is flushed immediately.
+    """
+
+    def __init__(self, store: CommitStateStore, name: str = ""):
+        self.store = store
+        self.name = name  # Project key used to label state metrics
+        self._loaded = False
+        self._branch_state: Dict[str, str] = {}
+        self._posted_commits = PostedCommitHistory()
+        self._legacy_sha: Optional[str] = None
+        self._posted_commits_present = False
+        self._lock = threading.Lock()  # Guards the in-memory state and pending writes
+        self._write_lock = threading.Lock()  # Keeps flushes to the underlying store in order
+        self._pending_commit_shas: List[str] = []
+        self._needs_full_save = False
+        self._branches_dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def dirty(self) -> bool:
+        """Return True while changes are waiting to be written to the underlying store."""
+        return self._needs_full_save or self._branches_dirty or bool(self._pending_commit_shas)
+
+    def _ensure_loaded(self) -> None:
+        """Read the underlying store once; the caller holds the lock."""
+        if self._loaded:
+            return
+
+        with tracing.span("state.load", project=self.name):
+            branch_state, posted_commits, legacy_sha, posted_commits_present = self.store.load()
+
+        self._branch_state = dict(branch_state)
+        self._posted_commits = PostedCommitHistory(posted_commits)
+        self._legacy_sha = legacy_sha
+        self._posted_commits_present = posted_commits_present
+        self._loaded = True
+
+    def load(self) -> CommitState:
+        with self._lock:
+            self._ensure_loaded()
+            return (
+                dict(self._branch_state),
+                self._posted_commits.to_list(),
+                self._legacy_sha,
+                self._posted_commits_present,
+            )
+
+    def load_live(self) -> Tuple[Dict[str, str], PostedCommitHistory, Optional[str], bool]:
+        """Like load(), but return the live posted history instead of a copy.
+
+        Callers must not modify the history directly; record_posted_commits() does that.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return (
+                dict(self._branch_state),
+                self._posted_commits,
+                self._legacy_sha,
+                self._posted_commits_present,
+            )
+
+    def _adopt_history(self, posted_commits: Iterable[str]) -> None:
+        """Replace the posted history with one built elsewhere; the caller holds the lock."""
+        if posted_commits is not self._posted_commits:
+            self._posted_commits = (
+                posted_commits
+                if isinstance(posted_commits, PostedCommitHistory)
+                else PostedCommitHistory(posted_commits or [])
+            )
+            self._needs_full_save = True
+            self._pending_commit_shas.clear()
+
+    def save(self, branch_state: Dict[str, str], posted_commits: Iterable[str]) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            self._branch_state = normalize_branch_state(branch_state)
+            self._legacy_sha = None
+            self._adopt_history(posted_commits)
+
+            if not self._posted_commits_present:
+                self._posted_commits_present = True
+                self._needs_full_save = True
+
+            self._branches_dirty = True
+
+        self._schedule_flush()
+        return True
+
+    def record_posted_commits(
+        self,
+        commit_shas: List[str],
+        branch_state: Dict[str, str],
+        posted_commits: Iterable[str],
+    ) -> bool:
+        """Add delivered commits to the posted history.
+
+        posted_commits only matters while no history is stored yet (e.g. a freshly seeded
+        history); it is adopted before commit_shas are added.
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            if not self._posted_commits_present:
+                self._branch_state = normalize_branch_state(branch_state)
+                self._legacy_sha = None
+                self._adopt_history(posted_commits)
+                self._posted_commits_present = True
+                self._needs_full_save = True
+
+            for commit_sha in commit_shas:
+                if self._posted_commits.add(commit_sha) and not self._needs_full_save:
+                    self._pending_commit_shas.append(normalize_commit_sha(commit_sha))
+
+        self._schedule_flush()
+        return True
+
+    def _schedule_flush(self) -> None:
+        """Arrange for pending writes to reach the underlying store."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_now()
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                max(0.0, float(constants.STATE_WRITE_BEHIND_DELAY)),
+                self._start_timed_flush,
+                loop,
+            )
+
+    def _start_timed_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._flush_handle = None
+        self._flush_task = loop.create_task(self.flush())
+
+    def flush_now(self) -> None:
+        """Write pending changes to the underlying store on the calling thread.
+
+        A failed write is kept pending so the next flush retries it.
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self.dirty or not self._loaded:
+                    return
+
+                branch_state = dict(self._branch_state)
+                commit_shas = list(self._pending_commit_shas)
+                needs_full_save = self._needs_full_save
+                branches_dirty = self._branches_dirty
+                # Incremental writes only fall back to the full history while none is stored,
+                # and that case always sets needs_full_save.
+                posted_commits = (
+                    self._posted_commits.to_list()
+                    if needs_full_save or not self.store.incremental_writes
+                    else []
+                )
+                self._pending_commit_shas.clear()
+                self._needs_full_save = False
+                self._branches_dirty = False
+
+            saved = False
+            try:
+                with metrics.STATE_SAVE_DURATION.time(project=self.name), tracing.span("state.flush", project=self.name):
+                    if needs_full_save:
+                        saved = self.store.save(branch_state, posted_commits)
+                    elif commit_shas:
+                        saved = self.store.record_posted_commits(commit_shas, branch_state, posted_commits)
+                    else:
+                        saved = self.store.save_branches(branch_state, posted_commits)
+            finally:
+                if not saved:
+                    self._restore_pending(commit_shas, needs_full_save, branches_dirty)
+
+    def _restore_pending(self, commit_shas: List[str], needs_full_save: bool, branches_dirty: bool) -> None:
+        """Put the changes of a failed flush back so the next flush writes them again."""
+        with self._lock:
+            self._branches_dirty = self._branches_dirty or branches_dirty
+            self._needs_full_save = self._needs_full_save or needs_full_save
+
+            if not self._needs_full_save:
+                self._pending_commit_shas[:0] = commit_shas
+
+    async def flush(self) -> None:
+        """Write pending changes in a worker thread so the event loop never blocks on disk."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self.dirty:
+            await asyncio.to_thread(self.flush_now)
+
+    def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self.flush_now()
+        self.store.close()
+
+
+def get_sqlite_state_file(state_file: str) -> str:
+    """Return the SQLite database path that sits next to a project's JSON state file."""
+    return f"{os.path.splitext(state_file)[0]}.sqlite3"
+
+
+def get_journal_state_file(state_file: str) -> str:
+    """Return the journal path that sits next to a project's JSON state file."""
+    return f"{os.path.splitext(state_file)[0]}.journal"
+
+
+def create_state_store(project: constants.ProjectConfig) -> CommitStateStore:
+    """Return the state store selected by the project's state_backend."""
+    if project.state_backend == "sqlite":
+        return SQLiteStateStore(get_sqlite_state_file(project.state_file), legacy_state_file=project.state_file)
+
+    if project.state_backend == "journal":
+        return JournalStateStore(get_journal_state_file(project.state_file), legacy_state_file=project.state_file)
+
+    return JsonStateStore(project.state_file)
+
+
+def open_state_file(path: str) -> CommitStateStore:
+    """Return a store for a state file, picking the format from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".journal":
+        return JournalStateStore(path)
+
+    if extension == ".sqlite3":
+        return SQLiteStateStore(path)
+
+    return JsonStateStore(path)
+
+
+def convert_state_file(source_path: str, destination_path: str) -> None:
+    """Copy commit state between the JSON, journal and SQLite formats."""
+    source, destination = open_state_file(source_path), open_state_file(destination_path)
+
+    try:
+        branch_state, posted_commits, legacy_sha, posted_commits_present = source.load()
+
+        if legacy_sha:
+            raise ValueError(f"{source_path} uses the old single-SHA format; start the bot once to migrate it.")
+
+        destination.save(branch_state, posted_commits if posted_commits_present else [])
+    finally:
+        source.close()
+        destination.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Convert a project's commit state between the JSON (.txt/.json), .journal and .sqlite3 formats."
+    )
+    parser.add_argument("source", help="existing state file")
+    parser.add_argument("destination", help="state file to write; its format follows the extension")
+    args = parser.parse_args()
+
+    convert_state_file(args.source, args.destination)
+    print(f"Converted {args.source} to {args.destination}.")
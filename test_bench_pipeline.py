@@ -0,0 +1,25 @@
+import unittest
+
+from bench_pipeline import BenchCase, find_regressions, run_case
+
+
+class BenchPipelineTests(unittest.TestCase):
+    def test_small_case_posts_every_pushed_commit(self):
+        metrics = run_case(BenchCase("test", projects=2, branches=2, commits_per_push=2, body_lines=3))
+
+        self.assertEqual(8, metrics["discord_sends"])
+        self.assertEqual(2, metrics["idle_check_requests"])
+        self.assertIn("state_journal_load_ms", metrics)
+
+    def test_regressions_allow_timing_noise_but_not_extra_requests(self):
+        baseline = {"small": {"scan_ms": 10.0, "scan_requests": 2}}
+
+        self.assertEqual([], find_regressions({"small": {"scan_ms": 14.0, "scan_requests": 2}}, baseline, 0.5))
+        self.assertEqual(
+            ["small.scan_ms: 16.0 (baseline 10.0)", "small.scan_requests: 3 (baseline 2)"],
+            find_regressions({"small": {"scan_ms": 16.0, "scan_requests": 3}}, baseline, 0.5),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
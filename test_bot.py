@@ -0,0 +1,221 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import bot
+import constants
+from github_integration import GitHubCommitCheckResult, GitHubMonitor
+
+
+def make_project(temp_dir, key, channel_id=123):
+    return constants.ProjectConfig(
+        key=key,
+        display_name=key.title(),
+        repo_owner="MuskaGH",
+        repo_name=key.title(),
+        channel_id=channel_id,
+        state_file=os.path.join(temp_dir, f"last_commit_{key}.txt"),
+    )
+
+
+class ScriptedMonitor(GitHubMonitor):
+    def __init__(self, project, check):
+        super().__init__(project)
+        self.check = check
+
+    async def check_for_new_commit_updates(self):
+        return await self.check()
+
+
+class RunGitHubCommitCheckTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        bot._github_check_lock = None
+        bot._pending_deliveries.clear()
+        bot._project_schedules.clear()
+        bot._project_locks.clear()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_projects_are_checked_concurrently_and_failures_are_isolated(self):
+        running = 0
+        max_running = 0
+        checked = []
+
+        def make_check(key, fail=False):
+            async def check():
+                nonlocal running, max_running
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                checked.append(key)
+
+                if fail:
+                    raise RuntimeError("boom")
+
+                return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+            return check
+
+        monitors = tuple(
+            (project, ScriptedMonitor(project, make_check(project.key, fail=project.key == "broken")))
+            for project in (
+                make_project(self.temp_dir.name, "first"),
+                make_project(self.temp_dir.name, "broken"),
+                make_project(self.temp_dir.name, "third"),
+            )
+        )
+
+        with mock.patch.object(bot, "project_monitors", monitors), \
+                mock.patch.object(constants, "GITHUB_MAX_CONCURRENT_PROJECT_CHECKS", 2):
+            posted_any = await bot.run_github_commit_check()
+
+        self.assertFalse(posted_any)
+        self.assertCountEqual(["first", "broken", "third"], checked)
+        self.assertEqual(2, max_running)
+
+    async def test_slow_project_times_out_without_blocking_others(self):
+        checked = []
+
+        async def slow_check():
+            await asyncio.sleep(10)
+
+        async def fast_check():
+            checked.append("fast")
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        slow_project = make_project(self.temp_dir.name, "slow")
+        fast_project = make_project(self.temp_dir.name, "fast")
+        monitors = (
+            (slow_project, ScriptedMonitor(slow_project, slow_check)),
+            (fast_project, ScriptedMonitor(fast_project, fast_check)),
+        )
+
+        with mock.patch.object(bot, "project_monitors", monitors), \
+                mock.patch.object(constants, "GITHUB_PROJECT_CHECK_TIMEOUT", 0.05):
+            posted_any = await bot.run_github_commit_check()
+
+        self.assertFalse(posted_any)
+        self.assertEqual(["fast"], checked)
+
+    async def test_scheduled_check_skips_projects_that_are_not_due(self):
+        checked = []
+
+        def make_check(key):
+            async def check():
+                checked.append(key)
+                return GitHubCommitCheckResult([], {"main": "a" * 40}, {"main": "a" * 40}, [])
+
+            return check
+
+        idle_project = make_project(self.temp_dir.name, "idle")
+        due_project = make_project(self.temp_dir.name, "due")
+        monitors = tuple(
+            (project, ScriptedMonitor(project, make_check(project.key)))
+            for project in (idle_project, due_project)
+        )
+        bot._get_project_schedule(idle_project).next_check_at = time.monotonic() + 600
+
+        with mock.patch.object(bot, "project_monitors", monitors), \
+                mock.patch.object(constants, "GITHUB_ADAPTIVE_PROJECT_POLLING", True):
+            await bot.run_github_commit_check()
+            self.assertEqual(["due"], checked)
+
+            await bot.run_github_commit_check(manual=True)
+            self.assertCountEqual(["due", "idle", "due"], checked)
+
+    async def test_project_with_undelivered_updates_is_not_checked_again(self):
+        checked = []
+
+        async def check():
+            checked.append("busy")
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        project = make_project(self.temp_dir.name, "busy")
+        monitor = ScriptedMonitor(project, check)
+        pending_delivery = asyncio.get_running_loop().create_future()
+        bot._pending_deliveries[project.key] = pending_delivery
+
+        self.assertFalse(await bot._run_project_commit_check(project, monitor))
+        self.assertEqual([], checked)
+
+        pending_delivery.set_result(True)
+        await bot._run_project_commit_check(project, monitor)
+        self.assertEqual(["busy"], checked)
+
+    async def test_push_webhook_waits_for_a_delivery_queued_while_it_waited_for_the_lock(self):
+        project = make_project(self.temp_dir.name, "pushed")
+        monitor = GitHubMonitor(project)
+        pending_delivery = asyncio.get_running_loop().create_future()
+        built_after_delivery = []
+
+        def build_push_updates(payload):
+            built_after_delivery.append(pending_delivery.done())
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        monitor.build_push_updates = build_push_updates
+
+        # A poll holds the lock and queues the push's commits before the webhook gets in.
+        async with bot._get_project_lock(project):
+            push = asyncio.create_task(bot.handle_github_push(project, monitor, {}))
+            await asyncio.sleep(0)
+            bot._track_delivery(project, pending_delivery)
+
+        await asyncio.sleep(0)
+        self.assertFalse(push.done())
+
+        pending_delivery.set_result(True)
+        self.assertFalse(await push)
+        self.assertEqual([True], built_after_delivery)
+
+
+    async def test_push_delivery_does_not_hold_the_project_lock(self):
+        project = make_project(self.temp_dir.name, "pushed")
+        monitor = GitHubMonitor(project)
+        push_delivery = asyncio.get_running_loop().create_future()
+
+        async def queue_commit_check(project, monitor, commit_check):
+            return bot._track_delivery(project, push_delivery)
+
+        monitor.build_push_updates = lambda payload: GitHubCommitCheckResult([], {}, {}, [])
+
+        with mock.patch.object(bot, "_queue_commit_check", queue_commit_check):
+            push = asyncio.create_task(bot.handle_github_push(project, monitor, {}))
+            await asyncio.sleep(0)
+
+            # While Discord posts the push, a scheduled check skips instead of waiting for the lock.
+            self.assertFalse(bot._get_project_lock(project).locked())
+            self.assertFalse(await asyncio.wait_for(bot._run_project_commit_check(project, monitor), timeout=1))
+
+            push_delivery.set_result(True)
+            self.assertTrue(await push)
+
+
+class ProjectPollScheduleTests(unittest.TestCase):
+    def test_idle_projects_back_off_and_active_projects_reset_to_fastest(self):
+        schedule = bot.ProjectPollSchedule(interval=60)
+
+        with mock.patch.object(constants, "GITHUB_IDLE_POLL_INTERVAL_CEILING", 300):
+            schedule.record_check(False, 0.0, 60)
+            self.assertEqual(120, schedule.interval)
+            self.assertEqual(120.0, schedule.next_check_at)
+
+            schedule.record_check(False, 0.0, 60)
+            schedule.record_check(False, 0.0, 60)
+            self.assertEqual(300, schedule.interval)
+
+            schedule.record_check(None, 0.0, 60)
+            self.assertEqual(300, schedule.interval)
+
+            schedule.record_check(True, 10.0, 60)
+            self.assertEqual(bot.get_fastest_github_check_interval(), schedule.interval)
+            self.assertEqual(10.0 + schedule.interval, schedule.next_check_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import queue
+import threading
+import unittest
+
+from bot_gui import TextRedirector, insert_log_batch, take_log_batch
+
+
+class FakeText:
+    """Line-based stand-in for the Tk Text widget."""
+
+    def __init__(self):
+        self.lines = []
+        self.insert_calls = 0
+        self.state = None
+
+    def config(self, state):
+        self.state = state
+
+    def insert(self, index, *chars_and_tags):
+        self.insert_calls += 1
+        text = "".join(chars_and_tags[0::2])
+        self.lines.extend(text.split("\n")[:-1])
+
+    def index(self, index):
+        # "end-1c" sits on the empty line after the last newline.
+        return f"{len(self.lines) + 1}.0"
+
+    def delete(self, start, end):
+        del self.lines[:int(end.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class LogPipelineTests(unittest.TestCase):
+    def test_redirector_queues_complete_lines_only(self):
+        log_queue = queue.SimpleQueue()
+        redirector = TextRedirector(log_queue, "error")
+
+        redirector.write("Checking ")
+        redirector.write("GitHub\n\nDone\nPartial")
+        self.assertEqual(
+            [("Checking GitHub", "error"), ("Done", "error")],
+            [(text, tag) for _, text, tag in take_log_batch(log_queue, 10)],
+        )
+
+        redirector.flush()
+        self.assertEqual(["Partial"], [text for _, text, _ in take_log_batch(log_queue, 10)])
+
+    def test_writes_from_many_threads_are_not_lost(self):
+        log_queue = queue.SimpleQueue()
+        redirector = TextRedirector(log_queue)
+
+        def write_lines():
+            for index in range(500):
+                redirector.write(f"line {index}\n")
+
+        threads = [threading.Thread(target=write_lines) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(2000, len(take_log_batch(log_queue, 5000)))
+
+    def test_batches_are_bounded(self):
+        log_queue = queue.SimpleQueue()
+        for index in range(7):
+            log_queue.put(("12:00:00", f"line {index}", "info"))
+
+        self.assertEqual(5, len(take_log_batch(log_queue, 5)))
+        self.assertEqual(2, len(take_log_batch(log_queue, 5)))
+        self.assertEqual([], take_log_batch(log_queue, 5))
+
+    def test_batch_is_inserted_once_and_old_lines_are_trimmed(self):
+        text_widget = FakeText()
+
+        insert_log_batch(text_widget, [("12:00:00", f"line {index}", "info") for index in range(3)], max_lines=4)
+        insert_log_batch(text_widget, [("12:00:01", f"line {index}", "info") for index in range(3, 6)], max_lines=4)
+
+        self.assertEqual(2, text_widget.insert_calls)
+        self.assertEqual(
+            ["[12:00:00] line 2", "[12:00:01] line 3", "[12:00:01] line 4", "[12:00:01] line 5"],
+            text_widget.lines,
+        )
+        self.assertEqual("disabled", text_widget.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
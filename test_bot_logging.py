@@ -0,0 +1,111 @@
+import logging
+import os
+import queue
+import tempfile
+import unittest
+
+import bot_logging
+import constants
+from bot_gui import GuiLogHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class BotLoggingTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = constants.ProjectConfig(
+            key="test",
+            display_name="Avalore",
+            repo_owner="MuskaGH",
+            repo_name="Avalore",
+            channel_id=123,
+            state_file=os.path.join(self.temp_dir.name, "last_commit.txt"),
+        )
+        self.handler = ListHandler()
+
+    def tearDown(self):
+        bot_logging.stop_logging()
+        self.temp_dir.cleanup()
+
+    def test_project_logger_prefixes_messages_and_tags_records(self):
+        bot_logging.configure_logging([self.handler], level="INFO", log_file="")
+
+        bot_logging.get_project_logger(self.project).info("Posted %s new commit update(s) to Discord.", 2)
+        bot_logging.stop_logging()
+
+        [record] = self.handler.records
+        self.assertEqual("commitsbot.project.test", record.name)
+        self.assertEqual("[Avalore] Posted 2 new commit update(s) to Discord.", record.getMessage())
+        self.assertEqual("test", record.project)
+
+    def test_debug_records_are_dropped_at_info_level(self):
+        bot_logging.configure_logging([self.handler], level="INFO", log_file="")
+
+        project_logger = bot_logging.get_project_logger(self.project)
+        project_logger.debug("No new commits on %s (latest: %s)", "main", "abc1234")
+        project_logger.warning("GitHub rate limit is low.")
+        bot_logging.stop_logging()
+
+        self.assertEqual(["[Avalore] GitHub rate limit is low."], [record.getMessage() for record in self.handler.records])
+
+    def test_handler_levels_are_respected_behind_the_queue(self):
+        error_handler = ListHandler(logging.ERROR)
+        bot_logging.configure_logging([self.handler, error_handler], level="DEBUG", log_file="")
+
+        logger = bot_logging.get_logger("delivery")
+        logger.debug("Checking GitHub for new commits...")
+        logger.error("Error saving delivery outbox: %s", "disk full")
+        bot_logging.stop_logging()
+
+        self.assertEqual(2, len(self.handler.records))
+        self.assertEqual(["Error saving delivery outbox: disk full"], [record.getMessage() for record in error_handler.records])
+
+    def test_log_file_rotates_past_the_size_limit(self):
+        log_file = os.path.join(self.temp_dir.name, "logs", "commitsbot.log")
+        old_max_bytes = constants.LOG_FILE_MAX_BYTES
+        constants.LOG_FILE_MAX_BYTES = 200
+        self.addCleanup(setattr, constants, "LOG_FILE_MAX_BYTES", old_max_bytes)
+        bot_logging.configure_logging([], level="INFO", log_file=log_file)
+
+        for index in range(20):
+            bot_logging.get_logger("bot").info("Line %s of the rotation test.", index)
+        bot_logging.stop_logging()
+
+        self.assertTrue(os.path.exists(log_file))
+        self.assertTrue(os.path.exists(f"{log_file}.1"))
+
+    def test_gui_handler_queues_records_tagged_by_level(self):
+        log_queue = queue.SimpleQueue()
+        bot_logging.configure_logging([GuiLogHandler(log_queue)], level="INFO", log_file="")
+
+        project_logger = bot_logging.get_project_logger(self.project)
+        project_logger.info("Posted 1 new commit update(s) to Discord.")
+        project_logger.warning("GitHub rate limit is low.")
+        project_logger.error("Error reading delivery outbox.")
+        bot_logging.stop_logging()
+
+        lines = []
+        while not log_queue.empty():
+            _, text, tag = log_queue.get_nowait()
+            lines.append((text, tag))
+
+        self.assertEqual(
+            [
+                ("[Avalore] Posted 1 new commit update(s) to Discord.", "info"),
+                ("[Avalore] GitHub rate limit is low.", "warning"),
+                ("[Avalore] Error reading delivery outbox.", "error"),
+            ],
+            lines,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
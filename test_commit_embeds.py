@@ -0,0 +1,95 @@
+import dataclasses
+import unittest
+
+import discord
+
+import constants
+from commit_embeds import CommitEmbedTemplate, get_embed_size
+from github_integration import GitHubCommitUpdate, GitHubMonitor, batch_commit_updates
+
+
+def make_project(render_mode="embed"):
+    return constants.ProjectConfig(
+        key="test",
+        display_name="Avalore",
+        repo_owner="MuskaGH",
+        repo_name="Avalore",
+        channel_id=123,
+        state_file="unused_last_commit.txt",
+        render_mode=render_mode,
+    )
+
+
+class CommitEmbedTemplateTests(unittest.TestCase):
+    def test_commit_is_rendered_as_an_embed(self):
+        monitor = GitHubMonitor(make_project())
+        commit_data = {
+            "sha": "a" * 40,
+            "commit": {
+                "message": "Add quests\n\nNew quest log. Quest rewards",
+                "author": {"name": "Muska", "date": "2026-01-01T00:00:00Z"},
+                "committer": {"date": "2026-01-01T00:00:00Z"},
+            },
+            "files": [{"filename": "quests.py", "status": "added", "additions": 10, "deletions": 0}],
+        }
+
+        update = monitor.build_commit_update("a" * 40, commit_data, "main", 0)
+        embed = discord.Embed.from_dict(update.embed)
+
+        self.assertEqual("aaaaaaa Add quests", update.message)
+        self.assertEqual("Add quests", embed.title)
+        self.assertEqual("https://github.com/MuskaGH/Avalore/commit/" + "a" * 40, embed.url)
+        self.assertEqual("Muska", embed.author.name)
+        self.assertEqual("- New quest log.\n- Quest rewards.", embed.description)
+        self.assertEqual(
+            [("Commit", "aaaaaaa"), ("Branch", "main"), ("Files", "- Added 1 file(s): quests.py\n- Total: +10 additions, -0 deletions")],
+            [(field.name, field.value) for field in embed.fields],
+        )
+        self.assertEqual("New commit to Avalore's GitHub repository", embed.footer.text)
+
+    def test_text_mode_keeps_the_code_block_message(self):
+        monitor = GitHubMonitor(make_project(render_mode="text"))
+        commit_data = {"sha": "a" * 40, "commit": {"message": "Fix", "author": {"name": "Muska"}}}
+
+        update = monitor.build_commit_update("a" * 40, commit_data, "main", 0)
+
+        self.assertIsNone(update.embed)
+        self.assertTrue(update.message.startswith("**New commit to Avalore's GitHub repository detected!**"))
+
+    def test_huge_commits_stay_within_embed_limits(self):
+        template = CommitEmbedTemplate(make_project())
+        change_lines = [f"- Change {index} " + "x" * 80 for index in range(500)]
+
+        embed = template.render("a" * 40, "A" * 400, "T" * 400, change_lines, change_lines, branch_name="main")
+
+        self.assertLessEqual(len(embed["title"]), constants.DISCORD_EMBED_TITLE_LIMIT)
+        self.assertLessEqual(len(embed["author"]["name"]), constants.DISCORD_EMBED_AUTHOR_LIMIT)
+        self.assertLessEqual(len(embed["description"]), constants.DISCORD_EMBED_DESCRIPTION_LIMIT)
+        self.assertTrue(embed["description"].endswith("- Changes truncated to fit Discord's embed limit."))
+        self.assertTrue(all(len(field["value"]) <= constants.DISCORD_EMBED_FIELD_VALUE_LIMIT for field in embed["fields"]))
+        self.assertLessEqual(get_embed_size(embed), constants.DISCORD_EMBED_TOTAL_LIMIT)
+
+    def test_embed_updates_are_batched_by_count_and_total_size(self):
+        template = CommitEmbedTemplate(make_project())
+        small = template.render("a" * 40, "Muska", "Small", [], [])
+        large = template.render("b" * 40, "Muska", "Large", ["- " + "x" * 2500], [])
+        updates = [
+            GitHubCommitUpdate(commit_sha=str(index), timestamp="", order=index, message="", embed=embed)
+            for index, embed in enumerate([small] * 12 + [large, large, large])
+        ]
+
+        batches = batch_commit_updates(updates)
+
+        self.assertEqual([10, 4, 1], [len(batch) for batch in batches])
+        self.assertTrue(all(
+            sum(get_embed_size(update.embed) for update in batch) <= constants.DISCORD_EMBED_TOTAL_LIMIT
+            for batch in batches
+        ))
+
+    def test_invalid_render_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            constants.validate_projects([dataclasses.replace(make_project(), render_mode="html")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import discord
+
+import constants
+from discord_delivery import DeliveryOutbox, DiscordDeliveryDispatcher, get_delivery_retry_delay, get_outbox_file
+from github_integration import GitHubCommitCheckResult, GitHubCommitUpdate, GitHubMonitor
+
+
+def make_http_error(status):
+    return discord.HTTPException(mock.Mock(status=status, reason="error"), "error")
+
+
+class FakeChannel:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def send(self, content):
+        await self.release.wait()
+
+        failure = self.failures.pop(0) if self.failures else None
+
+        if failure is not None:
+            raise failure
+
+        self.sent.append(content)
+
+
+class DiscordDeliveryDispatcherTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = constants.ProjectConfig(
+            key="avalore",
+            display_name="Avalore",
+            repo_owner="MuskaGH",
+            repo_name="Avalore",
+            channel_id=123,
+            state_file=os.path.join(self.temp_dir.name, "last_commit.txt"),
+        )
+        self.monitor = GitHubMonitor(self.project)
+        self.monitor.save_processed_commits({"main": "a" * 40}, ["a" * 40])
+        self.channel = FakeChannel()
+        self.dispatcher = DiscordDeliveryDispatcher(lambda channel_id: self.channel)
+
+        patcher = mock.patch.object(constants, "DISCORD_DELIVERY_RETRY_BASE_DELAY", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.dispatcher.stop()
+        self.temp_dir.cleanup()
+
+    def make_check(self, *commit_shas):
+        branch_state, posted_commits, _, _ = self.monitor.state_store.load_live()
+        updates = [
+            GitHubCommitUpdate(commit_sha=commit_sha, timestamp="", order=index, message=f"commit {commit_sha[:7]}")
+            for index, commit_sha in enumerate(commit_shas)
+        ]
+        return GitHubCommitCheckResult(updates, branch_state, {"main": commit_shas[-1]}, posted_commits)
+
+    async def deliver(self, *commit_shas):
+        delivery = await self.dispatcher.submit(self.project, self.monitor, self.make_check(*commit_shas))
+        return await delivery
+
+    async def test_delivery_is_confirmed_and_advances_state(self):
+        delivered = await self.deliver("b" * 40, "c" * 40)
+
+        self.assertTrue(delivered)
+        self.assertEqual(["commit bbbbbbb", "commit ccccccc"], self.channel.sent)
+
+        branch_state, posted_commits, _, _ = GitHubMonitor(self.project).get_processed_commit_state()
+        self.assertEqual({"main": "c" * 40}, branch_state)
+        self.assertEqual(["a" * 40, "b" * 40, "c" * 40], posted_commits)
+
+    async def test_transient_failures_are_retried(self):
+        self.channel.failures = [make_http_error(503), discord.RateLimited(0)]
+
+        delivered = await self.deliver("b" * 40)
+
+        self.assertTrue(delivered)
+        self.assertEqual(["commit bbbbbbb"], self.channel.sent)
+
+    async def test_permanent_failure_keeps_only_delivered_commits(self):
+        self.channel.failures = [None, make_http_error(403)]
+
+        delivered = await self.deliver("b" * 40, "c" * 40)
+
+        self.assertFalse(delivered)
+        branch_state, posted_commits, _, _ = GitHubMonitor(self.project).get_processed_commit_state()
+        self.assertEqual({"main": "a" * 40}, branch_state)
+        self.assertEqual(["a" * 40, "b" * 40], posted_commits)
+
+    async def test_failed_delivery_is_resumed_from_the_outbox(self):
+        self.channel.failures = [None, make_http_error(403)]
+        self.assertFalse(await self.deliver("b" * 40, "c" * 40))
+
+        # A fresh dispatcher and monitor stand in for a restarted bot.
+        monitor = GitHubMonitor(self.project)
+        dispatcher = DiscordDeliveryDispatcher(lambda channel_id: self.channel)
+        self.addAsyncCleanup(dispatcher.stop)
+
+        self.assertTrue(await (await dispatcher.resume(self.project, monitor)))
+        self.assertEqual(["commit bbbbbbb", "commit ccccccc"], self.channel.sent)
+        self.assertFalse(os.path.exists(get_outbox_file(self.project.state_file)))
+        self.assertFalse(os.path.exists(DeliveryOutbox(get_outbox_file(self.project.state_file)).delivered_file))
+        self.assertIsNone(await dispatcher.resume(self.project, monitor))
+
+        branch_state, posted_commits, _, _ = GitHubMonitor(self.project).get_processed_commit_state()
+        self.assertEqual({"main": "c" * 40}, branch_state)
+        self.assertEqual(["a" * 40, "b" * 40, "c" * 40], posted_commits)
+
+    async def test_outbox_skips_updates_already_marked_delivered(self):
+        check = self.make_check("b" * 40, "c" * 40)
+        outbox = DeliveryOutbox(get_outbox_file(self.project.state_file))
+        outbox.store(check)
+        outbox.mark_delivered(["b" * 40])
+
+        _, next_branch_state, pending_updates = outbox.load()
+
+        self.assertEqual({"main": "c" * 40}, next_branch_state)
+        self.assertEqual(["c" * 40], [update.commit_sha for update in pending_updates])
+
+    async def test_marking_delivered_leaves_the_outbox_file_untouched(self):
+        outbox = DeliveryOutbox(get_outbox_file(self.project.state_file))
+        outbox.store(self.make_check("b" * 40, "c" * 40))
+        with open(outbox.outbox_file, "rb") as f:
+            stored = f.read()
+
+        outbox.mark_delivered(["b" * 40])
+        with open(outbox.delivered_file, "a", encoding="utf-8") as f:
+            f.write("\nccc")  # A record torn by a crash
+        outbox.mark_delivered(["c" * 40])
+
+        with open(outbox.outbox_file, "rb") as f:
+            self.assertEqual(stored, f.read())
+        self.assertEqual([], outbox.load()[2])
+
+        outbox.store(self.make_check("d" * 40))
+        self.assertEqual(["d" * 40], [update.commit_sha for update in outbox.load()[2]])
+
+    async def test_submit_returns_before_the_channel_accepts_the_message(self):
+        self.channel.release.clear()
+
+        delivery = await self.dispatcher.submit(self.project, self.monitor, self.make_check("b" * 40))
+        await asyncio.sleep(0)
+
+        self.assertFalse(delivery.done())
+        self.channel.release.set()
+        self.assertTrue(await delivery)
+
+    async def test_commits_posted_by_an_earlier_job_are_not_sent_again(self):
+        self.channel.release.clear()
+        first = await self.dispatcher.submit(self.project, self.monitor, self.make_check("b" * 40))
+        second = await self.dispatcher.submit(self.project, self.monitor, self.make_check("b" * 40))
+
+        self.channel.release.set()
+
+        self.assertTrue(await first)
+        self.assertTrue(await second)
+        self.assertEqual(["commit bbbbbbb"], self.channel.sent)
+
+    def test_retry_delay_classification(self):
+        with mock.patch.object(constants, "DISCORD_DELIVERY_RETRY_BASE_DELAY", 2.0), \
+                mock.patch.object(constants, "DISCORD_DELIVERY_RETRY_MAX_DELAY", 5.0):
+            self.assertEqual(2.0, get_delivery_retry_delay(make_http_error(500), 0))
+            self.assertEqual(5.0, get_delivery_retry_delay(make_http_error(429), 3))
+            self.assertEqual(1.5, get_delivery_retry_delay(discord.RateLimited(1.5), 0))
+            self.assertIsNone(get_delivery_retry_delay(make_http_error(403), 0))
+            self.assertIsNone(get_delivery_retry_delay(ValueError("bad"), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,28 @@
+import asyncio
+import dataclasses
 import json
 import os
 import tempfile
+import time
 import unittest
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 
 import constants
-from github_integration import GitHubMonitor
+import metrics
+from bench_formatting import reference_fit_commit_message
+from github_integration import (
+    GitHubCommitUpdate,
+    GitHubGraphQLMonitor,
+    GitHubMonitor,
+    GitHubRateLimiter,
+    batch_commit_updates,
+    create_github_monitor,
+    format_commit_update_batch,
+)
 
 
 def make_branch(name, commit_sha):
@@ -74,6 +92,12 @@ class FakeGitHubMonitor(GitHubMonitor):
     async def get_branches(self):
         return self.branches
 
+    async def get_branch_heads(self):
+        return None
+
+    async def get_compare_commits(self, session, branch_name, base_sha):
+        return None
+
     async def get_branch_commits_since(self, session, branch_name, last_processed_sha):
         return self.branch_commits.get(branch_name, ([], True))
 
@@ -86,11 +110,10 @@ class FakeGitHubMonitor(GitHubMonitor):
 
 class GitHubMonitorStateTests(TempStateMixin, unittest.TestCase):
     def test_reads_legacy_branch_and_posted_commit_state(self):
-        monitor = GitHubMonitor(self.project)
-
+        # Monitors read the state file once, so each variant is read by a fresh monitor.
         self.write_raw_state(" ABC123 ")
         branch_state, posted_commits, legacy_sha, posted_commits_present = (
-            monitor.get_processed_commit_state()
+            GitHubMonitor(self.project).get_processed_commit_state()
         )
 
         self.assertEqual({}, branch_state)
@@ -105,7 +128,7 @@ class GitHubMonitorStateTests(TempStateMixin, unittest.TestCase):
             }
         )
         branch_state, posted_commits, legacy_sha, posted_commits_present = (
-            monitor.get_processed_commit_state()
+            GitHubMonitor(self.project).get_processed_commit_state()
         )
 
         self.assertEqual({"main": "aaa111"}, branch_state)
@@ -115,7 +138,7 @@ class GitHubMonitorStateTests(TempStateMixin, unittest.TestCase):
 
         self.write_json_state({"branches": {"main": "DDD444"}})
         branch_state, posted_commits, legacy_sha, posted_commits_present = (
-            monitor.get_processed_commit_state()
+            GitHubMonitor(self.project).get_processed_commit_state()
         )
 
         self.assertEqual({"main": "ddd444"}, branch_state)
@@ -140,6 +163,32 @@ class GitHubMonitorFormattingTests(TempStateMixin, unittest.TestCase):
         self.assertIn("Changes truncated to fit Discord's 2000-character message limit.", message)
         self.assertTrue(message.endswith("```"))
 
+    def test_fitted_message_matches_the_reference_fitter(self):
+        monitor = GitHubMonitor(self.project)
+        base_lines = ["**Header**", "```ini", "[Title] Fit", "", "[Changes]"]
+
+        for message_limit in (40, 120, 250, 500):
+            for line_length in (1, 9, 30, 70, 200):
+                change_lines = [f"- {index:03d}" + "x" * line_length for index in range(60)]
+
+                with mock.patch.object(constants, "DISCORD_MESSAGE_LIMIT", message_limit):
+                    self.assertEqual(
+                        reference_fit_commit_message(base_lines, change_lines),
+                        monitor._fit_commit_message(base_lines, change_lines),
+                    )
+
+    def test_commit_updates_are_batched_within_the_message_limit(self):
+        updates = [
+            GitHubCommitUpdate(commit_sha=str(index) * 40, timestamp="", order=index, message=message)
+            for index, message in enumerate(["a" * 900, "b" * 900, "c" * 1500, "d" * 300, "e" * 2000])
+        ]
+
+        batches = batch_commit_updates(updates)
+
+        self.assertEqual([[0, 1], [2, 3], [4]], [[update.order for update in batch] for batch in batches])
+        self.assertTrue(all(len(format_commit_update_batch(batch)) <= constants.DISCORD_MESSAGE_LIMIT for batch in batches))
+        self.assertEqual("a" * 900 + "\n" + "b" * 900, format_commit_update_batch(batches[0]))
+
 
 class MultiProjectTests(TempStateMixin, unittest.TestCase):
     def test_duplicate_project_state_files_are_rejected(self):
@@ -292,6 +341,41 @@ class GitHubMonitorScanTests(TempStateMixin, unittest.IsolatedAsyncioTestCase):
         self.assertEqual(already_posted, saved_state["branches"]["main"])
         self.assertEqual([already_posted], saved_state["posted_commits"])
 
+    async def test_commit_details_are_fetched_concurrently_in_commit_order(self):
+        old_main = "0" * 40
+        commit_shas = [str(index) * 40 for index in range(1, 6)]
+        commits = [
+            make_commit(commit_sha, f"Commit {index}", f"2026-01-0{index}T00:00:00Z")
+            for index, commit_sha in enumerate(commit_shas, start=1)
+        ]
+        self.write_json_state({"branches": {"main": old_main}, "posted_commits": []})
+        in_flight = 0
+        max_in_flight = 0
+
+        class SlowDetailsMonitor(FakeGitHubMonitor):
+            async def get_commit_details(self, commit_sha, session=None):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                # Later commits answer first to prove ordering does not depend on completion order.
+                await asyncio.sleep(0.001 * (10 - int(commit_sha[0])))
+                in_flight -= 1
+                return await super().get_commit_details(commit_sha, session=session)
+
+        monitor = SlowDetailsMonitor(
+            project=self.project,
+            branches=[make_branch("main", commit_shas[-1])],
+            branch_commits={"main": (list(reversed(commits)), True)},
+            commit_details=dict(zip(commit_shas, commits)),
+        )
+
+        with mock.patch.object(constants, "GITHUB_MAX_CONCURRENT_COMMIT_DETAILS", 3):
+            check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual(commit_shas, [update.commit_sha for update in check_result.updates])
+        self.assertEqual(list(range(5)), [update.order for update in check_result.updates])
+        self.assertEqual(3, max_in_flight)
+
     async def test_collecting_updates_does_not_advance_state_before_delivery(self):
         old_main = "7" * 40
         new_main = "8" * 40
@@ -320,5 +404,476 @@ class GitHubMonitorScanTests(TempStateMixin, unittest.IsolatedAsyncioTestCase):
         self.assertEqual(initial_state, saved_state)
 
 
+class GitHubMonitorSessionTests(TempStateMixin, unittest.IsolatedAsyncioTestCase):
+    async def test_attached_session_is_reused_and_left_open(self):
+        monitor = GitHubMonitor(self.project)
+
+        async with aiohttp.ClientSession() as shared_session:
+            monitor.attach_session(shared_session)
+
+            async with monitor._session_scope() as first_session:
+                pass
+            async with monitor._session_scope() as second_session:
+                pass
+
+            self.assertIs(shared_session, first_session)
+            self.assertIs(shared_session, second_session)
+            self.assertFalse(shared_session.closed)
+
+        async with monitor._session_scope() as fallback_session:
+            self.assertIsNot(shared_session, fallback_session)
+
+        self.assertTrue(fallback_session.closed)
+
+
+class FakeGitHubServerMixin:
+    async def start_fake_github(self, routes):
+        app = web.Application()
+        self.github_requests = []
+
+        @web.middleware
+        async def record_request(request, handler):
+            self.github_requests.append(request)
+            return await handler(request)
+
+        app.middlewares.append(record_request)
+        app.add_routes(routes)
+        server = TestServer(app)
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        return str(server.make_url("")).rstrip("/")
+
+
+class GitHubMonitorConditionalRequestTests(
+    FakeGitHubServerMixin,
+    TempStateMixin,
+    unittest.IsolatedAsyncioTestCase,
+):
+    async def test_not_modified_response_reuses_cached_json(self):
+        branches = [make_branch("main", "a" * 40)]
+
+        async def list_branches(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.json_response(branches, headers={"ETag": '"v1"'})
+
+        api_base = await self.start_fake_github(
+            [web.get("/repos/MuskaGH/Avalore/branches", list_branches)]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+        metrics.GITHUB_REQUESTS.clear()
+
+        first_branches = await monitor.get_branches()
+        second_branches = await monitor.get_branches()
+
+        self.assertEqual(branches, first_branches)
+        self.assertEqual(branches, second_branches)
+        self.assertEqual(2, len(self.github_requests))
+        self.assertNotIn("If-None-Match", self.github_requests[0].headers)
+        self.assertEqual('"v1"', self.github_requests[1].headers["If-None-Match"])
+        self.assertEqual(
+            [({"project": "test", "status": "200"}, 1), ({"project": "test", "status": "304"}, 1)],
+            [(value["labels"], value["value"]) for value in metrics.GITHUB_REQUESTS.snapshot()],
+        )
+
+    async def test_fetch_once_responses_are_not_cached(self):
+        commit_sha = "a" * 40
+
+        async def commit_details(request):
+            return web.json_response(make_commit(commit_sha, "Title", "2026-01-01T00:00:00Z"), headers={"ETag": '"c1"'})
+
+        api_base = await self.start_fake_github(
+            [web.get(f"/repos/MuskaGH/Avalore/commits/{commit_sha}", commit_details)]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        await monitor.get_commit_details(commit_sha)
+        await monitor.get_commit_details(commit_sha)
+
+        self.assertEqual(0, len(monitor._response_cache))
+        self.assertNotIn("If-None-Match", self.github_requests[1].headers)
+
+
+class GitHubMonitorBranchHeadsTests(
+    FakeGitHubServerMixin,
+    TempStateMixin,
+    unittest.IsolatedAsyncioTestCase,
+):
+    async def test_unchanged_branch_heads_skip_the_branch_scan(self):
+        main_sha = "a" * 40
+        self.write_json_state({"branches": {"main": main_sha}, "posted_commits": [main_sha]})
+
+        async def matching_refs(request):
+            return web.json_response(
+                [{"ref": "refs/heads/main", "object": {"sha": main_sha, "type": "commit"}}],
+                headers={"ETag": '"refs"'},
+            )
+
+        api_base = await self.start_fake_github(
+            [web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs)]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual([], check_result.updates)
+        self.assertFalse(check_result.should_save_state)
+        self.assertFalse(check_result.has_new_activity)
+        self.assertEqual(["/repos/MuskaGH/Avalore/git/matching-refs/heads"], [r.path for r in self.github_requests])
+
+    async def test_moved_branch_head_reuses_refs_instead_of_listing_branches(self):
+        old_sha = "a" * 40
+        new_sha = "b" * 40
+        new_commit = make_commit(new_sha, "Moved", "2026-01-02T00:00:00Z")
+        self.write_json_state({"branches": {"main": old_sha}, "posted_commits": [old_sha]})
+
+        async def matching_refs(request):
+            return web.json_response([{"ref": "refs/heads/main", "object": {"sha": new_sha}}])
+
+        async def list_commits(request):
+            return web.json_response([new_commit, make_commit(old_sha, "Old", "2026-01-01T00:00:00Z")])
+
+        async def commit_details(request):
+            return web.json_response(new_commit)
+
+        api_base = await self.start_fake_github(
+            [
+                web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs),
+                web.get("/repos/MuskaGH/Avalore/commits", list_commits),
+                web.get("/repos/MuskaGH/Avalore/commits/{sha}", commit_details),
+            ]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual([new_sha], [update.commit_sha for update in check_result.updates])
+        self.assertTrue(check_result.has_new_activity)
+        self.assertNotIn("/repos/MuskaGH/Avalore/branches", [r.path for r in self.github_requests])
+
+
+class GitHubMonitorCompareTests(
+    FakeGitHubServerMixin,
+    TempStateMixin,
+    unittest.IsolatedAsyncioTestCase,
+):
+    async def test_compare_returns_new_commits_without_detail_requests(self):
+        old_sha = "a" * 40
+        first_sha = "b" * 40
+        second_sha = "c" * 40
+        self.write_json_state({"branches": {"main": old_sha}, "posted_commits": [old_sha]})
+        comparison = {
+            "status": "ahead",
+            "total_commits": 2,
+            "commits": [
+                make_commit(first_sha, "First", "2026-01-02T00:00:00Z"),
+                make_commit(second_sha, "Second", "2026-01-03T00:00:00Z"),
+            ],
+        }
+
+        async def matching_refs(request):
+            return web.json_response([{"ref": "refs/heads/main", "object": {"sha": second_sha}}])
+
+        async def compare(request):
+            self.assertEqual(f"{old_sha}...main", request.match_info["basehead"])
+            return web.json_response(comparison)
+
+        api_base = await self.start_fake_github(
+            [
+                web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs),
+                web.get("/repos/MuskaGH/Avalore/compare/{basehead}", compare),
+            ]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual([first_sha, second_sha], [update.commit_sha for update in check_result.updates])
+        self.assertEqual(2, len(self.github_requests))
+
+    async def test_compare_commits_are_detailed_for_embed_file_lists(self):
+        old_sha = "a" * 40
+        new_sha = "b" * 40
+        self.project = dataclasses.replace(self.project, render_mode="embed")
+        self.write_json_state({"branches": {"main": old_sha}, "posted_commits": [old_sha]})
+
+        async def matching_refs(request):
+            return web.json_response([{"ref": "refs/heads/main", "object": {"sha": new_sha}}])
+
+        async def compare(request):
+            return web.json_response(
+                {"status": "ahead", "total_commits": 1, "commits": [make_commit(new_sha, "Add quests", "2026-01-02T00:00:00Z")]}
+            )
+
+        async def commit_details(request):
+            return web.json_response(
+                dict(
+                    make_commit(new_sha, "Add quests", "2026-01-02T00:00:00Z"),
+                    files=[{"filename": "quests.py", "status": "added", "additions": 10, "deletions": 0}],
+                )
+            )
+
+        api_base = await self.start_fake_github(
+            [
+                web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs),
+                web.get("/repos/MuskaGH/Avalore/compare/{basehead}", compare),
+                web.get(f"/repos/MuskaGH/Avalore/commits/{new_sha}", commit_details),
+            ]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertIn(
+            {"name": "Files", "value": "- Added 1 file(s): quests.py\n- Total: +10 additions, -0 deletions", "inline": False},
+            check_result.updates[0].embed["fields"],
+        )
+
+    async def test_diverged_compare_posts_commits_since_the_merge_base(self):
+        old_sha = "a" * 40
+        rewritten_sha = "d" * 40
+
+        async def compare(request):
+            return web.json_response(
+                {
+                    "status": "diverged",
+                    "total_commits": 1,
+                    "commits": [make_commit(rewritten_sha, "Rewritten", "2026-01-04T00:00:00Z")],
+                }
+            )
+
+        api_base = await self.start_fake_github(
+            [web.get("/repos/MuskaGH/Avalore/compare/{basehead}", compare)]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        async with aiohttp.ClientSession() as session:
+            commits, found_baseline = await monitor.get_compare_commits(session, "main", old_sha)
+
+        self.assertEqual([rewritten_sha], [commit["sha"] for commit in commits])
+        self.assertFalse(found_baseline)
+
+    async def test_failed_compare_falls_back_to_paging_the_commit_list(self):
+        old_sha = "a" * 40
+        new_sha = "b" * 40
+        new_commit = make_commit(new_sha, "Moved", "2026-01-02T00:00:00Z")
+        self.write_json_state({"branches": {"main": old_sha}, "posted_commits": [old_sha]})
+
+        async def matching_refs(request):
+            return web.json_response([{"ref": "refs/heads/main", "object": {"sha": new_sha}}])
+
+        async def compare(request):
+            return web.json_response({"message": "Not Found"}, status=404)
+
+        async def list_commits(request):
+            return web.json_response([new_commit, make_commit(old_sha, "Old", "2026-01-01T00:00:00Z")])
+
+        async def commit_details(request):
+            return web.json_response(new_commit)
+
+        api_base = await self.start_fake_github(
+            [
+                web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs),
+                web.get("/repos/MuskaGH/Avalore/compare/{basehead}", compare),
+                web.get("/repos/MuskaGH/Avalore/commits", list_commits),
+                web.get("/repos/MuskaGH/Avalore/commits/{sha}", commit_details),
+            ]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual([new_sha], [update.commit_sha for update in check_result.updates])
+        self.assertIn("/repos/MuskaGH/Avalore/commits", [r.path for r in self.github_requests])
+
+
+class GitHubRateLimiterTests(
+    FakeGitHubServerMixin,
+    TempStateMixin,
+    unittest.IsolatedAsyncioTestCase,
+):
+    def test_interval_stretches_to_fit_remaining_budget(self):
+        limiter = GitHubRateLimiter()
+        reset_at = time.time() + 600
+
+        with mock.patch.object(constants, "GITHUB_RATE_LIMIT_RESERVE", 0):
+            limiter.record_response(200, {"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": str(reset_at)})
+            self.assertEqual(30, limiter.recommend_interval(30, {"core": 10}))
+
+            limiter.record_response(200, {"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(reset_at)})
+            self.assertGreaterEqual(limiter.recommend_interval(30, {"core": 10}), 60)
+
+            limiter.record_response(304, {})
+            self.assertEqual({"core": 2}, limiter.take_request_counts())
+            self.assertEqual({}, limiter.take_request_counts())
+
+    def test_graphql_and_rest_budgets_are_tracked_separately(self):
+        limiter = GitHubRateLimiter()
+        reset_at = time.time() + 600
+
+        limiter.record_response(200, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": str(reset_at)})
+        limiter.record_response(
+            403,
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at), "X-RateLimit-Resource": "graphql"},
+            "graphql",
+        )
+
+        self.assertTrue(limiter.is_blocked("graphql"))
+        self.assertFalse(limiter.is_blocked("core"))
+        self.assertEqual(4000, limiter.get_budget("core").remaining)
+        self.assertEqual(0, limiter.remaining)
+
+    def test_retry_after_blocks_until_it_expires(self):
+        limiter = GitHubRateLimiter()
+        limiter.record_response(403, {"Retry-After": "120"})
+
+        self.assertTrue(limiter.is_blocked())
+        self.assertGreaterEqual(limiter.recommend_interval(30, {"core": 1}), 120)
+
+    async def test_exhausted_rate_limit_stops_further_requests(self):
+        reset_at = int(time.time()) + 600
+
+        async def list_branches(request):
+            return web.json_response(
+                {"message": "API rate limit exceeded"},
+                status=403,
+                headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at)},
+            )
+
+        api_base = await self.start_fake_github(
+            [web.get("/repos/MuskaGH/Avalore/branches", list_branches)]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        self.assertEqual([], await monitor.get_branches())
+        check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertFalse(check_result.should_save_state)
+        self.assertEqual(1, len(self.github_requests))
+
+    async def test_rate_limit_during_a_branch_walk_keeps_the_saved_head(self):
+        old_main, new_main = "a" * 40, "b" * 40
+        old_dev, new_dev = "c" * 40, "d" * 40
+        self.write_json_state({"branches": {"main": old_main, "dev": old_dev}, "posted_commits": [old_main, old_dev]})
+        reset_at = int(time.time()) + 600
+
+        async def matching_refs(request):
+            return web.json_response(
+                [
+                    {"ref": "refs/heads/main", "object": {"sha": new_main, "type": "commit"}},
+                    {"ref": "refs/heads/dev", "object": {"sha": new_dev, "type": "commit"}},
+                ]
+            )
+
+        async def compare(request):
+            return web.json_response(
+                {"message": "API rate limit exceeded"},
+                status=403,
+                headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at)},
+            )
+
+        api_base = await self.start_fake_github(
+            [
+                web.get("/repos/MuskaGH/Avalore/git/matching-refs/heads", matching_refs),
+                web.get("/repos/MuskaGH/Avalore/compare/{basehead}", compare),
+            ]
+        )
+        monitor = GitHubMonitor(self.project, api_base=api_base)
+
+        with mock.patch.object(constants, "GITHUB_USE_COMPARE_API", True):
+            check_result = await monitor.check_for_new_commit_updates()
+
+        self.assertEqual([], check_result.updates)
+        self.assertEqual({"main": old_main, "dev": old_dev}, check_result.next_branch_state)
+        self.assertEqual(2, len(self.github_requests))
+
+
+def make_graphql_commit(commit_sha, title, date):
+    return {
+        "oid": commit_sha,
+        "message": title,
+        "committedDate": date,
+        "author": {"name": "Martin", "date": date},
+    }
+
+
+class GitHubGraphQLMonitorTests(
+    FakeGitHubServerMixin,
+    TempStateMixin,
+    unittest.IsolatedAsyncioTestCase,
+):
+    async def test_branch_heads_and_history_come_from_one_query(self):
+        old_main = "1" * 40
+        new_one = "2" * 40
+        new_two = "3" * 40
+        feature_head = "4" * 40
+        self.write_json_state(
+            {
+                "branches": {"main": old_main, "feature": feature_head},
+                "posted_commits": [old_main, feature_head],
+            }
+        )
+
+        async def graphql(request):
+            payload = await request.json()
+            self.assertEqual("MuskaGH", payload["variables"]["owner"])
+            return web.json_response(
+                {
+                    "data": {
+                        "repository": {
+                            "refs": {
+                                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                                "nodes": [
+                                    {
+                                        "name": "main",
+                                        "target": {
+                                            "oid": new_two,
+                                            "history": {
+                                                "nodes": [
+                                                    make_graphql_commit(new_two, "Second", "2026-01-03T00:00:00Z"),
+                                                    make_graphql_commit(new_one, "First", "2026-01-02T00:00:00Z"),
+                                                    make_graphql_commit(old_main, "Old", "2026-01-01T00:00:00Z"),
+                                                ]
+                                            },
+                                        },
+                                    },
+                                    {
+                                        "name": "feature",
+                                        "target": {
+                                            "oid": feature_head,
+                                            "history": {
+                                                "nodes": [
+                                                    make_graphql_commit(feature_head, "Feature", "2026-01-01T00:00:00Z"),
+                                                ]
+                                            },
+                                        },
+                                    },
+                                ],
+                            }
+                        }
+                    }
+                }
+            )
+
+        api_base = await self.start_fake_github([web.post("/graphql", graphql)])
+        graphql_project = dataclasses.replace(self.project, backend="graphql")
+        monitor = create_github_monitor(graphql_project, api_base=api_base)
+
+        messages = await monitor.check_for_new_commits()
+        saved_state = self.read_json_state()
+
+        self.assertIsInstance(monitor, GitHubGraphQLMonitor)
+        self.assertEqual(1, len(self.github_requests))
+        self.assertEqual(2, len(messages))
+        self.assertIn("[Title] First", messages[0])
+        self.assertIn("[Title] Second", messages[1])
+        self.assertEqual({"main": new_two, "feature": feature_head}, saved_state["branches"])
+        self.assertEqual([old_main, feature_head, new_one, new_two], saved_state["posted_commits"])
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            constants.validate_projects([dataclasses.replace(self.project, backend="soap")])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,202 @@
+import asyncio
+import dataclasses
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import constants
+from github_integration import GitHubMonitor
+from github_webhooks import GitHubWebhookServer, verify_webhook_signature
+
+SECRET = "webhook-secret"
+
+
+def sign(body):
+    return "sha256=" + hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def make_push_payload(before, commits, ref="refs/heads/main", full_name="MuskaGH/Avalore"):
+    return {
+        "ref": ref,
+        "before": before,
+        "after": commits[-1]["id"] if commits else before,
+        "forced": False,
+        "deleted": False,
+        "repository": {"full_name": full_name},
+        "commits": commits,
+    }
+
+
+def make_push_commit(commit_sha, message, timestamp):
+    return {
+        "id": commit_sha,
+        "message": message,
+        "timestamp": timestamp,
+        "author": {"name": "Martin"},
+    }
+
+
+class WebhookTestMixin:
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = constants.ProjectConfig(
+            key="test",
+            display_name="Avalore",
+            repo_owner="MuskaGH",
+            repo_name="Avalore",
+            channel_id=123,
+            state_file=os.path.join(self.temp_dir.name, "last_commit.txt"),
+        )
+        self.monitor = GitHubMonitor(self.project)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class VerifyWebhookSignatureTests(unittest.TestCase):
+    def test_signature_must_match_body_and_secret(self):
+        body = b'{"zen": "Keep it logically awesome."}'
+
+        self.assertTrue(verify_webhook_signature(SECRET, body, sign(body)))
+        self.assertFalse(verify_webhook_signature(SECRET, body + b" ", sign(body)))
+        self.assertFalse(verify_webhook_signature("other", body, sign(body)))
+        self.assertFalse(verify_webhook_signature(SECRET, body, None))
+        self.assertFalse(verify_webhook_signature("", body, sign(body)))
+
+
+class BuildPushUpdatesTests(WebhookTestMixin, unittest.TestCase):
+    def test_push_commits_become_updates_and_advance_the_branch(self):
+        old_main = "1" * 40
+        new_one = "2" * 40
+        new_two = "3" * 40
+        self.monitor.save_processed_commits({"main": old_main}, [old_main, new_one])
+        payload = make_push_payload(
+            old_main,
+            [
+                make_push_commit(new_one, "Already posted", "2026-01-02T00:00:00Z"),
+                make_push_commit(new_two, "Second\n- Detail", "2026-01-03T00:00:00Z"),
+            ],
+        )
+
+        commit_check = self.monitor.build_push_updates(payload)
+
+        self.assertEqual([new_two], [update.commit_sha for update in commit_check.updates])
+        self.assertIn("[Branch] main", commit_check.updates[0].message)
+        self.assertIn("- Detail", commit_check.updates[0].message)
+        self.assertEqual({"main": new_two}, commit_check.next_branch_state)
+
+    def test_embed_updates_list_the_pushed_files(self):
+        old_main = "1" * 40
+        new_sha = "2" * 40
+        monitor = GitHubMonitor(dataclasses.replace(self.project, render_mode="embed"))
+        monitor.save_processed_commits({"main": old_main}, [old_main])
+        commit = dict(
+            make_push_commit(new_sha, "Add quests", "2026-01-02T00:00:00Z"),
+            added=["quests.py"],
+            modified=["bot.py", "constants.py"],
+        )
+
+        commit_check = monitor.build_push_updates(make_push_payload(old_main, [commit]))
+
+        self.assertIn(
+            {"name": "Files", "value": "- Added 1 file(s): quests.py\n- Modified 2 file(s): bot.py, constants.py", "inline": False},
+            commit_check.updates[0].embed["fields"],
+        )
+
+    def test_pushes_that_need_reconciliation_return_none(self):
+        old_main = "1" * 40
+        self.monitor.save_processed_commits({"main": old_main}, [old_main])
+        commit = make_push_commit("2" * 40, "Title", "2026-01-02T00:00:00Z")
+
+        self.assertIsNone(self.monitor.build_push_updates(make_push_payload("9" * 40, [commit])))
+        self.assertIsNone(
+            self.monitor.build_push_updates(make_push_payload(old_main, [commit], ref="refs/heads/new"))
+        )
+        self.assertIsNone(
+            self.monitor.build_push_updates(
+                make_push_payload(old_main, [commit] * constants.GITHUB_WEBHOOK_MAX_PAYLOAD_COMMITS)
+            )
+        )
+
+        tag_check = self.monitor.build_push_updates(make_push_payload(old_main, [commit], ref="refs/tags/v1"))
+        self.assertFalse(tag_check.should_save_state)
+
+
+class GitHubWebhookServerTests(WebhookTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pushes = []
+        self.push_received = asyncio.Event()
+
+        async def on_push(project, monitor, payload):
+            self.pushes.append((project, monitor, payload))
+            self.push_received.set()
+
+        self.server = GitHubWebhookServer([(self.project, self.monitor)], on_push, secret=SECRET)
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+
+    async def post(self, body, event="push", signature=None):
+        return await self.client.post(
+            constants.GITHUB_WEBHOOK_PATH,
+            data=body,
+            headers={
+                "X-GitHub-Event": event,
+                "X-Hub-Signature-256": signature or sign(body),
+                "Content-Type": "application/json",
+            },
+        )
+
+    async def test_signed_push_is_dispatched_to_the_matching_project(self):
+        body = json.dumps(make_push_payload("1" * 40, [], full_name="muskagh/avalore")).encode("utf-8")
+
+        response = await self.post(body)
+        await asyncio.wait_for(self.push_received.wait(), timeout=1)
+
+        self.assertEqual(202, response.status)
+        self.assertEqual(1, len(self.pushes))
+        self.assertIs(self.monitor, self.pushes[0][1])
+
+    async def test_bad_signatures_and_other_events_are_not_dispatched(self):
+        body = json.dumps(make_push_payload("1" * 40, [])).encode("utf-8")
+
+        bad_signature = await self.post(body, signature="sha256=" + "0" * 64)
+        ping = await self.post(b"{}", event="ping")
+        unknown_repo = await self.post(
+            json.dumps(make_push_payload("1" * 40, [], full_name="someone/else")).encode("utf-8")
+        )
+
+        self.assertEqual(401, bad_signature.status)
+        self.assertEqual(200, ping.status)
+        self.assertEqual(202, unknown_repo.status)
+        self.assertEqual([], self.pushes)
+
+    async def test_signed_bodies_that_are_not_objects_are_rejected(self):
+        for body in (b"[]", b'"push"', b'{"repository": "MuskaGH/Avalore"}'):
+            response = await self.post(body)
+            self.assertEqual(202 if body.startswith(b"{") else 400, response.status)
+
+        self.assertEqual([], self.pushes)
+
+    async def test_push_bodies_larger_than_a_megabyte_are_accepted(self):
+        payload = make_push_payload("1" * 40, [], full_name="muskagh/avalore")
+        payload["padding"] = "x" * (2 * 1024 * 1024)
+        body = json.dumps(payload).encode("utf-8")
+
+        response = await self.post(body)
+        await asyncio.wait_for(self.push_received.wait(), timeout=1)
+
+        self.assertEqual(202, response.status)
+        self.assertEqual(1, len(self.pushes))
+
+
+if __name__ == "__main__":
+    unittest.main()
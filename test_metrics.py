@@ -0,0 +1,87 @@
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import metrics
+from github_integration import GitHubRateLimiter
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.MetricsRegistry()
+
+    def test_counters_and_gauges_render_as_prometheus_text(self):
+        requests = self.registry.counter("requests_total", "Requests.", ("project", "status"))
+        remaining = self.registry.gauge("remaining", "Remaining.")
+
+        requests.inc(project="avalore", status="200")
+        requests.inc(2, project="avalore", status="304")
+        remaining.set(4999)
+
+        self.assertEqual(
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{project="avalore",status="200"} 1\n'
+            'requests_total{project="avalore",status="304"} 2\n'
+            "# HELP remaining Remaining.\n"
+            "# TYPE remaining gauge\n"
+            "remaining 4999\n",
+            self.registry.render(),
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.register(metrics.Histogram("duration_seconds", "Duration.", ("project",), buckets=(0.1, 1.0)))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, project="avalore")
+
+        self.assertEqual(
+            [
+                'duration_seconds_bucket{project="avalore",le="0.1"} 2',
+                'duration_seconds_bucket{project="avalore",le="1"} 3',
+                'duration_seconds_bucket{project="avalore",le="+Inf"} 4',
+                'duration_seconds_sum{project="avalore"} 3.65',
+                'duration_seconds_count{project="avalore"} 4',
+            ],
+            histogram.render()[2:],
+        )
+        self.assertEqual(4, self.registry.snapshot()["duration_seconds"]["values"][0]["count"])
+
+    def test_wrong_labels_are_rejected(self):
+        requests = self.registry.counter("requests_total", "Requests.", ("project",))
+
+        with self.assertRaises(ValueError):
+            requests.inc(repo="avalore")
+
+    def test_rate_limit_headers_update_the_gauge(self):
+        limiter = GitHubRateLimiter()
+        limiter.record_response(200, {"X-RateLimit-Remaining": "42", "X-RateLimit-Reset": "1700000000"})
+        limiter.record_response(200, {"X-RateLimit-Remaining": "7", "X-RateLimit-Resource": "graphql"})
+
+        snapshot = metrics.get_snapshot()
+
+        self.assertEqual(
+            [({"resource": "core"}, 42), ({"resource": "graphql"}, 7)],
+            [(value["labels"], value["value"]) for value in snapshot[metrics.GITHUB_RATE_LIMIT_REMAINING.name]["values"]],
+        )
+        self.assertIn("GitHub rate limit remaining: 42", metrics.summarize_snapshot(snapshot))
+        self.assertIn("GitHub graphql rate limit remaining: 7", metrics.summarize_snapshot(snapshot))
+
+
+class MetricsServerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_metrics_endpoint_serves_the_registry(self):
+        registry = metrics.MetricsRegistry()
+        registry.counter("checks_total", "Checks.").inc()
+        client = TestClient(TestServer(metrics.MetricsServer(registry, path="/metrics").app))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+
+        response = await client.get("/metrics")
+
+        self.assertEqual(200, response.status)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("checks_total 1\n", await response.text())
+
+
+if __name__ == "__main__":
+    unittest.main()
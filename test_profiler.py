@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import bot
+import constants
+from github_integration import GitHubCommitCheckResult
+from profiler import SamplingProfiler
+from test_bot import ScriptedMonitor, make_project
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SamplingProfilerTests(unittest.TestCase):
+    def test_samples_are_collapsed_stacks_of_the_sampled_thread(self):
+        profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+
+        for _ in range(5):
+            profiler.sample()
+            spin(0.001)
+
+        self.assertEqual(5, profiler.sample_count)
+        stack, count = profiler.collapsed_stacks()[0].rsplit(" ", 1)
+        self.assertEqual(
+            ["test_profiler.py:test_samples_are_collapsed_stacks_of_the_sampled_thread", "profiler.py:sample"],
+            stack.split(";")[-2:],
+        )
+        self.assertGreaterEqual(int(count), 1)
+
+    def test_paused_profiler_records_nothing(self):
+        worker = threading.Thread(target=spin, args=(0.2,))
+        worker.start()
+        profiler = SamplingProfiler(worker.ident, interval=0.001)
+        profiler.start()
+
+        time.sleep(0.05)
+        self.assertEqual(0, profiler.sample_count)
+
+        profiler.resume()
+        time.sleep(0.05)
+        profiler.stop()
+        worker.join()
+
+        self.assertGreater(profiler.sample_count, 0)
+        self.assertIn("test_profiler.py:spin", profiler.top_functions(limit=3)[1])
+
+    def test_empty_profile_reports_no_samples(self):
+        self.assertEqual(["No profiler samples were recorded."], SamplingProfiler(0).top_functions())
+
+
+class ProfileNextChecksTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        bot._github_check_lock = None
+        bot._pending_deliveries.clear()
+        bot._project_locks.clear()
+        self.addCleanup(bot.cancel_check_profile)
+
+    async def test_profile_is_written_after_the_requested_checks(self):
+        async def check():
+            spin(0.02)
+            return GitHubCommitCheckResult([], {}, {}, [], should_save_state=False)
+
+        project = make_project(self.temp_dir.name, "profiled")
+        profile_dir = os.path.join(self.temp_dir.name, "profiles")
+
+        with mock.patch.object(bot, "project_monitors", ((project, ScriptedMonitor(project, check)),)), \
+                mock.patch.object(constants, "PROFILE_OUTPUT_DIR", profile_dir), \
+                mock.patch.object(constants, "PROFILER_SAMPLE_INTERVAL", 0.001):
+            self.assertTrue(bot.profile_next_github_checks(2))
+            self.assertFalse(bot.profile_next_github_checks(1))
+
+            await bot.run_github_commit_check(manual=True)
+            self.assertFalse(os.path.exists(profile_dir))
+
+            await bot.run_github_commit_check(manual=True)
+
+        self.assertIsNone(bot._check_profile)
+        [profile_file] = os.listdir(profile_dir)
+        with open(os.path.join(profile_dir, profile_file), 'r', encoding='utf-8') as f:
+            self.assertIn("test_profiler.py:spin", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,338 @@
+import asyncio
+import dataclasses
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import constants
+from state_store import (
+    CachedStateStore,
+    CommitStateStore,
+    JournalStateStore,
+    JsonStateStore,
+    PostedCommitHistory,
+    SQLiteStateStore,
+    convert_state_file,
+    create_state_store,
+    get_journal_state_file,
+    get_sqlite_state_file,
+)
+
+
+class StateStoreTestMixin:
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.temp_dir.name, "last_commit.txt")
+        self.database_file = get_sqlite_state_file(self.state_file)
+        self.journal_file = get_journal_state_file(self.state_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_json_state(self, state):
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+
+class PostedCommitHistoryTests(unittest.TestCase):
+    def test_full_shas_are_stored_as_binary_and_read_back_as_hex(self):
+        history = PostedCommitHistory(["A" * 40, "abc123"])
+
+        self.assertIn("a" * 40, history)
+        self.assertIn("ABC123", history)
+        self.assertIn(bytes.fromhex("a" * 40), history._commits)
+        self.assertEqual(["a" * 40, "abc123"], history.to_list())
+
+    def test_add_dedupes_and_evicts_the_oldest_past_the_cap(self):
+        with mock.patch.object(constants, "GITHUB_POSTED_COMMITS_LIMIT", 2):
+            history = PostedCommitHistory(["a" * 40, "b" * 40, "a" * 40, "c" * 40])
+            self.assertEqual(["b" * 40, "c" * 40], list(history))
+
+            self.assertFalse(history.add("C" * 40))
+            self.assertTrue(history.add("d" * 40))
+
+        self.assertEqual(["c" * 40, "d" * 40], history.to_list())
+        self.assertNotIn("b" * 40, history)
+        self.assertFalse(history.add(""))
+
+
+class SQLiteStateStoreTests(StateStoreTestMixin, unittest.TestCase):
+    def test_existing_json_state_is_migrated_on_first_open(self):
+        self.write_json_state({"branches": {"main": "AAA111"}, "posted_commits": ["bbb222", "aaa111"]})
+        store = SQLiteStateStore(self.database_file, legacy_state_file=self.state_file)
+        self.addCleanup(store.close)
+
+        self.assertEqual(({"main": "aaa111"}, ["bbb222", "aaa111"], None, True), store.load())
+
+        # Later edits of the JSON file are ignored once the database exists.
+        self.write_json_state({"branches": {"main": "ccc333"}, "posted_commits": []})
+        store.close()
+        self.assertEqual({"main": "aaa111"}, store.load()[0])
+
+    def test_legacy_single_sha_file_is_migrated(self):
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            f.write(" ABC123 \n")
+
+        store = SQLiteStateStore(self.database_file, legacy_state_file=self.state_file)
+        self.addCleanup(store.close)
+
+        self.assertEqual(({}, [], "abc123", False), store.load())
+
+        store.save({"main": "abc123"}, ["abc123"])
+        self.assertEqual(({"main": "abc123"}, ["abc123"], None, True), store.load())
+
+    def test_posted_commits_are_appended_and_trimmed_to_the_limit(self):
+        store = SQLiteStateStore(self.database_file)
+        self.addCleanup(store.close)
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        with mock.patch.object(constants, "GITHUB_POSTED_COMMITS_LIMIT", 3):
+            for commit_sha in ("b" * 40, "c" * 40, "d" * 40):
+                store.record_posted_commits([commit_sha], {"main": "a" * 40}, [])
+
+        branch_state, posted_commits, _, posted_commits_present = store.load()
+        self.assertEqual({"main": "a" * 40}, branch_state)
+        self.assertEqual(["b" * 40, "c" * 40, "d" * 40], posted_commits)
+        self.assertTrue(posted_commits_present)
+
+        with sqlite3.connect(self.database_file) as connection:
+            self.assertEqual("wal", connection.execute("PRAGMA journal_mode").fetchone()[0])
+
+    def test_ignored_duplicates_do_not_shrink_the_trimmed_history(self):
+        store = SQLiteStateStore(self.database_file)
+        self.addCleanup(store.close)
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        with mock.patch.object(constants, "GITHUB_POSTED_COMMITS_LIMIT", 3):
+            for commit_sha in ("b" * 40, "a" * 40, "c" * 40):
+                store.record_posted_commits([commit_sha], {"main": "a" * 40}, [])
+
+        self.assertEqual(["a" * 40, "b" * 40, "c" * 40], store.load()[1])
+
+    def test_zero_limit_trims_the_whole_history(self):
+        store = SQLiteStateStore(self.database_file)
+        self.addCleanup(store.close)
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        with mock.patch.object(constants, "GITHUB_POSTED_COMMITS_LIMIT", 0):
+            store.record_posted_commits(["b" * 40], {"main": "b" * 40}, [])
+
+        self.assertEqual(({"main": "b" * 40}, [], None, True), store.load())
+
+    def test_first_recorded_commit_writes_seeded_history(self):
+        store = SQLiteStateStore(self.database_file)
+        self.addCleanup(store.close)
+
+        store.record_posted_commits(["c" * 40], {"main": "a" * 40}, ["a" * 40, "b" * 40, "c" * 40])
+
+        self.assertEqual(
+            ({"main": "a" * 40}, ["a" * 40, "b" * 40, "c" * 40], None, True),
+            store.load(),
+        )
+
+
+class CreateStateStoreTests(StateStoreTestMixin, unittest.TestCase):
+    def test_project_state_backend_selects_the_store(self):
+        project = constants.ProjectConfig(
+            key="test",
+            display_name="Test",
+            repo_owner="MuskaGH",
+            repo_name="Test",
+            channel_id=1,
+            state_file=self.state_file,
+        )
+
+        self.assertIsInstance(create_state_store(project), JsonStateStore)
+
+        sqlite_store = create_state_store(
+            dataclasses.replace(project, state_backend="sqlite")
+        )
+        self.addCleanup(sqlite_store.close)
+        self.assertIsInstance(sqlite_store, SQLiteStateStore)
+        self.assertEqual(os.path.join(self.temp_dir.name, "last_commit.sqlite3"), sqlite_store.database_file)
+
+
+class JournalStateStoreTests(StateStoreTestMixin, unittest.TestCase):
+    def read_journal_records(self):
+        with open(self.journal_file, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_existing_json_state_is_migrated_and_commits_are_appended(self):
+        self.write_json_state({"branches": {"main": "a" * 40}, "posted_commits": ["a" * 40]})
+        store = JournalStateStore(self.journal_file, legacy_state_file=self.state_file)
+
+        self.assertEqual(({"main": "a" * 40}, ["a" * 40], None, True), store.load())
+
+        store.record_posted_commits(["b" * 40], {"main": "a" * 40}, ["a" * 40, "b" * 40])
+        store.save_branches({"main": "b" * 40}, ["a" * 40, "b" * 40])
+
+        self.assertEqual(
+            ["snapshot", "posted", "branches", "branches"],
+            [record["type"] for record in self.read_journal_records()],
+        )
+        self.assertEqual(
+            ({"main": "b" * 40}, ["a" * 40, "b" * 40], None, True),
+            JournalStateStore(self.journal_file).load(),
+        )
+
+    def test_half_written_last_record_is_ignored(self):
+        store = JournalStateStore(self.journal_file)
+        store.save({"main": "a" * 40}, ["a" * 40])
+        store.record_posted_commits(["b" * 40], {"main": "a" * 40}, ["a" * 40, "b" * 40])
+
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"type": "posted", "sha": "ccc')
+
+        self.assertEqual(["a" * 40, "b" * 40], JournalStateStore(self.journal_file).load()[1])
+
+    def test_first_record_after_a_torn_line_is_kept(self):
+        store = JournalStateStore(self.journal_file)
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"type": "posted", "sha": "ccc')
+
+        restarted_store = JournalStateStore(self.journal_file)
+        restarted_store.record_posted_commits(["d" * 40], {"main": "d" * 40}, ["a" * 40, "d" * 40])
+
+        self.assertEqual(
+            ({"main": "d" * 40}, ["a" * 40, "d" * 40], None, True),
+            JournalStateStore(self.journal_file).load(),
+        )
+
+    def test_journal_is_compacted_into_a_snapshot(self):
+        store = JournalStateStore(self.journal_file)
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        with mock.patch.object(constants, "STATE_JOURNAL_COMPACT_RECORDS", 4):
+            for commit_sha in ("b" * 40, "c" * 40):
+                store.record_posted_commits([commit_sha], {"main": commit_sha}, [])
+
+        records = self.read_journal_records()
+        self.assertEqual(["snapshot"], [record["type"] for record in records])
+        self.assertEqual({"main": "c" * 40}, records[0]["branches"])
+        self.assertEqual(["a" * 40, "b" * 40, "c" * 40], records[0]["posted_commits"])
+
+    def test_first_recorded_commit_writes_seeded_history(self):
+        store = JournalStateStore(self.journal_file)
+
+        store.record_posted_commits(["c" * 40], {"main": "a" * 40}, ["b" * 40, "c" * 40])
+
+        self.assertEqual(["snapshot"], [record["type"] for record in self.read_journal_records()])
+        self.assertEqual(({"main": "a" * 40}, ["b" * 40, "c" * 40], None, True), store.load())
+
+    def test_state_converts_between_json_and_journal(self):
+        self.write_json_state({"branches": {"main": "a" * 40}, "posted_commits": ["b" * 40, "a" * 40]})
+        json_copy = os.path.join(self.temp_dir.name, "copy.json")
+
+        convert_state_file(self.state_file, self.journal_file)
+        convert_state_file(self.journal_file, json_copy)
+
+        with open(json_copy, encoding="utf-8") as f:
+            self.assertEqual(
+                {"branches": {"main": "a" * 40}, "posted_commits": ["b" * 40, "a" * 40]},
+                json.load(f),
+            )
+
+
+class RecordingStateStore(CommitStateStore):
+    incremental_writes = True
+
+    def __init__(self, state=({}, [], None, False)):
+        self.state = state
+        self.loads = 0
+        self.writes = []
+        self.fail_writes = False
+
+    def load(self):
+        self.loads += 1
+        return self.state
+
+    def save(self, branch_state, posted_commits):
+        self.writes.append(("save", dict(branch_state), list(posted_commits)))
+        return not self.fail_writes
+
+    def record_posted_commits(self, commit_shas, branch_state, posted_commits):
+        self.writes.append(("record", list(commit_shas)))
+        return not self.fail_writes
+
+    def save_branches(self, branch_state, posted_commits):
+        self.writes.append(("branches", dict(branch_state)))
+        return not self.fail_writes
+
+
+class CachedStateStoreTests(unittest.IsolatedAsyncioTestCase):
+    async def test_writes_are_held_in_memory_until_flushed(self):
+        inner = RecordingStateStore(({"main": "a" * 40}, ["a" * 40], None, True))
+        store = CachedStateStore(inner)
+
+        store.load()
+        store.record_posted_commits(["b" * 40], {"main": "a" * 40}, ["a" * 40, "b" * 40])
+        store.record_posted_commits(["c" * 40], {"main": "a" * 40}, ["a" * 40, "b" * 40, "c" * 40])
+
+        self.assertEqual([], inner.writes)
+        self.assertEqual(["a" * 40, "b" * 40, "c" * 40], store.load()[1])
+        self.assertEqual(1, inner.loads)
+
+        await store.flush()
+
+        self.assertEqual([("record", ["b" * 40, "c" * 40])], inner.writes)
+        self.assertFalse(store.dirty)
+
+    async def test_failed_flush_keeps_the_writes_pending(self):
+        inner = RecordingStateStore(({"main": "a" * 40}, ["a" * 40], None, True))
+        store = CachedStateStore(inner)
+
+        store.load()
+        store.record_posted_commits(["b" * 40], {"main": "a" * 40}, [])
+        inner.fail_writes = True
+        await store.flush()
+
+        self.assertTrue(store.dirty)
+
+        store.record_posted_commits(["c" * 40], {"main": "a" * 40}, [])
+        inner.fail_writes = False
+        await store.flush()
+
+        self.assertEqual([("record", ["b" * 40]), ("record", ["b" * 40, "c" * 40])], inner.writes)
+        self.assertFalse(store.dirty)
+
+    async def test_saving_the_live_history_only_writes_branches(self):
+        inner = RecordingStateStore(({"main": "a" * 40}, ["a" * 40], None, True))
+        store = CachedStateStore(inner)
+
+        _, posted_commits, _, _ = store.load_live()
+        store.save({"main": "b" * 40}, posted_commits)
+        await store.flush()
+
+        self.assertEqual([("branches", {"main": "b" * 40})], inner.writes)
+        self.assertIs(posted_commits, store.load_live()[1])
+
+    async def test_timer_flushes_pending_writes(self):
+        inner = RecordingStateStore()
+        store = CachedStateStore(inner)
+
+        with mock.patch.object(constants, "STATE_WRITE_BEHIND_DELAY", 0.01):
+            store.save({"main": "a" * 40}, ["a" * 40])
+
+        for _ in range(50):
+            if inner.writes:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual([("save", {"main": "a" * 40}, ["a" * 40])], inner.writes)
+
+    def test_writes_without_a_running_loop_are_immediate(self):
+        inner = RecordingStateStore()
+        store = CachedStateStore(inner)
+
+        store.save({"main": "a" * 40}, ["a" * 40])
+
+        self.assertEqual([("save", {"main": "a" * 40}, ["a" * 40])], inner.writes)
+
+
+if __name__ == "__main__":
+    unittest.main()
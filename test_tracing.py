@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import constants
+import tracing
+from bench_pipeline import FakeGitHubRepository, FakeGitHubServer
+from github_integration import GitHubMonitor
+
+
+@tracing.traced("fetch")
+async def fetch(delay):
+    await asyncio.sleep(delay)
+    return delay
+
+
+@tracing.traced("render")
+def render(value):
+    return str(value)
+
+
+class TracingTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.trace_file = os.path.join(self.temp_dir.name, "traces.jsonl")
+        tracing.configure(True, self.trace_file)
+        self.addCleanup(tracing.configure, False)
+
+    def read_traces(self):
+        tracing.flush()
+        with open(self.trace_file, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    async def test_spans_from_tasks_nest_under_the_current_span(self):
+        with tracing.span("check", project="avalore") as check_span:
+            await asyncio.gather(fetch(0), fetch(0.01))
+            render(1)
+            check_span.set_attribute("updates", 1)
+
+        [trace] = self.read_traces()
+
+        self.assertEqual("check", trace["name"])
+        self.assertEqual({"project": "avalore", "updates": 1}, trace["attributes"])
+        self.assertEqual(["fetch", "fetch", "render"], sorted(child["name"] for child in trace["children"]))
+        self.assertGreaterEqual(trace["duration_ms"], max(child["duration_ms"] for child in trace["children"]))
+
+    async def test_start_trace_ignores_the_current_span(self):
+        with tracing.span("check"):
+            with tracing.start_trace("deliver"):
+                render(1)
+
+        self.assertEqual(["deliver", "check"], [trace["name"] for trace in self.read_traces()])
+
+    async def test_failed_spans_record_the_error(self):
+        with self.assertRaises(ValueError):
+            with tracing.span("check"):
+                raise ValueError("boom")
+
+        self.assertEqual("ValueError", self.read_traces()[0]["attributes"]["error"])
+
+    async def test_turning_tracing_off_writes_queued_traces(self):
+        for index in range(50):
+            with tracing.span("check", index=index):
+                pass
+
+        tracing.configure(False)
+
+        with open(self.trace_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(list(range(50)), [json.loads(line)["attributes"]["index"] for line in f])
+
+    async def test_disabled_tracing_writes_nothing(self):
+        tracing.configure(False)
+
+        with tracing.span("check") as check_span:
+            check_span.set_attribute("updates", 1)
+            await fetch(0)
+
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    async def test_monitor_check_is_traced_and_summarized(self):
+        server = FakeGitHubServer()
+        repository = FakeGitHubRepository("MuskaGH", "Avalore", branch_count=1, body_lines=2)
+        server.add_repository(repository)
+        api_base = await server.start()
+        self.addAsyncCleanup(server.close)
+        project = constants.ProjectConfig(
+            key="avalore",
+            display_name="Avalore",
+            repo_owner="MuskaGH",
+            repo_name="Avalore",
+            channel_id=123,
+            state_file=os.path.join(self.temp_dir.name, "last_commit.txt"),
+        )
+        monitor = GitHubMonitor(project, api_base=api_base)
+        monitor.save_processed_commits({"main": repository.branches["main"][-1]}, repository.branches["main"])
+        repository.push("main", 2)
+
+        await monitor.check_for_new_commit_updates()
+
+        [trace] = [trace for trace in self.read_traces() if trace["name"] == "github.check"]
+        self.assertEqual(
+            [
+                "github.format_commit",
+                "github.format_commit",
+                "github.get_branch_heads",
+                "github.get_commit_details_batch",
+                "github.get_compare_commits",
+            ],
+            sorted(child["name"] for child in trace["children"]),
+        )
+
+        summary = tracing.summarize_trace_file(self.trace_file, limit=3)
+        self.assertTrue(summary[1].startswith("github.check"))
+        self.assertIn("Slowest 3 spans:", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""Lightweight tracing spans for the check and delivery hot paths.
+
+Spans nest through a context variable, so spans opened in tasks and worker threads started
+inside a span become its children. When the outermost span of a check or delivery ends, the
+whole tree is appended to a JSONL trace file. While tracing is disabled, span() returns a
+shared no-op object and traced() functions only pay for one flag check.
+
+    python tracing.py [TRACE_FILE] [--top N]    # summarize the slowest spans in a trace file
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import constants
+from bot_logging import get_logger
+
+logger = get_logger("tracing")
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation and the operations it started."""
+
+    __slots__ = ("name", "attributes", "children", "started_at", "duration", "_start_counter", "_token", "_parent")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.attributes = attributes
+        self.children: List[Span] = []
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._start_counter = 0.0
+        self._token: Optional[contextvars.Token] = None
+        self._parent = parent
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.started_at = time.time()
+        self._start_counter = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.duration = time.perf_counter() - self._start_counter
+        _current_span.reset(self._token)
+
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+
+        if self._parent is not None:
+            self._parent.children.append(self)
+        elif _exporter is not None:
+            _exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": round(self.started_at, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class JsonlTraceExporter:
+    """Appends one finished trace tree per line to a JSONL file from a background thread.
+
+    export() only snapshots the finished tree and queues it, so the traced code never waits
+    for the disk.
+    """
+
+    def __init__(self, trace_file: str):
+        self.trace_file = trace_file
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_traces, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, root_span: Span) -> None:
+        self._queue.put(dict(root_span.to_dict(), trace_id=uuid.uuid4().hex))
+
+    def flush(self) -> None:
+        """Wait until every trace queued so far is in the file."""
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self) -> None:
+        """Write the queued traces and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_traces(self) -> None:
+        while True:
+            # Everything already queued goes out with one open and write.
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [json.dumps(item, separators=(",", ":")) + "\n" for item in items if isinstance(item, dict)]
+
+            if lines:
+                try:
+                    with open(self.trace_file, 'a', encoding='utf-8') as f:
+                        f.writelines(lines)
+                except Exception as e:
+                    logger.error("Error writing trace to %s: %s", self.trace_file, e)
+
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+            if None in items:
+                return
+
+
+_exporter: Optional[JsonlTraceExporter] = None
+
+
+def configure(enabled: bool, trace_file: Optional[str] = None) -> None:
+    """Turn tracing on or off; finished traces go to trace_file (TRACE_FILE by default)."""
+    global _exporter
+    previous_exporter = _exporter
+    _exporter = JsonlTraceExporter(trace_file or constants.TRACE_FILE) if enabled else None
+
+    if previous_exporter is not None:
+        previous_exporter.close()
+
+
+def flush() -> None:
+    """Wait until every finished trace is in the trace file."""
+    if _exporter is not None:
+        _exporter.flush()
+
+
+def is_enabled() -> bool:
+    return _exporter is not None
+
+
+def span(name: str, **attributes: Any):
+    """Return a context manager timing the block as a child of the current span."""
+    if _exporter is None:
+        return _NOOP_SPAN
+
+    return Span(name, attributes, _current_span.get())
+
+
+def start_trace(name: str, **attributes: Any):
+    """Like span(), but always starts a new trace, e.g. in a long-lived worker task."""
+    if _exporter is None:
+        return _NOOP_SPAN
+
+    return Span(name, attributes, None)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function or coroutine function so every call runs inside a span."""
+    def decorate(function: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if _exporter is None:
+                    return await function(*args, **kwargs)
+
+                with Span(name, {}, _current_span.get()):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return function(*args, **kwargs)
+
+            with Span(name, {}, _current_span.get()):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _walk_spans(span_record: Dict[str, Any], path: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Dict[str, Any]]]:
+    path = path + (span_record["name"],)
+    yield path, span_record
+
+    for child in span_record.get("children", []):
+        yield from _walk_spans(child, path)
+
+
+def summarize_trace_file(trace_file: str, limit: int) -> List[str]:
+    """Return report lines: total time per span name, then the slowest individual spans."""
+    totals: Dict[str, List[float]] = {}
+    slowest: List[Tuple[float, str, Dict[str, Any]]] = []
+
+    with open(trace_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                root = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            for path, span_record in _walk_spans(root):
+                duration_ms = span_record["duration_ms"]
+                totals.setdefault(span_record["name"], []).append(duration_ms)
+                slowest.append((duration_ms, " > ".join(path), span_record.get("attributes", {})))
+
+    lines = [f"{'span':<40} {'calls':>7} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"]
+
+    for name, durations in sorted(totals.items(), key=lambda item: sum(item[1]), reverse=True)[:limit]:
+        lines.append(
+            f"{name:<40} {len(durations):>7} {sum(durations):>11.1f} "
+            f"{sum(durations) / len(durations):>10.1f} {max(durations):>10.1f}"
+        )
+
+    lines.append("")
+    lines.append(f"Slowest {limit} spans:")
+
+    for duration_ms, path, attributes in sorted(slowest, key=lambda item: item[0], reverse=True)[:limit]:
+        attribute_text = " ".join(f"{key}={value}" for key, value in attributes.items())
+        lines.append(f"{duration_ms:>10.1f} ms  {path}  {attribute_text}".rstrip())
+
+    return lines
+
+
+configure(constants.TRACING_ENABLED)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the slowest spans in a trace file.")
+    parser.add_argument("trace_file", nargs="?", default=constants.TRACE_FILE)
+    parser.add_argument("--top", type=int, default=constants.TRACE_SUMMARY_LIMIT, help="spans to list")
+    args = parser.parse_args()
+
+    for line in summarize_trace_file(args.trace_file, args.top):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()